@@ -0,0 +1,167 @@
+"""
+Fairness under overload: one stuck kiosk retries take_product from --noisy-concurrency
+loops with no pause while --kiosks well-behaved kiosks each take and browse once per
+--interval. Every request goes through the real get_db and pool (a query plus
+--service-time held on the connection), first without admission control and then with
+AdmissionMiddleware in front.
+
+Without it the stuck kiosk fills the pool queue and everyone else times out on checkout;
+with it the stuck kiosk is held to its write budget and the others are served. Exits 1
+when a well-behaved kiosk is served less than --min-success of the time under admission.
+
+Defaults to a SQLite file (pip install aiosqlite); pass --database-url for MySQL.
+
+    python -m benchmarks.admission_fairness --kiosks 8 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+POOL_SIZE = 5
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def asgi_request(app, method: str, path: str, headers) -> int:
+    """
+    Calls the app in-process without an HTTP client, so the client side costs next to
+    nothing and the run measures the server
+    """
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": headers,
+             "client": ("10.0.0.1", 50000), "server": ("kiosk", 80)}
+    status_code = 500
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run_scenario(app, args):
+    statuses = defaultdict(Counter)
+    latencies = defaultdict(list)
+    deadline = time.perf_counter() + args.duration
+
+    async def call(kiosk, method, path):
+        started = time.perf_counter()
+        status_code = await asgi_request(app, method, path, [(b"x-machine-id", kiosk.encode())])
+        statuses[kiosk][status_code] += 1
+        if status_code == 200:
+            latencies[kiosk].append(time.perf_counter() - started)
+
+    async def noisy_loop():
+        while time.perf_counter() < deadline:
+            await call("kiosk-stuck", "POST", "/take_product")
+            # Ignores Retry-After; only the network round trip paces it
+            await asyncio.sleep(args.rtt)
+
+    async def kiosk_loop(kiosk):
+        # Staggered so the well-behaved kiosks do not all fire on the same tick
+        await asyncio.sleep(args.interval * int(kiosk.rsplit("-", 1)[1]) / args.kiosks)
+        while time.perf_counter() < deadline:
+            await asyncio.gather(call(kiosk, "POST", "/take_product"), call(kiosk, "GET", "/get_unique_products"))
+            await asyncio.sleep(args.interval)
+
+    await asyncio.gather(
+        *(noisy_loop() for _ in range(args.noisy_concurrency)),
+        *(kiosk_loop(f"kiosk-{index}") for index in range(args.kiosks)),
+    )
+    return statuses, latencies
+
+
+def report(title, statuses, latencies, args):
+    print(f"\n{title}")
+    print(f"{'kiosk':>12} {'sent':>7} {'200':>7} {'429':>7} {'503':>7} {'served':>8} {'p95 ms':>8}")
+    served_shares = {}
+    for kiosk in sorted(statuses, key=lambda name: (name != "kiosk-stuck", name)):
+        counts = statuses[kiosk]
+        sent = sum(counts.values())
+        served_shares[kiosk] = counts[200] / sent if sent else 0.0
+        print(f"{kiosk:>12} {sent:7d} {counts[200]:7d} {counts[429]:7d} {counts[503]:7d} "
+              f"{served_shares[kiosk]:8.1%} {percentile(latencies[kiosk], 0.95) * 1000:8.1f}")
+    return served_shares
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="kiosk-admission-")
+    # The manager reads these when it is first imported
+    os.environ.update(DATABASE_URL=args.database_url or f"sqlite+aiosqlite:///{workdir}/admission.db",
+                      DB_POOL_SIZE=str(POOL_SIZE), DB_MAX_OVERFLOW="0", DB_POOL_TIMEOUT=str(args.pool_timeout),
+                      DB_POOL_WARMUP="0", DB_HEALTH_CHECK_INTERVAL="3600")
+
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.sql import text
+    from src.api.admission import AdmissionMiddleware, AdmissionSettings
+    from src.database_config import database_manager, get_db
+    from src.machines.machine_registry import machine_registry
+
+    # Only ids machine_listings knows get their own budget; the run has no machine rows
+    machine_registry.replace(["kiosk-stuck", *(f"kiosk-{index}" for index in range(args.kiosks))])
+
+    # Holds the checked-out connection for the whole handler, like take_product does
+    async def handler(db=Depends(get_db)):
+        await db.execute(text("SELECT 1"))
+        await asyncio.sleep(args.service_time)
+        return {"ok": True}
+
+    def build_app(admission: bool):
+        app = FastAPI()
+        app.add_api_route("/take_product", handler, methods=["POST"])
+        app.add_api_route("/get_unique_products", handler, methods=["GET"])
+        if admission:
+            app.add_middleware(AdmissionMiddleware, settings=AdmissionSettings(
+                read_rate=args.read_rate, read_burst=args.read_rate * 4,
+                write_rate=args.write_rate, write_burst=args.write_rate * 5,
+                max_concurrent=POOL_SIZE, max_per_client=args.max_per_client,
+                queue_timeout=args.queue_timeout, retry_after=1, redis_url=None,
+            ))
+        return app
+
+    try:
+        print(f"pool {POOL_SIZE}, service {args.service_time * 1000:.0f} ms, stuck kiosk x{args.noisy_concurrency} loops, "
+              f"{args.kiosks} kiosks every {args.interval}s, {args.duration}s per run")
+        report("without admission control", *await run_scenario(build_app(False), args), args)
+        shares = report("with admission control", *await run_scenario(build_app(True), args), args)
+    finally:
+        await database_manager.shutdown()
+
+    fair = [share for kiosk, share in shares.items() if kiosk != "kiosk-stuck"]
+    worst = min(fair) if fair else 0.0
+    print(f"\nwell-behaved kiosks served: worst {worst:.1%}, median {statistics.median(fair or [0.0]):.1%}"
+          f" (required {args.min_success:.0%})")
+    sys.exit(0 if worst >= args.min_success else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-kiosk fairness with and without admission control")
+    parser.add_argument("--database-url")
+    parser.add_argument("--kiosks", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between a kiosk's take + browse")
+    parser.add_argument("--noisy-concurrency", type=int, default=60, help="concurrent retry loops of the stuck kiosk")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rtt", type=float, default=0.01, help="network round trip pacing the stuck kiosk's loops")
+    parser.add_argument("--service-time", type=float, default=0.05, help="seconds a handler holds its connection")
+    parser.add_argument("--pool-timeout", type=float, default=0.5)
+    parser.add_argument("--read-rate", type=float, default=10)
+    parser.add_argument("--write-rate", type=float, default=2)
+    parser.add_argument("--max-per-client", type=int, default=2)
+    parser.add_argument("--queue-timeout", type=float, default=0.25)
+    parser.add_argument("--min-success", type=float, default=0.99)
+    asyncio.run(main(parser.parse_args()))
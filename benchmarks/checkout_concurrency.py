@@ -0,0 +1,104 @@
+"""
+Concurrency benchmark for the checkout engine.
+
+Fires N parallel checkouts at M free units of a throw-away product and reports
+throughput and double allocations (must be zero). Runs against DATABASE_URL.
+
+    python -m benchmarks.checkout_concurrency --checkouts 200 --units 50 --category-id 1 --user-id 1
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from sqlalchemy.sql import text
+from src.database_config import session_local, engine
+from src.product_selection.checkout_engine import claim_inventory_unit
+
+
+async def seed_units(product_name: str, units: int, category_id: int, user_id: int):
+    async with session_local() as db:
+        await db.execute(text("""
+            INSERT INTO inventory_config
+            (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price)
+            VALUES (:item_code, :category_id, 'Active', :user_id, :user_id, NOW(), NOW(), :name, 0)
+        """), [
+            {"item_code": f"{product_name}-{index}", "category_id": category_id, "user_id": user_id, "name": product_name}
+            for index in range(units)
+        ])
+        await db.commit()
+
+
+async def checkout(product_name: str, user_id: int):
+    async with session_local() as db:
+        try:
+            claimed_unit = await claim_inventory_unit(db, product_name, user_id, "take")
+            await db.commit()
+            return claimed_unit
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def collect_allocations(product_name: str):
+    async with session_local() as db:
+        result = await db.execute(text("""
+            SELECT il.inventory_id, COUNT(*) AS allocations
+            FROM inventory_listings il
+            JOIN inventory_config ic ON il.inventory_id = ic.id
+            WHERE ic.name = :name AND il.status = 'Active'
+            GROUP BY il.inventory_id
+        """), {"name": product_name})
+        return result.fetchall()
+
+
+async def cleanup(product_name: str):
+    async with session_local() as db:
+        await db.execute(text("""
+            DELETE il FROM inventory_listings il
+            JOIN inventory_config ic ON il.inventory_id = ic.id
+            WHERE ic.name = :name
+        """), {"name": product_name})
+        await db.execute(text("DELETE FROM inventory_config WHERE name = :name"), {"name": product_name})
+        await db.commit()
+
+
+async def main(args):
+    product_name = f"bench-checkout-{uuid.uuid4().hex[:8]}"
+    await seed_units(product_name, args.units, args.category_id, args.user_id)
+    try:
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(checkout(product_name, args.user_id) for _ in range(args.checkouts)),
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - started
+
+        claimed = [outcome for outcome in outcomes if isinstance(outcome, tuple)]
+        errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        allocations = await collect_allocations(product_name)
+        double_allocations = [row for row in allocations if row.allocations > 1]
+        distinct_claims = len({inventory_id for inventory_id, _ in claimed})
+
+        print(f"checkouts requested : {args.checkouts}")
+        print(f"units available     : {args.units}")
+        print(f"units claimed       : {len(claimed)} ({distinct_claims} distinct)")
+        print(f"rejected (sold out) : {args.checkouts - len(claimed) - len(errors)}")
+        print(f"errors              : {len(errors)}")
+        print(f"elapsed             : {elapsed:.3f}s")
+        print(f"throughput          : {args.checkouts / elapsed:.1f} checkouts/s")
+        print(f"double allocations  : {len(double_allocations)}")
+        for error in errors[:5]:
+            print(f"  error: {error!r}")
+        return 1 if double_allocations or distinct_claims != len(claimed) else 0
+    finally:
+        await cleanup(product_name)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel checkout benchmark")
+    parser.add_argument("--checkouts", type=int, default=200, help="Parallel checkouts to fire (N)")
+    parser.add_argument("--units", type=int, default=50, help="Free units of the product (M)")
+    parser.add_argument("--category-id", type=int, required=True, help="Existing category_config.id for the seeded units")
+    parser.add_argument("--user-id", type=int, required=True, help="Existing user_config.id used for the checkouts")
+    raise SystemExit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,70 @@
+"""
+Per-endpoint latency with and without the old per-request `select(1)` probe.
+
+Each sample opens a session the way get_db does and runs the endpoint's main query,
+optionally preceded by the probe that get_db used to run. Runs against DATABASE_URL.
+
+    python -m benchmarks.get_db_latency --samples 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from sqlalchemy import text
+from src.database_config import session_local, engine
+
+# Representative read paths, one query each
+ENDPOINT_QUERIES = {
+    "auth/get-actions": (text("""
+        SELECT u.first_name, u.last_name, r.role_name
+        FROM user_config u JOIN role_config r ON u.role_id = r.id
+        WHERE u.emp_code = :emp_code AND u.status = 'Active'
+    """), {"emp_code": "bench"}),
+    "product-selection/get_all_categories": (text("SELECT id, name FROM category_config WHERE status = 'Active'"), {}),
+    "machine-handler/get-machines": (text("SELECT * FROM machine_listings"), {}),
+    "role-handler/role-lists": (text("SELECT * FROM role_config"), {}),
+}
+
+
+async def sample(query, params, probe: bool) -> float:
+    started = time.perf_counter()
+    async with session_local() as session:
+        if probe:
+            await asyncio.wait_for(session.execute(text("select(1)")), timeout=3)
+        result = await session.execute(query, params)
+        result.fetchall()
+    return (time.perf_counter() - started) * 1000
+
+
+async def measure(query, params, probe: bool, samples: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            return await sample(query, params, probe)
+
+    return sorted(await asyncio.gather(*(bounded() for _ in range(samples))))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def main(args):
+    print(f"{'endpoint':40} {'mode':9} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    try:
+        for name, (query, params) in ENDPOINT_QUERIES.items():
+            for mode, probe in (("probe", True), ("no-probe", False)):
+                # Warm the pool so both modes measure steady state
+                await measure(query, params, probe, args.concurrency, args.concurrency)
+                latencies = await measure(query, params, probe, args.samples, args.concurrency)
+                print(f"{name:40} {mode:9} {percentile(latencies, 0.5):8.2f} {percentile(latencies, 0.99):8.2f} {statistics.fmean(latencies):8.2f}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="get_db probe latency benchmark")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+"""
+Response serialization for list endpoints: the old per-module convert_datetime rebuild
+plus stdlib JSONResponse against the shared orjson JSONResponse on the raw rows.
+
+Rows are real SQLAlchemy RowMappings (shaped like user_config) from an in-memory
+SQLite database, so no MySQL is needed.
+
+    python -m benchmarks.json_responses --rows 10000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse as StdlibJSONResponse
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, select
+
+from src.seedwork.responses import JSONResponse
+
+metadata = MetaData()
+users = Table(
+    "user_config", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("first_name", String(50)),
+    Column("last_name", String(50)),
+    Column("email_id", String(100)),
+    Column("emp_code", String(20)),
+    Column("role_id", Integer),
+    Column("status", String(20)),
+    Column("create_by", String(20)),
+    Column("updated_by", String(20)),
+    Column("create_date", DateTime),
+    Column("last_updated_date", DateTime),
+)
+
+
+def convert_datetime(value):
+    """The helper every module used to carry"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def load_rows(count: int):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    started = datetime(2024, 1, 1, 8, 0, 0)
+    with engine.begin() as connection:
+        connection.execute(users.insert(), [
+            {"first_name": "Bench", "last_name": f"User {index}", "email_id": f"user{index}@example.com",
+             "emp_code": f"EMP{index:06d}", "role_id": index % 3 + 1, "status": "Active", "create_by": "admin",
+             "updated_by": "admin", "create_date": started + timedelta(minutes=index),
+             "last_updated_date": started + timedelta(minutes=index, seconds=30)}
+            for index in range(count)
+        ])
+    with engine.connect() as connection:
+        return connection.execute(select(users)).mappings().all()
+
+
+def legacy(rows) -> bytes:
+    formatted = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in rows]
+    return StdlibJSONResponse(content={"data": formatted}, status_code=200).body
+
+
+def shared(rows) -> bytes:
+    return JSONResponse(content={"data": rows}, status_code=200).body
+
+
+def measure(render, rows, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), body
+
+
+def main(args):
+    rows = load_rows(args.rows)
+    legacy_time, legacy_body = measure(legacy, rows, args.repeat)
+    shared_time, shared_body = measure(shared, rows, args.repeat)
+
+    # Same payload, byte layout aside
+    assert json.loads(legacy_body) == json.loads(shared_body), "serializers disagree"
+
+    print(f"{'mode':10} {'rows':>8} {'median ms':>10} {'rows/sec':>12} {'bytes':>10}")
+    for mode, elapsed, body in (("legacy", legacy_time, legacy_body), ("shared", shared_time, shared_body)):
+        print(f"{mode:10} {args.rows:8d} {elapsed * 1000:10.2f} {args.rows / elapsed:12.0f} {len(body):10d}")
+    print(f"speedup {legacy_time / shared_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
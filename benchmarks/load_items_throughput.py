@@ -0,0 +1,68 @@
+"""
+Rows/sec for loading a pallet: the old one-INSERT-per-code loop against the bulk loader.
+
+Both modes run inside a transaction that is rolled back, so nothing is left behind.
+Needs an existing category and user id. Runs against DATABASE_URL.
+
+    python -m benchmarks.load_items_throughput --units 5000 --category-id 1 --user-id 1
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from sqlalchemy.sql import text
+from src.database_config import session_local, engine
+from src.load_item.bulk_loader import load_inventory_units
+
+# The statement load_items used to run once per item_code
+row_insert_query = text("""
+    INSERT INTO inventory_config
+    (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price)
+    VALUES
+    (:item_code, :category_id, :status, :create_by, :last_updated_by, NOW(), NOW(), :name, :price)
+""")
+
+
+async def row_by_row(db, item_codes, columns):
+    for item_code in item_codes:
+        await db.execute(row_insert_query, {"item_code": item_code, **columns})
+    return len(item_codes)
+
+
+async def bulk(db, item_codes, columns):
+    inserted, _ = await load_inventory_units(db, item_codes, columns)
+    return inserted
+
+
+async def run(loader, units: int, columns):
+    item_codes = [f"bench-{uuid.uuid4().hex[:12]}-{index}" for index in range(units)]
+    async with session_local() as db:
+        started = time.perf_counter()
+        try:
+            inserted = await loader(db, item_codes, columns)
+            elapsed = time.perf_counter() - started
+        finally:
+            await db.rollback()
+    return inserted, elapsed
+
+
+async def main(args):
+    columns = {
+        "category_id": args.category_id, "status": "Active", "create_by": args.user_id,
+        "last_updated_by": args.user_id, "name": f"bench-load-{uuid.uuid4().hex[:8]}", "price": 0,
+    }
+    print(f"{'mode':10} {'rows':>8} {'seconds':>9} {'rows/sec':>10}")
+    try:
+        for mode, loader in (("row-loop", row_by_row), ("bulk", bulk)):
+            inserted, elapsed = await run(loader, args.units, columns)
+            print(f"{mode:10} {inserted:8d} {elapsed:9.2f} {inserted / elapsed:10.0f}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="load_items insert throughput benchmark")
+    parser.add_argument("--units", type=int, default=5000)
+    parser.add_argument("--category-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True)
+    asyncio.run(main(parser.parse_args()))
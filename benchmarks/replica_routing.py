@@ -0,0 +1,109 @@
+"""
+Replica routing check against two local databases with simulated replication lag.
+A copier task applies primary rows to the "replica" only after --lag seconds, then
+requests go through the real get_db:
+
+    writer reads right after its write      -> primary (pinned), sees the write
+    another employee reads at the same time -> replica, still stale
+    writer reads after the pin window       -> replica again, stale for newer writes
+
+Defaults to two SQLite files (pip install aiosqlite); pass --primary-url / --replica-url
+to use two MySQL schemas instead.
+
+    python -m benchmarks.replica_routing --lag 1.5 --window 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="kiosk-replica-")
+    primary_url = args.primary_url or f"sqlite+aiosqlite:///{workdir}/primary.db"
+    replica_url = args.replica_url or f"sqlite+aiosqlite:///{workdir}/replica.db"
+    # The manager reads these when it is first imported
+    os.environ.update(DATABASE_URL=primary_url, DATABASE_REPLICA_URLS=replica_url,
+                      DB_READ_YOUR_WRITES_SECONDS=str(args.window), DB_POOL_SIZE="5", DB_POOL_WARMUP="0")
+
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.sql import text
+    from src.database_config import database_manager, get_db
+
+    primary, replica = database_manager.engine, database_manager.replica_engines[0]
+    for engine in (primary, replica):
+        async with engine.begin() as connection:
+            await connection.execute(text("DROP TABLE IF EXISTS replication_probe"))
+            await connection.execute(text("CREATE TABLE replication_probe (id INTEGER PRIMARY KEY, emp_code VARCHAR(20))"))
+
+    async def replicate():
+        """Ships each primary row to the replica once it is --lag seconds old"""
+        shipped, seen = 0, {}
+        while True:
+            async with primary.connect() as connection:
+                rows = (await connection.execute(text("SELECT id, emp_code FROM replication_probe WHERE id > :id ORDER BY id"), {"id": shipped})).fetchall()
+            now = time.monotonic()
+            for row in rows:
+                seen.setdefault(row.id, now)
+            due = [row for row in rows if now - seen[row.id] >= args.lag]
+            if due and due[0].id == shipped + 1:
+                async with replica.begin() as connection:
+                    await connection.execute(text("INSERT INTO replication_probe (id, emp_code) VALUES (:id, :emp_code)"),
+                                             [{"id": row.id, "emp_code": row.emp_code} for row in due])
+                shipped = due[-1].id
+            await asyncio.sleep(0.05)
+
+    app = FastAPI()
+
+    @app.post("/probe")
+    async def write(emp_code: str, db=Depends(get_db)):
+        await db.execute(text("INSERT INTO replication_probe (emp_code) VALUES (:emp_code)"), {"emp_code": emp_code})
+        await db.commit()
+        return {"ok": True}
+
+    @app.get("/probe")
+    async def read(emp_code: str, db=Depends(get_db)):
+        # emp_code only identifies the reader; the count is over every write
+        return {"count": (await db.execute(text("SELECT COUNT(*) FROM replication_probe"))).scalar()}
+
+    copier = asyncio.create_task(replicate())
+    checks = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://probe") as client:
+            async def count_seen_by(emp_code: str) -> int:
+                return (await client.get("/probe", params={"emp_code": emp_code})).json()["count"]
+
+            await client.post("/probe", params={"emp_code": "EMP1"})
+            checks.append(("writer reads its own write", await count_seen_by("EMP1"), 1))
+            checks.append(("other employee reads the lagging replica", await count_seen_by("EMP2"), 0))
+
+            await asyncio.sleep(args.lag + 0.5)
+            checks.append(("other employee after replication", await count_seen_by("EMP2"), 1))
+
+            await asyncio.sleep(max(0.0, args.window - args.lag))
+            await client.post("/probe", params={"emp_code": "EMP3"})
+            checks.append(("earlier writer back on the replica after its window", await count_seen_by("EMP1"), 1))
+            checks.append(("new writer reads its own write", await count_seen_by("EMP3"), 2))
+    finally:
+        copier.cancel()
+        await database_manager.shutdown()
+
+    failed = 0
+    for name, seen, expected in checks:
+        status = "ok" if seen == expected else "FAIL"
+        failed += status == "FAIL"
+        print(f"{status:5} {name}: saw {seen}, expected {expected}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replica routing and read-your-writes check")
+    parser.add_argument("--primary-url")
+    parser.add_argument("--replica-url")
+    parser.add_argument("--lag", type=float, default=1.5, help="simulated replication lag in seconds")
+    parser.add_argument("--window", type=float, default=3, help="DB_READ_YOUR_WRITES_SECONDS")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+Worker startup cost: how long `import server` takes, how long a uvicorn worker needs
+from spawn until it answers, and what the first database-backed request costs once
+it does, for each DB_POOL_WARMUP value given.
+
+uvicorn only accepts connections after the lifespan startup (pool warm-up included)
+has finished, so "ready" below is spawn until the first /metrics answer.
+
+    # DATABASE_URL must point at a reachable, migrated database
+    python -m benchmarks.startup_time --warmup 0 5 --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+API_PREFIX = "/kiosk-ausweg/v1"
+FIRST_REQUEST_PATH = f"{API_PREFIX}/product-selection/get_unique_products"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    """Fresh interpreter per run so nothing is cached in sys.modules"""
+    script = "import time; started = time.perf_counter(); import server; print(time.perf_counter() - started)"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def get(url: str, timeout: float = 10) -> int:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        response.read()
+        return response.status
+
+
+def boot_once(warmup: int, timeout: float):
+    port = free_port()
+    env = dict(os.environ, DB_POOL_WARMUP=str(warmup), DB_HEALTH_CHECK_INTERVAL="3600", AVAILABILITY_RECONCILE_INTERVAL="0",
+               OVERDUE_SCAN_INTERVAL="0", USAGE_ROLLUP_INTERVAL="0")
+    # The server refuses to start without one
+    env.setdefault("KIOSK_SESSION_SECRET", "startup-benchmark")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited during startup:\n{process.stderr.read().decode(errors='replace')}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"uvicorn not ready after {timeout}s")
+            try:
+                get(f"{base}/metrics", timeout=1)
+                break
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        request_started = time.perf_counter()
+        get(f"{base}{FIRST_REQUEST_PATH}")
+        first_request = time.perf_counter() - request_started
+        return ready, first_request
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(args):
+    if not os.getenv("DATABASE_URL"):
+        sys.exit("DATABASE_URL is not set")
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import server: median {statistics.median(imports) * 1000:.0f} ms over {args.runs} run(s)\n")
+
+    print(f"{'warmup':>6} {'ready ms':>10} {'first request ms':>18}")
+    for warmup in args.warmup:
+        results = [boot_once(warmup, args.timeout) for _ in range(args.runs)]
+        ready = statistics.median(result[0] for result in results)
+        first = statistics.median(result[1] for result in results)
+        print(f"{warmup:6d} {ready * 1000:10.0f} {first * 1000:18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker startup benchmark")
+    parser.add_argument("--warmup", type=int, nargs="+", default=[0, 5], help="DB_POOL_WARMUP values to compare")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30)
+    main(parser.parse_args())
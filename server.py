@@ -1,17 +1,56 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from urls import router
 from src.seedwork.logger import logging_component
-from celery import Celery 
+from src.monitoring.metrics import metrics
+from src.monitoring.middleware import PrometheusMiddleware
+from src.api.admission import AdmissionMiddleware
+from src.seedwork.responses import JSONResponse
+from src.database_config import database_manager
+from src.api.session_token import session_token_secret
+from src.product_selection.availability import availability_reconciler
+from src.inventory_unreturn.overdue_detector import overdue_detector
+from src.usage_reports.rollup import usage_rollup
+from src.machines.machine_registry import machine_registry
 
-# app and logger initilize 
-app = FastAPI(title = "kiosk-ausweg")
 logger = logging_component.get_gray_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refuse to start without a session secret shared by all workers
+    session_token_secret()
+    # Pool is warmed before the worker reports ready, so the first requests skip the connect handshake
+    warmed = await database_manager.startup()
+    # Known machine ids, so the first kiosk events are labelled by machine rather than "unknown"
+    await machine_registry.refresh()
+    availability_reconciler.ensure_started()
+    overdue_detector.ensure_started()
+    usage_rollup.ensure_started()
+    logger.info(f"Database pool warmed with {warmed} connection(s)", extra = {'source':'Application Startup','host':'system host','user':'startup@ausweginfocontrols.com'})
+    try:
+        yield
+    finally:
+        await availability_reconciler.stop()
+        await overdue_detector.stop()
+        await usage_rollup.stop()
+        await database_manager.shutdown()
+        logger.info("Database connections closed", extra = {'source':'Application Shutdown','host':'system host','user':'startup@ausweginfocontrols.com'})
+
+
+# app and logger initilize 
+app = FastAPI(title = "kiosk-ausweg", default_response_class=JSONResponse, lifespan=lifespan)
+
 # router included
 app.include_router(router, prefix="/kiosk-ausweg/v1")
 logger.info("Routes are initialized", extra = {'source':'Application Startup','host':'system host','user':'startup@ausweginfocontrols.com'})
 
+# rate limits and concurrency caps; added first so it runs inside CORS and its 429/503 carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+logger.info("Admission control is initialized", extra = {'source':'Application Startup','host':'system host','user':'startup@ausweginfocontrols.com'})
+
 origins = ["*"]
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +61,24 @@ app.add_middleware(
 )
 logger.info("CORS are initialized", extra = {'source':'Application Startup','host':'system host','user':'startup@ausweginfocontrols.com'})
 
+# prometheus scrape endpoint, kept outside the versioned prefix
+app.add_middleware(PrometheusMiddleware)
+app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+logger.info("Metrics are initialized", extra = {'source':'Application Startup','host':'system host','user':'startup@ausweginfocontrols.com'})
+
+
+_celery_app = None
 
 
-celery_app = Celery("tasks", broker="redis://localhost:6379/0")
+def get_celery_app():
+    # Built on first send, so importing the app neither needs celery installed nor a reachable broker
+    global _celery_app
+    if _celery_app is None:
+        from celery import Celery
+        _celery_app = Celery("tasks", broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+    return _celery_app
+
 
 def send_email_task(to_email: str, subject: str, body: str):
-    celery_app.send_task("src.tasks.email_sending.send_email", args=[to_email, subject, body])
+    get_celery_app().send_task("src.tasks.email_sending.send_email", args=[to_email, subject, body])
+
@@ -0,0 +1,186 @@
+"""
+Admission control in front of the HTTP routes that take a database session: a token
+bucket per client (the kiosk's X-Machine-Id when machine_listings knows it, else the
+client address) with separate read and write budgets, an in-flight cap per client, and
+a worker-wide cap on concurrent handlers sized to the connection pool. Requests past a
+budget get a 429, requests that find no free slot a 503, both before any connection is
+checked out, so one stuck kiosk cannot hold the pool for everyone else. Images, docs
+and metrics are not admitted.
+"""
+import asyncio
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from dotenv import load_dotenv
+
+# Application modules
+from src.api.rate_limit import MemoryTokenBuckets, RedisTokenBuckets
+from src.database_config.pool_config import resolve_pool_settings
+from src.database_config.read_routing import READ_METHODS
+from src.images.image_streaming import IMAGE_ROUTE_PREFIX
+from src.machines.machine_registry import machine_registry
+from src.monitoring.metrics import ADMISSION_REJECTIONS
+from src.seedwork.responses import JSONResponse
+
+load_dotenv()
+
+RATE_LIMITED_MESSAGE = "Too many requests from this client, retry later"
+OVERLOADED_MESSAGE = "Server is busy, retry later"
+
+# No database session behind these; the pool view has to answer while the server is saturated
+EXEMPT_PATHS = ("/metrics", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json",
+                "/kiosk-ausweg/v1/monitoring/db-pool")
+# Images are fetched by <img> tags, which cannot send X-Machine-Id, so every kiosk behind one
+# proxy would share a single host budget. They are served from the image cache and browser
+# caches, with a short read on a miss.
+EXEMPT_PREFIXES = (IMAGE_ROUTE_PREFIX + "/",)
+
+
+@dataclass
+class AdmissionSettings:
+    read_rate: float
+    read_burst: float
+    write_rate: float
+    write_burst: float
+    max_concurrent: int
+    max_per_client: int
+    queue_timeout: float
+    retry_after: int
+    redis_url: Optional[str]
+
+
+def resolve_admission_settings() -> AdmissionSettings:
+    """
+    Rates are requests per second per client and 0 turns that limit off, as does 0 for
+    either concurrency cap. The worker-wide cap defaults to the pool size plus overflow,
+    so an admitted request never queues on the pool itself.
+    """
+    pool_settings = resolve_pool_settings()
+    return AdmissionSettings(
+        read_rate=float(os.getenv('RATE_LIMIT_READ_PER_SECOND', 10)),
+        read_burst=float(os.getenv('RATE_LIMIT_READ_BURST', 40)),
+        write_rate=float(os.getenv('RATE_LIMIT_WRITE_PER_SECOND', 2)),
+        write_burst=float(os.getenv('RATE_LIMIT_WRITE_BURST', 10)),
+        max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', pool_settings.pool_size + pool_settings.max_overflow)),
+        max_per_client=int(os.getenv('ADMISSION_MAX_PER_CLIENT', 4)),
+        queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 0.25)),
+        retry_after=pool_settings.retry_after,
+        redis_url=os.getenv('RATE_LIMIT_REDIS_URL') or None,
+    )
+
+
+def header_value(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1").strip() or None
+    return None
+
+
+def client_key(scope: Scope) -> str:
+    """
+    Kiosks send X-Machine-Id; behind a proxy every kiosk shares one address, so the
+    address is only the key when the header is missing. The header is client supplied:
+    an id machine_listings does not know falls back to the address, so rotating it buys
+    neither a fresh budget nor the eviction of real kiosks' buckets.
+    """
+    machine_id = header_value(scope, b"x-machine-id")
+    if machine_id and machine_registry.is_known(machine_id):
+        return f"machine:{machine_id}"
+    client = scope.get("client")
+    return f"host:{client[0] if client else 'unknown'}"
+
+
+def rejection(status_code: int, message: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": [{"msg": message}]},
+                        headers={"Retry-After": str(max(1, math.ceil(retry_after))), "X-Request-ID": "0"})
+
+
+class AdmissionMiddleware:
+    """Token buckets and concurrency caps per worker; buckets move to Redis when RATE_LIMIT_REDIS_URL is set"""
+
+    def __init__(self, app: ASGIApp, settings: Optional[AdmissionSettings] = None, excluded_paths=EXEMPT_PATHS,
+                 excluded_prefixes=EXEMPT_PREFIXES) -> None:
+        self.app = app
+        self.settings = settings or resolve_admission_settings()
+        self.excluded_paths = set(excluded_paths)
+        self.excluded_prefixes = tuple(excluded_prefixes)
+        if self.settings.redis_url:
+            self.buckets = RedisTokenBuckets(self.settings.redis_url)
+        else:
+            self.buckets = MemoryTokenBuckets()
+        self.in_flight_per_client: Dict[str, int] = {}
+        # Created on the first request so it binds to the server's event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.settings.max_concurrent)
+        return self._slots
+
+    async def rate_limit_wait(self, key: str, kind: str) -> float:
+        if kind == "read":
+            rate, burst = self.settings.read_rate, self.settings.read_burst
+        else:
+            rate, burst = self.settings.write_rate, self.settings.write_burst
+        if rate <= 0:
+            return 0.0
+        # Reads and writes draw on separate buckets, so a burst of polling never blocks a take
+        return await self.buckets.take(f"{kind}:{key}", rate, burst)
+
+    async def acquire_slot(self) -> bool:
+        if self.settings.max_concurrent <= 0:
+            return True
+        try:
+            await asyncio.wait_for(self.slots.acquire(), timeout=self.settings.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def release_slot(self) -> None:
+        if self.settings.max_concurrent > 0:
+            self.slots.release()
+
+    def is_excluded(self, path: str) -> bool:
+        return path in self.excluded_paths or path.startswith(self.excluded_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # WebSockets (the machine dashboard) are long-lived and open their session once; left alone
+        if scope["type"] != "http" or self.is_excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope)
+        # Checked before the bucket, so requests refused for concurrency do not spend tokens
+        max_per_client = self.settings.max_per_client
+        if max_per_client > 0 and self.in_flight_per_client.get(key, 0) >= max_per_client:
+            ADMISSION_REJECTIONS.labels(reason="client_concurrency").inc()
+            await rejection(429, RATE_LIMITED_MESSAGE, 1)(scope, receive, send)
+            return
+
+        kind = "read" if scope["method"] in READ_METHODS else "write"
+        wait = await self.rate_limit_wait(key, kind)
+        if wait > 0:
+            ADMISSION_REJECTIONS.labels(reason=f"{kind}_rate_limited").inc()
+            await rejection(429, RATE_LIMITED_MESSAGE, wait)(scope, receive, send)
+            return
+
+        # Counted while queued too, so a client cannot park more than its share in the queue
+        self.in_flight_per_client[key] = self.in_flight_per_client.get(key, 0) + 1
+        try:
+            if not await self.acquire_slot():
+                ADMISSION_REJECTIONS.labels(reason="overloaded").inc()
+                await rejection(503, OVERLOADED_MESSAGE, self.settings.retry_after)(scope, receive, send)
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.release_slot()
+        finally:
+            remaining = self.in_flight_per_client[key] - 1
+            if remaining:
+                self.in_flight_per_client[key] = remaining
+            else:
+                del self.in_flight_per_client[key]
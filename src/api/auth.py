@@ -1,37 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
 from fastapi.responses import JSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from typing import AsyncGenerator
 from src.database_config import get_db
-from src.seedwork.models.status_msg_model import StatusMessage
+from src.users.user_resolver import user_resolver
+from src.api.session_token import (
+    issue_session_token, SESSION_TOKEN_TTL_SECONDS, ACTION_TAKE, ACTION_RETURN, ACTION_RETURN_DAMAGED, ACTION_ADMIN
+)
 
 router = APIRouter(prefix="/auth-handler")
 
 # ✅ Fetch Employee Role & Allowed Actions
 async def get_employee_actions(emp_code: str = Form(...), db_engine: AsyncGenerator = Depends(get_db)):
-    query = text("""
-        SELECT u.first_name, u.last_name, r.role_name 
-        FROM user_config u 
-        JOIN role_config r ON u.role_id = r.id 
-        WHERE u.emp_code = :emp_code AND u.status = 'Active'
-    """)
-    result = await db_engine.execute(query, {"emp_code": emp_code})
-    user = result.mappings().first()
+    user = await user_resolver.resolve(db_engine, emp_code)
 
-    if not user:
+    if not user or not user.is_active or not user.role_name:
         raise HTTPException(status_code=404, detail=[{"msg": "Employee not found or role not assigned"}])
 
-    role_name = user["role_name"].lower()
-    actions = ["Take Product", "Return Product", "Return Damaged Product"]
+    role_name = user.role_name.lower()
+    actions = [ACTION_TAKE, ACTION_RETURN, ACTION_RETURN_DAMAGED]
     
     # ✅ If role contains "admin", allow "Admin Mode"
     if "admin" in role_name:
-        actions.append("Admin Mode")
+        actions.append(ACTION_ADMIN)
+
+    # ✅ Short-lived signed token; later kiosk calls send it instead of the emp_code
+    session_token = issue_session_token(user.id, user.emp_code, role_name, actions)
 
     return JSONResponse(content={
         "emp_code": emp_code,
-        "name": f"{user['first_name']} {user['last_name']}",
+        "name": user.name,
         "role": role_name,
-        "actions": actions
+        "actions": actions,
+        "session_token": session_token,
+        "token_type": "bearer",
+        "expires_in": SESSION_TOKEN_TTL_SECONDS
     }, status_code=200)
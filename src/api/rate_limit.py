@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+# Application modules
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+
+def refill(tokens: float, updated_at: float, now: float, rate: float, burst: float) -> Tuple[float, float]:
+    """
+    Token bucket step: tops the bucket up for the time since updated_at and takes one token.
+    Returns (tokens left, seconds until a token would be available; 0 when one was taken).
+    """
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryTokenBuckets:
+    """Per-worker buckets; the least recently used key is dropped past max_entries"""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens, wait = refill(tokens, updated_at, now, rate, burst)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Same step as refill(), atomic on the Redis side and timed by the Redis clock so workers on
+# different hosts agree. The key expires once a full bucket would have refilled anyway.
+REDIS_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisTokenBuckets:
+    """
+    Buckets shared by every worker through Redis, so a kiosk's budget does not grow with
+    the worker count. redis is imported on first use and only needed when this is configured.
+    If Redis cannot be reached the request is decided by this worker's own buckets instead.
+    """
+
+    def __init__(self, url: str, key_prefix: str = "kiosk-rate-limit:", max_entries: int = 10000) -> None:
+        self.url = url
+        self.key_prefix = key_prefix
+        self.fallback = MemoryTokenBuckets(max_entries)
+        self.backend_down = False
+        self._script = None
+
+    def script(self):
+        if self._script is None:
+            import redis.asyncio as redis
+            # Short timeouts: a slow Redis must not become the latency of every request
+            client = redis.from_url(self.url, socket_connect_timeout=0.1, socket_timeout=0.1)
+            self._script = client.register_script(REDIS_TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        try:
+            wait = float(await self.script()(keys=[self.key_prefix + key], args=[rate, burst]))
+        except Exception as error:
+            # Logged on the transition only, not once per request while Redis is away
+            if not self.backend_down:
+                self.backend_down = True
+                logger.warning(f"Rate limit backend unavailable, using local buckets {error}",
+                               extra={'host': 'system', 'user': 'system', 'source': 'Rate Limit'})
+            return await self.fallback.take(key, rate, burst)
+        if self.backend_down:
+            self.backend_down = False
+            logger.info("Rate limit backend reachable again", extra={'host': 'system', 'user': 'system', 'source': 'Rate Limit'})
+        return wait
+
+    def __len__(self) -> int:
+        return len(self.fallback)
@@ -0,0 +1,104 @@
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from dotenv import load_dotenv
+
+# Application modules
+from src.seedwork.logger import logging_component
+
+load_dotenv()
+logger = logging_component.get_gray_logger()
+
+ACTION_TAKE = "Take Product"
+ACTION_RETURN = "Return Product"
+ACTION_RETURN_DAMAGED = "Return Damaged Product"
+ACTION_ADMIN = "Admin Mode"
+
+SESSION_TOKEN_ALGORITHM = "HS256"
+SESSION_TOKEN_TYPE = "kiosk-session"
+SESSION_TOKEN_TTL_SECONDS = int(os.getenv("KIOSK_SESSION_TTL_SECONDS", 300))
+
+_session_token_secret: Optional[str] = None
+
+
+def session_token_secret() -> str:
+    """
+    KIOSK_SESSION_SECRET, shared by every worker. Without it a token only verifies on the
+    worker that issued it, which shows up as random 401s, so a missing secret stops the app
+    at startup. KIOSK_SESSION_EPHEMERAL_SECRET=true allows a per-process secret for
+    single-worker development only.
+    """
+    global _session_token_secret
+    if _session_token_secret is None:
+        secret = os.getenv("KIOSK_SESSION_SECRET")
+        if not secret:
+            workers = max(1, int(os.getenv("WEB_CONCURRENCY", os.getenv("UVICORN_WORKERS", 1))))
+            if os.getenv("KIOSK_SESSION_EPHEMERAL_SECRET", "").lower() not in ("1", "true", "yes") or workers > 1:
+                raise RuntimeError("KIOSK_SESSION_SECRET is not set; every worker needs the same secret "
+                                   "(KIOSK_SESSION_EPHEMERAL_SECRET=true is only accepted with a single worker)")
+            secret = secrets.token_urlsafe(32)
+            logger.warning("KIOSK_SESSION_SECRET is not set, using a per-process secret for development",
+                           extra={'host': 'system host', 'user': 'startup@ausweginfocontrols.com', 'source': 'Kiosk Session'})
+        _session_token_secret = secret
+    return _session_token_secret
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class KioskSession:
+    user_id: int
+    emp_code: str
+    role: str
+    actions: Tuple[str, ...]
+
+
+def issue_session_token(user_id: int, emp_code: str, role: str, actions: List[str]) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": str(user_id),
+        "emp": emp_code,
+        "role": role,
+        "actions": actions,
+        "typ": SESSION_TOKEN_TYPE,
+        "iat": now,
+        "exp": now + SESSION_TOKEN_TTL_SECONDS,
+    }
+    return jwt.encode(claims, session_token_secret(), algorithm=SESSION_TOKEN_ALGORITHM)
+
+
+def verify_session_token(token: str) -> KioskSession:
+    """Checks signature and expiry locally; no database lookup"""
+    try:
+        claims = jwt.decode(token, session_token_secret(), algorithms=[SESSION_TOKEN_ALGORITHM],
+                            options={"require": ["sub", "exp", "typ"]})
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Session expired, scan your badge again.")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid session token.")
+
+    if claims.get("typ") != SESSION_TOKEN_TYPE:
+        raise HTTPException(status_code=401, detail="Invalid session token.")
+    return KioskSession(int(claims["sub"]), claims.get("emp", ""), claims.get("role", ""), tuple(claims.get("actions", ())))
+
+
+async def kiosk_session(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> KioskSession:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Missing session token.", headers={"WWW-Authenticate": "Bearer"})
+    return verify_session_token(credentials.credentials)
+
+
+def require_action(action: str):
+    """Dependency factory: a verified session whose token grants `action`"""
+
+    async def dependency(session: KioskSession = Depends(kiosk_session)) -> KioskSession:
+        if action not in session.actions:
+            raise HTTPException(status_code=403, detail=f"'{action}' is not allowed for this session.")
+        return session
+
+    return dependency
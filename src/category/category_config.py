@@ -1,23 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from fastapi.responses import JSONResponse
-from datetime import datetime
+from src.seedwork.responses import JSONResponse
 from sqlalchemy import bindparam 
 import base64
 from typing import Optional
 from src.database_config import get_db  
+from src.images.image_streaming import image_url
+from src.images.image_pipeline import save_upload
+from src.users.user_resolver import user_resolver
 
 router = APIRouter(prefix="/category-handler")
 
 
-# Function to convert datetime to string for JSON response
-def convert_datetime(value):
-    if isinstance(value, datetime):
-        return value.isoformat()
-    return value
-
-
 @router.post("/create-category")
 async def create_category(
     name: str = Form(...),
@@ -29,40 +24,36 @@ async def create_category(
 ):
     try:
         # Validate create_by and last_updated_by (convert emp_code to user_id)
-        user_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-
         # Validate create_by
-        result = await db.execute(user_query, {"emp_code": create_by})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, create_by)
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {create_by} not found."})
         create_by_id = user_data.id
 
         # Validate last_updated_by
-        result = await db.execute(user_query, {"emp_code": last_updated_by})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, last_updated_by)
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {last_updated_by} not found."})
         last_updated_by_id = user_data.id
 
-        # Read and store image as binary
-        image_blob = None
-        if file:
-            image_blob = await file.read()
+        # Normalize, hash and store the image once
+        picture_hash = await save_upload(db, file)
 
         # Insert into category_config
         query = text("""
-            INSERT INTO category_config (name, picture_blob, status, create_by, last_updated_by, create_date, last_updated_date)
-            VALUES (:name, :image_blob, :status, :create_by, :last_updated_by, NOW(), NOW())
+            INSERT INTO category_config (name, picture_hash, status, create_by, last_updated_by, create_date, last_updated_date)
+            VALUES (:name, :picture_hash, :status, :create_by, :last_updated_by, NOW(), NOW())
         """)
         await db.execute(query, {
-            "name": name, "image_blob": image_blob, "status": status,
+            "name": name, "picture_hash": picture_hash, "status": status,
             "create_by": create_by_id, "last_updated_by": last_updated_by_id
         })
         await db.commit()
 
         return JSONResponse(content={"message": "Category created successfully"}, status_code=201)
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
@@ -73,7 +64,7 @@ async def create_category(
 async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
     try:
         query = text("""
-            SELECT id, name, picture_blob, status, create_by, last_updated_by, create_date, last_updated_date
+            SELECT id, name, picture_blob, picture_hash, status, create_by, last_updated_by, create_date, last_updated_date
             FROM category_config WHERE id = :category_id
         """)
         result = await db.execute(query, {"category_id": category_id})
@@ -82,12 +73,15 @@ async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
         if not category:
             raise HTTPException(status_code=404, detail=f"Category with ID {category_id} not found")
 
-        category_dict = {key: convert_datetime(value) for key, value in dict(category).items()}
+        category_dict = dict(category)
 
         # Convert image blob to Base64 string
         if category["picture_blob"]:
             category_dict["picture_blob"] = base64.b64encode(category["picture_blob"]).decode("utf-8")
 
+        category_dict["image_url"] = image_url("category", category["id"], category["last_updated_date"],
+                                               category["picture_blob"] is not None, category["picture_hash"], "original")
+
         return JSONResponse(content={"data": category_dict}, status_code=200)
 
     except Exception as e:
@@ -126,7 +120,7 @@ async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
 async def get_all_categories(db: AsyncSession = Depends(get_db)):
     try:
         query = text("""
-            SELECT c.id, c.name, c.picture_blob, c.status, 
+            SELECT c.id, c.name, c.picture_hash, c.picture_blob IS NOT NULL AS has_image, c.status, 
                    uc1.emp_code AS create_by, 
                    uc2.emp_code AS last_updated_by, 
                    c.create_date, c.last_updated_date
@@ -139,11 +133,10 @@ async def get_all_categories(db: AsyncSession = Depends(get_db)):
 
         category_list = []
         for category in categories:
-            category_dict = {key: convert_datetime(value) for key, value in dict(category).items()}
+            category_dict = {key: value for key, value in category.items() if key not in ("has_image", "picture_hash")}
             
-            # Convert image blob to Base64 string
-            if category["picture_blob"]:
-                category_dict["picture_blob"] = base64.b64encode(category["picture_blob"]).decode("utf-8")
+            # Images are served by the streaming endpoint, the list only carries the thumbnail URL
+            category_dict["image_url"] = image_url("category", category["id"], category["last_updated_date"], category["has_image"], category["picture_hash"])
             
             category_list.append(category_dict)
 
@@ -165,37 +158,35 @@ async def update_category(
 ):
     try:
         # Convert emp_code to user_id
-        user_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(user_query, {"emp_code": last_updated_by})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, last_updated_by)
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {last_updated_by} not found."})
         last_updated_by_id = user_data.id
 
         # Fetch existing category details
-        query = text("SELECT name, status, picture_blob FROM category_config WHERE id = :category_id")
+        query = text("SELECT name, status FROM category_config WHERE id = :category_id")
         result = await db.execute(query, {"category_id": category_id})
         category = result.mappings().first()
 
         if not category:
             raise HTTPException(status_code=404, detail=f"Category with ID {category_id} not found")
 
-        # Keep existing image unless a new file is uploaded
-        image_data = category["picture_blob"]
-        if file:
-            image_data = await file.read()  # Keep as raw bytes (No Base64 encoding)
-
         updated_values = {
             "name": name if name else category["name"],
             "status": status if status else category["status"],
-            "image": image_data,  # Store as raw bytes
             "last_updated_by": last_updated_by_id
         }
 
-        # Update query (Store image as BLOB, not Base64)
-        query = text("""
+        # Keep existing image unless a new file is uploaded; a new one replaces the legacy blob
+        image_clause = ""
+        picture_hash = await save_upload(db, file)
+        if picture_hash:
+            updated_values["picture_hash"] = picture_hash
+            image_clause = "picture_hash = :picture_hash, picture_blob = NULL,"
+
+        query = text(f"""
             UPDATE category_config
-            SET name = :name, status = :status, picture_blob = :image,
+            SET name = :name, status = :status, {image_clause}
                 last_updated_by = :last_updated_by, last_updated_date = NOW()
             WHERE id = :category_id
         """)
@@ -208,6 +199,8 @@ async def update_category(
 
         return JSONResponse(content={"message": "Category updated successfully"}, status_code=200)
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
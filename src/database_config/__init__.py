@@ -1,8 +1,18 @@
 from src.database_config.database import AsyncDatabaseManager
 
 database_manager = AsyncDatabaseManager.get_instance()
-engine = database_manager.engine
-session_local = database_manager.session_local
 metadata = database_manager.metadata
 get_db = database_manager.get_db
-websocket_with_db = database_manager.websocket_with_db()
\ No newline at end of file
+websocket_with_db = database_manager.websocket_with_db()
+
+
+def session_local(*args, **kwargs):
+    # The engine behind the sessions is built on first use, not when this package is imported
+    return database_manager.session_local(*args, **kwargs)
+
+
+def __getattr__(name):
+    # `from src.database_config import engine` still works, it just builds the engine at that point
+    if name == "engine":
+        return database_manager.engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
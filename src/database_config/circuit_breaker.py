@@ -0,0 +1,62 @@
+import time
+from sqlalchemy.exc import DisconnectionError
+
+# MySQL client errors meaning the server could not be reached or dropped the connection:
+# connect failed (2002, 2003), server gone away (2006) and lost during a query (2013, 2055)
+CONNECTIVITY_ERROR_CODES = frozenset({2002, 2003, 2006, 2013, 2055})
+
+
+def is_connectivity_error(error: BaseException) -> bool:
+    """
+    Only these trip the breaker. Deadlocks, lock-wait timeouts and other statement
+    errors come from a database that is up, and a full pool from one that is busy.
+    """
+    if isinstance(error, DisconnectionError) or getattr(error, "connection_invalidated", False):
+        return True
+    args = getattr(getattr(error, "orig", None), "args", ())
+    return bool(args) and args[0] in CONNECTIVITY_ERROR_CODES
+
+
+class CircuitBreaker:
+    """
+    Trips after `failure_threshold` consecutive database failures. While open, requests are
+    refused without touching the pool; after `reset_timeout` seconds traffic is let through
+    again (half-open) and the next success or failure decides the state.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 0
+        return max(1, int(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def allow_request(self) -> bool:
+        return self.state != self.OPEN
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
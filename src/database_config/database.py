@@ -1,13 +1,23 @@
 import os
+import time
 import asyncio
+import itertools
 from functools import wraps
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.exc import OperationalError, TimeoutError, DisconnectionError, ArgumentError, SQLAlchemyError
-from sqlalchemy.pool import AsyncAdaptedQueuePool
-from sqlalchemy import MetaData, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.orm import Session
+from sqlalchemy import MetaData, event
 from fastapi import HTTPException, WebSocket, WebSocketDisconnect, Request, WebSocketException
 from dotenv import load_dotenv
 from src.database_config.models.db_error_description import DatabaseExceptionDescription, SourceRelatedPopouts
+from src.database_config.circuit_breaker import CircuitBreaker, is_connectivity_error
+from src.database_config.health_monitor import DatabaseHealthMonitor
+from src.database_config.pool_config import resolve_pool_settings
+from src.database_config.pool_metrics import PoolMetrics
+from src.database_config.read_routing import READ_METHODS, ReadYourWritesTracker, read_your_writes_keys
+from src.monitoring.metrics import DB_ERRORS, DB_SESSION_ROUTES, instrument_engine
 from src.seedwork.logger import logging_component
 
 
@@ -15,8 +25,10 @@ logger = logging_component.get_gray_logger()
 
 load_dotenv()
 
-database_url = os.getenv("DATABASE_URL")
-print(f"Database URL from env: {database_url}")
+
+class PrimarySession(Session):
+    """Sync session behind primary AsyncSessions, so commit events are scoped to the primary"""
+
 
 class AsyncDatabaseManager:
     _instance = None
@@ -29,42 +41,246 @@ class AsyncDatabaseManager:
 
     def __init__(self):
         self.database_url = os.getenv('DATABASE_URL')
+        # Optional read replicas (comma separated); GET requests are served from them in turn
+        self.replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+        # After a commit, the writer's reads stay on the primary this long (covers replication lag)
+        self.read_tracker = ReadYourWritesTracker(float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5)))
         self.database_error_description = DatabaseExceptionDescription()
         self.error_sources = SourceRelatedPopouts()
-        self.engine = create_async_engine(
-            self.database_url,
-            pool_size=int(os.getenv('DB_POOL_SIZE',750)),
-            max_overflow=0,
-            pool_timeout=300,
-            pool_recycle=1800,
+        self.pool_settings = resolve_pool_settings()
+        self.metadata = MetaData()
+        # Liveness is checked at pool checkout (idle connections only) and by a background
+        # monitor, never with an extra query per request
+        self.ping_idle_seconds = float(os.getenv('DB_PING_IDLE_SECONDS', 30))
+        # Connections opened by the app lifespan before the worker reports ready
+        self.pool_warmup = min(int(os.getenv('DB_POOL_WARMUP', 5)), self.pool_settings.pool_size)
+        self.pool_warmup_timeout = float(os.getenv('DB_POOL_WARMUP_TIMEOUT', 5))
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('DB_BREAKER_FAILURE_THRESHOLD', 3)),
+            reset_timeout=float(os.getenv('DB_BREAKER_RESET_TIMEOUT', 15)),
+        )
+        # The engine and everything bound to it are built on first use, not at import
+        self._engine: Optional[AsyncEngine] = None
+        self._session_local = None
+        self._pool_metrics = None
+        self._health_monitor = None
+        self._probe_engine: Optional[AsyncEngine] = None
+        self._replica_engines: List[AsyncEngine] = []
+        self._replica_sessions = None
+
+    def create_engine(self, url: str) -> AsyncEngine:
+        # Each replica is its own server, so it gets the same per-worker pool as the primary
+        engine = create_async_engine(
+            url,
+            pool_size=self.pool_settings.pool_size,
+            max_overflow=self.pool_settings.max_overflow,
+            pool_timeout=self.pool_settings.pool_timeout,
+            pool_recycle=self.pool_settings.pool_recycle,
             poolclass=AsyncAdaptedQueuePool,
             echo=False
         )
-        self.session_local = async_sessionmaker(
-            bind=self.engine,
+        instrument_engine(engine)
+        self.register_pool_events(engine)
+        return engine
+
+    def build_engine(self):
+        if self._engine is not None:
+            return
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL is not set")
+        engine = self.create_engine(self.database_url)
+        self._pool_metrics = PoolMetrics(engine)
+        self._session_local = async_sessionmaker(
+            bind=engine,
             autocommit=False,
             autoflush=True,
+            sync_session_class=PrimarySession,
         )
-        self.metadata = MetaData()
+        self._replica_engines = [self.create_engine(url) for url in self.replica_urls]
+        self._replica_sessions = itertools.cycle([
+            async_sessionmaker(bind=replica, autocommit=False, autoflush=True) for replica in self._replica_engines
+        ]) if self._replica_engines else None
+        # Probes open their own connection each time instead of queueing behind requests for the pool
+        self._probe_engine = create_async_engine(self.database_url, poolclass=NullPool)
+        self._health_monitor = DatabaseHealthMonitor(
+            self._probe_engine,
+            self.circuit_breaker,
+            interval=float(os.getenv('DB_HEALTH_CHECK_INTERVAL', 5)),
+            timeout=float(os.getenv('DB_HEALTH_CHECK_TIMEOUT', 3)),
+        )
+        self._engine = engine
+
+        @event.listens_for(PrimarySession, "after_commit")
+        def pin_writer_to_primary(session):
+            keys = session.info.get("read_your_writes_keys")
+            if keys:
+                self.read_tracker.pin(keys)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.build_engine()
+        return self._engine
+
+    @property
+    def session_local(self):
+        self.build_engine()
+        return self._session_local
+
+    @property
+    def pool_metrics(self) -> PoolMetrics:
+        self.build_engine()
+        return self._pool_metrics
+
+    @property
+    def health_monitor(self) -> DatabaseHealthMonitor:
+        self.build_engine()
+        return self._health_monitor
+
+    @property
+    def replica_engines(self) -> List[AsyncEngine]:
+        self.build_engine()
+        return self._replica_engines
+
+    async def warm_up(self) -> int:
+        """Opens pool_warmup connections per engine side by side and returns them to the pool idle"""
+        if self.pool_warmup <= 0:
+            return 0
+        engines = [self.engine, *self.replica_engines]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(engine.connect(), timeout=self.pool_warmup_timeout)
+              for engine in engines for _ in range(self.pool_warmup)),
+            return_exceptions=True,
+        )
+        opened = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Pool warm-up connection failed {result}", extra={'host': 'system', 'user': 'system', 'source': self.error_sources.database_connectivity_sources})
+                continue
+            await result.close()
+            opened += 1
+        return opened
+
+    async def startup(self) -> int:
+        """Called from the app lifespan before the worker accepts requests"""
+        opened = await self.warm_up()
+        self.health_monitor.ensure_started()
+        return opened
+
+    async def shutdown(self) -> None:
+        """Stops the health monitor and closes every pooled connection"""
+        if self._engine is None:
+            return
+        await self._health_monitor.stop()
+        await self._probe_engine.dispose()
+        await self._engine.dispose()
+        for replica in self._replica_engines:
+            await replica.dispose()
+
+    def register_pool_events(self, engine: AsyncEngine):
+        dialect = engine.dialect
+
+        @event.listens_for(engine.sync_engine, "checkin")
+        def mark_idle(dbapi_connection, connection_record):
+            connection_record.info["checked_in_at"] = time.monotonic()
+
+        @event.listens_for(engine.sync_engine, "checkout")
+        def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+            # Busy connections are known good; only ones that sat idle may have been dropped by MySQL
+            checked_in_at = connection_record.info.get("checked_in_at")
+            if checked_in_at is None or time.monotonic() - checked_in_at < self.ping_idle_seconds:
+                return
+            try:
+                dialect.do_ping(dbapi_connection)
+            except Exception as error:
+                # The pool invalidates this connection and retries the checkout with a fresh one
+                raise DisconnectionError(f"Idle connection failed ping: {error}")
+
+    def circuit_open_error(self):
+        return HTTPException(status_code=503, detail=[{"msg": self.database_error_description.connection_issue}],
+                             headers={"Retry-After": str(self.circuit_breaker.retry_after), "X-Request-ID": "0"})
+
+    async def open_replica_session(self, request: Request):
+        """A replica session with its connection checked out, or None when the replica is unreachable"""
+        session = next(self._replica_sessions)()
+        try:
+            await session.connection()
+            return session
+        except (OperationalError, DisconnectionError, TimeoutError, asyncio.TimeoutError) as error:
+            await session.close()
+            logger.warning(f"Replica unavailable, reading from primary {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_connectivity_sources})
+            return None
+
+    async def open_session(self, request: Request):
+        """
+        GET / HEAD go to a replica unless the caller committed on the primary within the
+        read-your-writes window; everything else, and every read without replicas, uses the primary.
+        """
+        keys = None
+        if self.replica_engines:
+            keys = read_your_writes_keys(request)
+            if request.method in READ_METHODS:
+                if self.read_tracker.is_pinned(keys):
+                    DB_SESSION_ROUTES.labels(target="pinned").inc()
+                else:
+                    session = await self.open_replica_session(request)
+                    DB_SESSION_ROUTES.labels(target="replica" if session is not None else "fallback").inc()
+                    if session is not None:
+                        return session
+            else:
+                DB_SESSION_ROUTES.labels(target="primary").inc()
+        else:
+            DB_SESSION_ROUTES.labels(target="primary").inc()
+
+        session = self.session_local()
+        if keys:
+            # Read by the after_commit hook to pin this caller to the primary
+            session.info["read_your_writes_keys"] = keys
+        # Check out the connection up front so the wait is measured and a full pool fails fast
+        checkout_started = time.perf_counter()
+        try:
+            await session.connection()
+        except BaseException:
+            await session.close()
+            raise
+        self.pool_metrics.observe_wait(time.perf_counter() - checkout_started)
+        return session
 
     # Need to remove the boilerplate code    
     async def get_db(self, request: Request):
+            # Fail fast without opening a connection while the database is known to be down
+            if not self.circuit_breaker.allow_request():
+                DB_ERRORS.labels(kind="circuit_open").inc()
+                raise self.circuit_open_error()
+            self.health_monitor.ensure_started()
+            session = None
+            connectivity_failed = False
             try:
-                async with self.session_local() as session:
-                    await asyncio.wait_for(session.execute(text("select(1)")), timeout= 3)
-                    yield session
+                session = await self.open_session(request)
+                yield session
             except OperationalError as error:
+                # Deadlocks and lock-wait timeouts are OperationalErrors too, but the database is up
+                if is_connectivity_error(error):
+                    connectivity_failed = True
+                    self.circuit_breaker.record_failure()
+                DB_ERRORS.labels(kind="operational").inc()
                 logger.error(f"Database Unable {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_connectivity_sources})
-                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.query_execution_issue}], headers={"Retry-After": "18000","X-Request-ID":"0"}) # Need to implement promethieses
+                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.query_execution_issue}], headers={"Retry-After": "18000","X-Request-ID":"0"})
             except asyncio.TimeoutError as error:
+                DB_ERRORS.labels(kind="connection_timeout").inc()
                 logger.error(f"Database Connection Issue {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_connectivity_sources})
-                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_issue}], headers={"Retry-After": "18000","X-Request-ID":"0"}) # Need to implement promethieses
+                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_issue}], headers={"Retry-After": "18000","X-Request-ID":"0"})
             except TimeoutError as error:
+                # Pool exhausted for longer than pool_timeout: shed the request, the pool frees up in moments
+                self.pool_metrics.record_checkout_failure()
+                DB_ERRORS.labels(kind="pool_timeout").inc()
                 logger.error(f"Database error {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_timeout_sources})
-                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_issue}], headers={"Retry-After": "18000","X-Request-ID":"0"}) # Need to implement promethieses
+                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_issue}], headers={"Retry-After": str(self.pool_settings.retry_after),"X-Request-ID":"0"})
             except DisconnectionError as error:
+                connectivity_failed = True
+                self.circuit_breaker.record_failure()
+                DB_ERRORS.labels(kind="disconnected").inc()
                 logger.error(f"Database Disconnected {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_connectivity_sources})
-                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_read_timeout}], headers={"Retry-After": "18000","X-Request-ID":"0"}) # Need to implement promethieses
+                raise HTTPException(status_code=503,detail=[{"msg":self.database_error_description.connection_read_timeout}], headers={"Retry-After": "18000","X-Request-ID":"0"})
             except ArgumentError as error:
                 logger.error(f"Sqlalchemy Argument {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.database_connectivity_sources})
                 raise HTTPException(status_code=500,detail=[{"msg":"Sqlalchemy Argument Error."}])
@@ -75,7 +291,11 @@ class AsyncDatabaseManager:
                 logger.error(f"Internal Server Error {error}", extra={'host':request.client.host, 'user':'system', 'source':self.error_sources.error_sources})
                 raise HTTPException(status_code=500,detail=[{"msg":"Internal Server Error"}])
             finally:
-                await session.close()
+                if session is not None:
+                    await session.close()
+                    # The session got a working connection, so consecutive failures start over
+                    if not connectivity_failed:
+                        self.circuit_breaker.record_success()
 
     def websocket_with_db(self):
         def decorator(func):
@@ -83,9 +303,13 @@ class AsyncDatabaseManager:
             async def wrapper(websocket: WebSocket, *args, **kwargs):
                 logger.info("Connection successful", extra={"user": "system","source" : "Machine Live Dashboard", "host": websocket.client.host})
                 await websocket.accept()
+                if not self.circuit_breaker.allow_request():
+                    await websocket.close(code=1013, reason="Database unavailable")
+                    return
+                self.health_monitor.ensure_started()
+                session = None
                 try:
                     async with self.session_local() as session:
-                        await asyncio.wait_for(session.execute(text("select(1)")), timeout= 3)
                         websocket.state.session = session
                         await func(websocket,  *args, **kwargs)
                 except asyncio.TimeoutError as error:
@@ -100,6 +324,7 @@ class AsyncDatabaseManager:
                     logger.error(f"Internal Server Error {error}", extra={"user": "system","source" : "Websocket exception", "host": websocket.client.host})
                     await websocket.close(code=1011, reason="Internal server error.")
                 finally:
-                    await session.close()
+                    if session is not None:
+                        await session.close()
             return wrapper
         return decorator
\ No newline at end of file
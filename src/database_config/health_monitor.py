@@ -0,0 +1,55 @@
+import asyncio
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.database_config.circuit_breaker import CircuitBreaker
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+
+class DatabaseHealthMonitor:
+    """
+    Probes the database in the background and feeds the circuit breaker, off the request path.
+    The engine should not be the request pool's: during a rush that pool is full and a probe
+    waiting on it would report a busy database as a down one.
+    """
+
+    def __init__(self, engine: AsyncEngine, circuit_breaker: CircuitBreaker, interval: float, timeout: float) -> None:
+        self.engine = engine
+        self.circuit_breaker = circuit_breaker
+        self.interval = interval
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> None:
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check(self) -> bool:
+        try:
+            await asyncio.wait_for(self.probe(), timeout=self.timeout)
+        except Exception as error:
+            self.circuit_breaker.record_failure()
+            logger.error(f"Database health check failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Database Health Monitor'})
+            return False
+        self.circuit_breaker.record_success()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
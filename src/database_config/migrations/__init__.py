@@ -0,0 +1,31 @@
+from src.database_config.migrations.runner import (
+    Migration, MigrationError, load_migrations, migration_status, run_migrations, ensure_column, ensure_index
+)
+from src.database_config.migrations.versions import (
+    v0001_baseline,
+    v0002_image_store,
+    v0003_product_availability,
+    v0004_hot_query_indexes,
+    v0005_notification_outbox,
+    v0006_job_watermarks,
+    v0007_usage_rollups,
+    v0008_listing_keyset_index,
+    v0009_close_returned_overdue_flags,
+    v0010_availability_reconcile_job,
+    v0011_usage_rollup_lost_returns,
+)
+
+# Append new versions here; the runner applies them in VERSION order
+MIGRATIONS = load_migrations([
+    v0001_baseline,
+    v0002_image_store,
+    v0003_product_availability,
+    v0004_hot_query_indexes,
+    v0005_notification_outbox,
+    v0006_job_watermarks,
+    v0007_usage_rollups,
+    v0008_listing_keyset_index,
+    v0009_close_returned_overdue_flags,
+    v0010_availability_reconcile_job,
+    v0011_usage_rollup_lost_returns,
+])
@@ -0,0 +1,41 @@
+"""
+Schema migrations and the hot-query plan check, against DATABASE_URL.
+
+    python -m src.database_config.migrations upgrade
+    python -m src.database_config.migrations status
+    python -m src.database_config.migrations check     # after python -m src.database_config.seed
+"""
+import argparse
+import asyncio
+import sys
+
+from src.database_config import engine
+from src.database_config.migrations import MIGRATIONS, migration_status, run_migrations
+
+
+async def main(command: str) -> int:
+    try:
+        if command == "upgrade":
+            applied = await run_migrations(engine, MIGRATIONS)
+            print(f"Applied {len(applied)} migration(s)" + "".join(f"\n  {m.version:04d} {m.name}" for m in applied))
+        elif command == "status":
+            for row in await migration_status(engine, MIGRATIONS):
+                print(f"{row['version']:04d} {row['name']:32} {row['applied_at'] or 'pending'}")
+        elif command == "check":
+            from src.database_config.migrations.explain_check import check_hot_queries
+            failures = await check_hot_queries(engine)
+            if failures:
+                print(f"\n{len(failures)} hot query plan(s) do a full table scan:")
+                for finding in failures:
+                    print(f"  {finding.query}: {finding.table} ({finding.rows} rows)")
+                return 1
+            print("\nAll hot queries use an index.")
+        return 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "check"])
+    sys.exit(asyncio.run(main(parser.parse_args().command)))
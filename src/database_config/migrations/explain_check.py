@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import List, Sequence
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.database_config.migrations.hot_queries import HotQuery, HOT_QUERIES
+
+# EXPLAIN access type for a full table scan
+FULL_SCAN = "ALL"
+
+
+@dataclass(frozen=True)
+class ScanFinding:
+    query: str
+    table: str
+    access_type: str
+    key: str
+    rows: int
+
+    @property
+    def is_full_scan(self) -> bool:
+        return self.access_type == FULL_SCAN
+
+
+def render_sql(connection: AsyncConnection, hot_query: HotQuery) -> str:
+    # Literal binds so expanding IN lists render too; EXPLAIN goes to the driver as-is. Rebuilt
+    # from the sample values so each bind has a type a literal can be rendered for.
+    statement = hot_query.query
+    if hot_query.params:
+        statement = statement.bindparams(*(bindparam(name, value, expanding=isinstance(value, (list, tuple)))
+                                           for name, value in hot_query.params.items()))
+    return str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+
+async def explain(connection: AsyncConnection, hot_query: HotQuery) -> List[ScanFinding]:
+    result = await connection.exec_driver_sql("EXPLAIN " + render_sql(connection, hot_query))
+    findings = []
+    for row in result.mappings().all():
+        table = row.get("table")
+        # NULL for "No tables used", <subqueryN>/<derivedN> for materialised results
+        if not table or table.startswith("<"):
+            continue
+        findings.append(ScanFinding(hot_query.name, table, row.get("type") or "", row.get("key") or "", int(row.get("rows") or 0)))
+    return findings
+
+
+async def check_hot_queries(engine: AsyncEngine, hot_queries: Sequence[HotQuery] = HOT_QUERIES) -> List[ScanFinding]:
+    """Returns the full table scans that are not explicitly allowed for their query"""
+    failures = []
+    async with engine.connect() as connection:
+        for hot_query in hot_queries:
+            for finding in await explain(connection, hot_query):
+                marker = "ok"
+                if finding.is_full_scan and finding.table not in hot_query.full_scan_allowed:
+                    failures.append(finding)
+                    marker = "FULL SCAN"
+                print(f"{hot_query.name:36} {finding.table:32} {finding.access_type:8} {finding.key or '-':40} {finding.rows:>8}  {marker}")
+    return failures
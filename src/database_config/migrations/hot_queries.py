@@ -0,0 +1,72 @@
+"""
+Queries on the kiosk request path, registered so explain_check can prove they use
+an index. Params only need to be well-formed; EXPLAIN does not depend on matches, and
+explaining an UPDATE does not run it.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet
+from sqlalchemy.sql import text
+from sqlalchemy.sql.elements import TextClause
+
+from src.inventory_list.inventory_listing import KEYSET_AFTER_CURSOR, listing_page_query
+from src.load_item.bulk_loader import existing_item_codes_query
+from src.product_selection.availability import unit_state_query
+from src.product_selection.checkout_engine import (
+    checkout_eligibility_query, checkout_flags_query, take_history_query, select_free_unit_query
+)
+from src.return_product.return_engine import close_unreturned_query, return_listing_query, returned_unit_query
+from src.users.user_resolver import resolve_user_query
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    query: TextClause
+    params: Dict
+    # Tables the query is expected to read in full (small lookups, O(products) reads)
+    full_scan_allowed: FrozenSet[str] = field(default_factory=frozenset)
+
+
+SAMPLE_EMP_CODE = "SEED-00001"
+SAMPLE_PRODUCT = "Seed Product 001"
+SAMPLE_ITEM_CODE = "SEED-ITEM-0000001"
+SAMPLE_USER_ID = 1
+
+HOT_QUERIES = [
+    HotQuery("user_resolver.resolve", resolve_user_query, {"emp_code": SAMPLE_EMP_CODE},
+             frozenset({"role_config"})),
+    HotQuery("take_product.eligibility", checkout_eligibility_query,
+             {"emp_code": SAMPLE_EMP_CODE, "product_name": SAMPLE_PRODUCT}),
+    HotQuery("take_product.session_flags", checkout_flags_query,
+             {"user_id": SAMPLE_USER_ID, "product_name": SAMPLE_PRODUCT}),
+    HotQuery("additional_take.history", take_history_query,
+             {"user_id": SAMPLE_USER_ID, "product_name": SAMPLE_PRODUCT}),
+    HotQuery("claim.select_free_unit", select_free_unit_query, {"product_name": SAMPLE_PRODUCT}),
+    HotQuery("load_items.existing_codes", existing_item_codes_query,
+             {"item_codes": [SAMPLE_ITEM_CODE, "SEED-ITEM-0000002"]}),
+    HotQuery("availability.unit_state", unit_state_query, {"inventory_id": 1}),
+    HotQuery("return.close_listing", return_listing_query, {
+        "item_code": SAMPLE_ITEM_CODE, "user_id": SAMPLE_USER_ID, "reason": "return",
+        "is_damaged": 0, "unit_status": "Active", "available": 1,
+    }),
+    HotQuery("return.returned_unit", returned_unit_query, {"item_code": SAMPLE_ITEM_CODE}),
+    HotQuery("return.close_unreturned", close_unreturned_query, {"listing_id": 1, "user_id": SAMPLE_USER_ID}),
+    # Mirrors list_returnable_products / list_damaged_returnable_products
+    HotQuery("return.returnable_products", text("""
+        SELECT ic.item_code, ic.name, c.name AS category_name, il.create_date
+        FROM inventory_listings il
+        JOIN inventory_config ic ON il.inventory_id = ic.id
+        JOIN category_config c ON ic.category_id = c.id
+        WHERE il.emp_id = :user_id AND il.status = 'Active'
+    """), {"user_id": SAMPLE_USER_ID}),
+    HotQuery("listings.first_page", listing_page_query(), {"limit": 101}),
+    HotQuery("listings.next_page", listing_page_query(f"WHERE {KEYSET_AFTER_CURSOR}"),
+             {"limit": 101, "cursor_date": "2024-01-01 00:00:00", "cursor_id": 1000}),
+    # Mirrors get_unique_products
+    HotQuery("home_screen.unique_products", text("""
+        SELECT pa.product_name, pa.category_id, pa.price, pa.available_count, c.picture_hash
+        FROM product_availability pa
+        JOIN category_config c ON pa.category_id = c.id
+        WHERE pa.available_count > 0
+    """), {}, frozenset({"product_availability"})),
+]
@@ -0,0 +1,150 @@
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, List, Sequence
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql import text
+
+# Application modules
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+# Only one process applies migrations at a time (several workers may start together)
+MIGRATION_LOCK_NAME = "kiosk_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+create_migrations_table_query = text("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        duration_ms INT NOT NULL DEFAULT 0,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+""")
+
+index_columns_query = text("""
+    SELECT index_name, MIN(non_unique) AS non_unique,
+           GROUP_CONCAT(column_name ORDER BY seq_in_index) AS columns
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = :table_name
+    GROUP BY index_name
+""")
+
+column_exists_query = text("""
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = DATABASE() AND table_name = :table_name AND column_name = :column_name
+""")
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    async def upgrade(self, connection: AsyncConnection) -> None:
+        await self.module.upgrade(connection)
+
+
+def load_migrations(modules: Sequence[ModuleType]) -> List[Migration]:
+    migrations = sorted((Migration(module.VERSION, module.NAME, module) for module in modules), key=lambda m: m.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions: {versions}")
+    return migrations
+
+
+async def column_exists(connection: AsyncConnection, table_name: str, column_name: str) -> bool:
+    result = await connection.execute(column_exists_query, {"table_name": table_name, "column_name": column_name})
+    return result.first() is not None
+
+
+async def ensure_column(connection: AsyncConnection, table_name: str, column_name: str, definition: str) -> None:
+    if not await column_exists(connection, table_name, column_name):
+        await connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"))
+
+
+async def ensure_index(connection: AsyncConnection, table_name: str, index_name: str,
+                       columns: Sequence[str], unique: bool = False) -> bool:
+    """
+    Creates the index unless an equivalent one already exists under any name. For lookups
+    any index that starts with the same columns will do; a unique index has to cover
+    exactly these columns, since UNIQUE (a, b) does not keep `a` unique on its own.
+    Returns True when an index was created.
+    """
+    result = await connection.execute(index_columns_query, {"table_name": table_name})
+    wanted = ",".join(columns).lower()
+    for row in result.fetchall():
+        existing = (row.columns or "").lower()
+        if unique:
+            if existing == wanted and not row.non_unique:
+                return False
+        elif existing == wanted or existing.startswith(wanted + ","):
+            return False
+
+    if unique:
+        column_list = ", ".join(columns)
+        duplicates = await connection.execute(text(
+            f"SELECT {column_list}, COUNT(*) AS copies FROM {table_name} "
+            f"GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 5"
+        ))
+        sample = duplicates.fetchall()
+        if sample:
+            raise MigrationError(
+                f"Cannot add unique index {index_name} on {table_name}({column_list}); "
+                f"duplicate values exist, e.g. {[tuple(row) for row in sample]}"
+            )
+
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    await connection.execute(text(f"CREATE {kind} {index_name} ON {table_name} ({', '.join(columns)})"))
+    return True
+
+
+async def applied_versions(connection: AsyncConnection) -> Dict[int, str]:
+    await connection.execute(create_migrations_table_query)
+    result = await connection.execute(text("SELECT version, applied_at FROM schema_migrations"))
+    return {row.version: str(row.applied_at) for row in result.fetchall()}
+
+
+async def migration_status(engine: AsyncEngine, migrations: Sequence[Migration]) -> List[Dict]:
+    async with engine.connect() as connection:
+        applied = await applied_versions(connection)
+    return [{"version": m.version, "name": m.name, "applied_at": applied.get(m.version)} for m in migrations]
+
+
+async def run_migrations(engine: AsyncEngine, migrations: Sequence[Migration]) -> List[Migration]:
+    """
+    Applies pending migrations in version order. MySQL DDL commits implicitly, so
+    every migration is written to be re-runnable and is recorded once it finishes.
+    """
+    applied_now = []
+    async with engine.connect() as connection:
+        locked = await connection.scalar(text("SELECT GET_LOCK(:name, :timeout)"),
+                                         {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT})
+        if locked != 1:
+            raise MigrationError("Another process is applying migrations")
+        try:
+            applied = await applied_versions(connection)
+            await connection.commit()
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+                started = time.perf_counter()
+                await migration.upgrade(connection)
+                await connection.execute(
+                    text("INSERT INTO schema_migrations (version, name, duration_ms) VALUES (:version, :name, :duration_ms)"),
+                    {"version": migration.version, "name": migration.name,
+                     "duration_ms": int((time.perf_counter() - started) * 1000)},
+                )
+                await connection.commit()
+                applied_now.append(migration)
+                logger.info(f"Applied migration {migration.version:04d} {migration.name}",
+                            extra={'host': 'system', 'user': 'system', 'source': 'Schema Migrations'})
+        finally:
+            await connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+    return applied_now
@@ -0,0 +1,156 @@
+"""Tables the application already relied on before migrations existed"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+
+VERSION = 1
+NAME = "baseline"
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS role_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        role_name VARCHAR(100) NOT NULL,
+        role_access TEXT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by VARCHAR(100) NULL,
+        updated_by VARCHAR(100) NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        first_name VARCHAR(100) NULL,
+        last_name VARCHAR(100) NULL,
+        email_id VARCHAR(255) NULL,
+        emp_code VARCHAR(50) NOT NULL,
+        role_id INT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by VARCHAR(100) NULL,
+        updated_by VARCHAR(100) NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS category_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        picture_blob LONGBLOB NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        item_code VARCHAR(100) NOT NULL,
+        category_id INT NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        price INT NOT NULL DEFAULT 0,
+        picture_blob LONGBLOB NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_listings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        inventory_id INT NOT NULL,
+        emp_id INT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        reasons VARCHAR(255) NULL,
+        is_damaged TINYINT(1) NOT NULL DEFAULT 0,
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_updated_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_unreturned_listings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        listing_id INT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_updated_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS inventory_damaged_listings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        listing_id INT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        last_updated_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS location_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        created_by INT NULL,
+        last_updated_by INT NULL,
+        created_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS machine_listings (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        location_id INT NULL,
+        name VARCHAR(255) NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        created_by INT NULL,
+        last_updated_by INT NULL,
+        created_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS parameter_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        param_category VARCHAR(100) NULL,
+        param_name VARCHAR(100) NOT NULL,
+        param_value VARCHAR(255) NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        machine_id INT NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS email_config (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        email_id VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NULL,
+        mx_record VARCHAR(255) NULL,
+        port_number INT NULL,
+        smpt_format VARCHAR(20) NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        create_by INT NULL,
+        last_updated_by INT NULL,
+        create_date DATETIME NULL,
+        last_updated_date DATETIME NULL
+    )
+    """,
+]
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    for statement in TABLES:
+        await connection.execute(text(statement))
@@ -0,0 +1,25 @@
+"""Content-addressed image storage (was src/images/schema.sql)"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+from src.database_config.migrations.runner import ensure_column
+
+VERSION = 2
+NAME = "image_store"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS image_store (
+            content_hash CHAR(64) NOT NULL PRIMARY KEY,
+            media_type VARCHAR(32) NOT NULL,
+            width INT NOT NULL,
+            height INT NOT NULL,
+            original MEDIUMBLOB NOT NULL,
+            thumbnail MEDIUMBLOB NOT NULL,
+            original_size INT NOT NULL,
+            thumbnail_size INT NOT NULL,
+            create_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    await ensure_column(connection, "inventory_config", "picture_hash", "CHAR(64) NULL")
+    await ensure_column(connection, "category_config", "picture_hash", "CHAR(64) NULL")
@@ -0,0 +1,24 @@
+"""Per-product availability counters (was src/product_selection/schema.sql)"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+from src.product_selection.availability import reconcile_availability
+
+VERSION = 3
+NAME = "product_availability"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS product_availability (
+            product_name VARCHAR(255) NOT NULL,
+            category_id INT NOT NULL,
+            available_count INT NOT NULL DEFAULT 0,
+            checked_out_count INT NOT NULL DEFAULT 0,
+            price INT NOT NULL DEFAULT 0,
+            last_updated_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (product_name, category_id),
+            KEY idx_product_availability_available (available_count)
+        )
+    """))
+    # Backfill from the current inventory, same recount the runtime reconciler uses
+    await reconcile_availability(connection)
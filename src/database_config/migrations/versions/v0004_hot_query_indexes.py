@@ -0,0 +1,24 @@
+"""Indexes behind the kiosk hot paths; see hot_queries.py for the queries they serve"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from src.database_config.migrations.runner import ensure_index
+
+VERSION = 4
+NAME = "hot_query_indexes"
+
+# (table, index name, columns, unique)
+INDEXES = [
+    ("user_config", "uq_user_config_emp_code", ("emp_code",), True),
+    ("inventory_config", "uq_inventory_config_item_code", ("item_code",), True),
+    ("inventory_config", "idx_inventory_config_name_status", ("name", "status"), False),
+    ("inventory_config", "idx_inventory_config_name_category", ("name", "category_id"), False),
+    ("inventory_listings", "idx_inventory_listings_emp_status", ("emp_id", "status"), False),
+    ("inventory_listings", "idx_inventory_listings_create_by_status", ("create_by", "status"), False),
+    ("inventory_listings", "idx_inventory_listings_inventory_status", ("inventory_id", "status"), False),
+    ("inventory_unreturned_listings", "idx_unreturned_create_by_status", ("create_by", "status"), False),
+    ("inventory_damaged_listings", "idx_damaged_listing_id", ("listing_id",), False),
+]
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    for table_name, index_name, columns, unique in INDEXES:
+        await ensure_index(connection, table_name, index_name, columns, unique)
@@ -0,0 +1,24 @@
+"""Outbox for notifications written in the same transaction as the event that caused them"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+
+VERSION = 5
+NAME = "notification_outbox"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            kind VARCHAR(50) NOT NULL,
+            recipient VARCHAR(255) NULL,
+            payload JSON NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+            attempts INT NOT NULL DEFAULT 0,
+            next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            last_error VARCHAR(500) NULL,
+            create_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            sent_date DATETIME NULL,
+            KEY idx_notification_outbox_due (status, next_attempt_at)
+        )
+    """))
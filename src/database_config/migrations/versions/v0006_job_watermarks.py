@@ -0,0 +1,21 @@
+"""Progress markers for incremental background jobs, starting with the overdue detector"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+from src.database_config.migrations.runner import ensure_index
+
+VERSION = 6
+NAME = "job_watermarks"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    await connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS job_watermarks (
+            name VARCHAR(100) NOT NULL PRIMARY KEY,
+            last_id BIGINT NOT NULL DEFAULT 0,
+            last_run_date DATETIME NULL
+        )
+    """))
+    # The row is locked by whichever worker runs the job, so it has to exist up front
+    await connection.execute(text("INSERT IGNORE INTO job_watermarks (name, last_id) VALUES ('overdue_listings', 0)"))
+    # Duplicate guard for the detector's bulk insert
+    await ensure_index(connection, "inventory_unreturned_listings", "idx_unreturned_listing_id", ("listing_id",))
@@ -0,0 +1,53 @@
+"""Hourly / daily usage rollups and the listing columns that feed them"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+from src.database_config.migrations.runner import ensure_column, ensure_index
+
+VERSION = 7
+NAME = "usage_rollups"
+
+ROLLUP_MEASURES = """
+    takes INT NOT NULL DEFAULT 0,
+    lost_takes INT NOT NULL DEFAULT 0,
+    returns INT NOT NULL DEFAULT 0,
+    damaged_returns INT NOT NULL DEFAULT 0,
+    seconds_used BIGINT NOT NULL DEFAULT 0,
+    last_updated_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+"""
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    # Kiosk the unit was taken at (X-Machine-Id); NULL for admin-created listings
+    await ensure_column(connection, "inventory_listings", "machine_id", "VARCHAR(100) NULL")
+    # 0 = take not rolled up yet, 1 = take rolled up, 2 = return rolled up as well
+    await ensure_column(connection, "inventory_listings", "usage_rollup_state", "TINYINT NOT NULL DEFAULT 0")
+    await ensure_index(connection, "inventory_listings", "idx_inventory_listings_rollup_state", ("usage_rollup_state", "status"))
+
+    await connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS usage_rollup_hourly (
+            bucket_start DATETIME NOT NULL,
+            product_name VARCHAR(255) NOT NULL,
+            category_id INT NOT NULL,
+            emp_id INT NOT NULL,
+            machine_id VARCHAR(100) NOT NULL DEFAULT '',
+            {ROLLUP_MEASURES},
+            PRIMARY KEY (bucket_start, product_name, category_id, emp_id, machine_id),
+            KEY idx_usage_rollup_hourly_product (product_name, bucket_start),
+            KEY idx_usage_rollup_hourly_emp (emp_id, bucket_start)
+        )
+    """))
+    await connection.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS usage_rollup_daily (
+            bucket_date DATE NOT NULL,
+            product_name VARCHAR(255) NOT NULL,
+            category_id INT NOT NULL,
+            emp_id INT NOT NULL,
+            machine_id VARCHAR(100) NOT NULL DEFAULT '',
+            {ROLLUP_MEASURES},
+            PRIMARY KEY (bucket_date, product_name, category_id, emp_id, machine_id),
+            KEY idx_usage_rollup_daily_product (product_name, bucket_date),
+            KEY idx_usage_rollup_daily_emp (emp_id, bucket_date)
+        )
+    """))
+    # Existing history is rolled up by the job itself, in batches, on its first runs
+    await connection.execute(text("INSERT IGNORE INTO job_watermarks (name, last_id) VALUES ('usage_rollup', 0)"))
@@ -0,0 +1,11 @@
+"""Index behind the keyset pagination of /inventory-listings/listings"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from src.database_config.migrations.runner import ensure_index
+
+VERSION = 8
+NAME = "listing_keyset_index"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    # Matches ORDER BY il.create_date DESC, il.id DESC, so pages are read in index order without a filesort
+    await ensure_index(connection, "inventory_listings", "idx_inventory_listings_create_date_id", ("create_date", "id"))
@@ -0,0 +1,16 @@
+"""Closes overdue flags left Active on listings returned before returns cleared them"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+
+VERSION = 9
+NAME = "close_returned_overdue_flags"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    # Until now these kept blocking the employee's next take_product
+    await connection.execute(text("""
+        UPDATE inventory_unreturned_listings iul
+        JOIN inventory_listings il ON il.id = iul.listing_id
+        SET iul.status = 'Inactive', iul.last_updated_date = NOW()
+        WHERE iul.status = 'Active' AND il.status <> 'Active'
+    """))
@@ -0,0 +1,11 @@
+"""Watermark row that elects one worker for the optional availability reconciliation"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+
+VERSION = 10
+NAME = "availability_reconcile_job"
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    # Locked for the length of a run, so it has to exist up front; last_id is unused
+    await connection.execute(text("INSERT IGNORE INTO job_watermarks (name, last_id) VALUES ('availability_reconcile', 0)"))
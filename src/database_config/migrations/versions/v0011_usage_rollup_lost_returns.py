@@ -0,0 +1,35 @@
+"""Counts lost units at return time (lost_returns) instead of at take time (lost_takes)"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+from src.database_config.migrations.runner import column_exists, ensure_column
+
+VERSION = 11
+NAME = "usage_rollup_lost_returns"
+
+# Same buckets as RETURNS_ROLLUP in src/usage_reports/rollup.py
+ROLLUP_TABLES = (
+    ("usage_rollup_hourly", "bucket_start", "DATE_FORMAT(il.last_updated_date, '%Y-%m-%d %H:00:00')"),
+    ("usage_rollup_daily", "bucket_date", "DATE(il.last_updated_date)"),
+)
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    for table, bucket, bucket_expression in ROLLUP_TABLES:
+        # 'lost' is written by the return, so at take time this was almost always 0
+        if await column_exists(connection, table, "lost_takes"):
+            await connection.execute(text(f"ALTER TABLE {table} DROP COLUMN lost_takes"))
+        await ensure_column(connection, table, "lost_returns", "INT NOT NULL DEFAULT 0 AFTER damaged_returns")
+        # Returns already rolled up have their bucket row; set (not add) how many were lost, so a rerun is harmless
+        await connection.execute(text(f"""
+            UPDATE {table} r
+            JOIN (
+                SELECT {bucket_expression} AS bucket, ic.name AS product_name, ic.category_id,
+                       COALESCE(il.emp_id, 0) AS emp_id, COALESCE(il.machine_id, '') AS machine_id, COUNT(*) AS lost
+                FROM inventory_listings il
+                JOIN inventory_config ic ON ic.id = il.inventory_id
+                WHERE il.usage_rollup_state = 2 AND il.reasons = 'lost'
+                GROUP BY 1, 2, 3, 4, 5
+            ) lost ON lost.bucket = r.{bucket} AND lost.product_name = r.product_name AND lost.category_id = r.category_id
+                  AND lost.emp_id = r.emp_id AND lost.machine_id = r.machine_id
+            SET r.lost_returns = lost.lost
+        """))
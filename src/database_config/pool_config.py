@@ -0,0 +1,40 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class PoolSettings:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    retry_after: int
+    workers: int
+    connection_budget: int
+
+
+def resolve_pool_settings() -> PoolSettings:
+    """
+    Sizes the pool from the database's connection budget instead of a fixed number.
+    Every worker process gets its own pool, so the budget left after reserved connections
+    (admin sessions, migrations, background workers) is split evenly between workers.
+    DB_POOL_SIZE still wins when set explicitly.
+    """
+    connection_budget = int(os.getenv('DB_MAX_CONNECTIONS', 150))
+    reserved = int(os.getenv('DB_RESERVED_CONNECTIONS', 10))
+    workers = max(1, int(os.getenv('WEB_CONCURRENCY', os.getenv('UVICORN_WORKERS', 1))))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', 0))
+
+    per_worker = max(1, (connection_budget - reserved) // workers)
+    pool_size = int(os.getenv('DB_POOL_SIZE', max(1, per_worker - max_overflow)))
+
+    return PoolSettings(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        # Short checkout timeout: a kiosk is better served by a quick 503 than a long hang
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', 2)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        retry_after=int(os.getenv('DB_POOL_RETRY_AFTER', 1)),
+        workers=workers,
+        connection_budget=connection_budget,
+    )
@@ -0,0 +1,69 @@
+import bisect
+import threading
+from typing import Dict, List
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Upper bounds in seconds for the checkout wait histogram
+WAIT_TIME_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+
+class PoolMetrics:
+    """Live connection pool counters plus a histogram of how long requests waited for a connection"""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_time_sum = 0.0
+        self.wait_time_counts: List[int] = [0] * (len(WAIT_TIME_BUCKETS) + 1)
+        self._lock = threading.Lock()
+        self.register_events()
+
+    def register_events(self) -> None:
+        @event.listens_for(self.engine.sync_engine, "connect")
+        def count_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(self.engine.sync_engine, "checkout")
+        def count_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(self.engine.sync_engine, "invalidate")
+        def count_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_time_sum += seconds
+            self.wait_time_counts[bisect.bisect_left(WAIT_TIME_BUCKETS, seconds)] += 1
+
+    def record_checkout_failure(self) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+
+    def snapshot(self) -> Dict:
+        pool = self.engine.sync_engine.pool
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(WAIT_TIME_BUCKETS + ["+Inf"], self.wait_time_counts):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # QueuePool reports a negative overflow until the base pool is fully opened
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_time_seconds": {
+                    "count": cumulative,
+                    "sum": self.wait_time_sum,
+                    "buckets": histogram,
+                },
+            }
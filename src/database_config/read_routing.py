@@ -0,0 +1,66 @@
+import time
+from typing import Dict, Iterable, List
+from fastapi import Request
+
+# Application modules
+from src.api.session_token import verify_session_token
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+def read_your_writes_keys(request: Request) -> List[str]:
+    """
+    Who a request acts for: the employee (session token or emp_code) and the kiosk
+    (X-Machine-Id). A write pins these keys; a read is pinned when any of its keys is.
+    The client address is only used when neither is present, since a proxy would share it.
+    """
+    keys = []
+    emp_code = request.query_params.get("emp_code")
+    authorization = request.headers.get("authorization", "")
+    if not emp_code and authorization.lower().startswith("bearer "):
+        try:
+            emp_code = verify_session_token(authorization[7:].strip()).emp_code
+        except Exception:
+            emp_code = None
+    if emp_code:
+        keys.append(f"emp:{emp_code}")
+    machine_id = request.headers.get("x-machine-id")
+    if machine_id:
+        keys.append(f"machine:{machine_id}")
+    if not keys and request.client is not None:
+        keys.append(f"host:{request.client.host}")
+    return keys
+
+
+class ReadYourWritesTracker:
+    """Per-worker record of who committed a write recently, so their reads stay on the primary"""
+
+    def __init__(self, window_seconds: float, max_entries: int = 10000) -> None:
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._pinned_until: Dict[str, float] = {}
+
+    def pin(self, keys: Iterable[str]) -> None:
+        if self.window_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.window_seconds
+        for key in keys:
+            # Re-inserted so dict order stays oldest-first for eviction
+            self._pinned_until.pop(key, None)
+            self._pinned_until[key] = expires_at
+        if len(self._pinned_until) > self.max_entries:
+            self.prune()
+
+    def is_pinned(self, keys: Iterable[str]) -> bool:
+        now = time.monotonic()
+        return any(self._pinned_until.get(key, 0) > now for key in keys)
+
+    def prune(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, expires_at in self._pinned_until.items() if expires_at <= now]:
+            del self._pinned_until[key]
+        while len(self._pinned_until) > self.max_entries:
+            del self._pinned_until[next(iter(self._pinned_until))]
+
+    def __len__(self) -> int:
+        return len(self._pinned_until)
@@ -0,0 +1,148 @@
+"""
+Seeds a realistic dataset so EXPLAIN reflects production plans (tiny tables are
+always scanned). Seeded rows are marked with the SEED prefix and can be removed
+with --reset.
+
+    python -m src.database_config.seed --users 2000 --products 200 --units-per-product 50
+"""
+import argparse
+import asyncio
+import random
+from typing import Dict, List
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text
+
+from src.database_config import engine
+from src.product_selection.availability import reconcile_availability
+
+SEED_PREFIX = "SEED"
+SEED_CHUNK_SIZE = 1000
+SEED_TABLES = ("role_config", "user_config", "category_config", "inventory_config",
+               "inventory_listings", "inventory_unreturned_listings", "inventory_damaged_listings",
+               "product_availability")
+
+
+def emp_code(index: int) -> str:
+    return f"{SEED_PREFIX}-{index:05d}"
+
+
+def item_code(index: int) -> str:
+    return f"{SEED_PREFIX}-ITEM-{index:07d}"
+
+
+def product_name(index: int) -> str:
+    return f"Seed Product {index:03d}"
+
+
+async def insert_rows(connection: AsyncConnection, table: str, rows: List[Dict]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0])
+    statement = text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})")
+    for start in range(0, len(rows), SEED_CHUNK_SIZE):
+        await connection.execute(statement, rows[start:start + SEED_CHUNK_SIZE])
+
+
+async def reset(connection: AsyncConnection) -> None:
+    seeded_listings = """
+        SELECT il.id FROM inventory_listings il
+        JOIN inventory_config ic ON il.inventory_id = ic.id
+        WHERE ic.item_code LIKE 'SEED-ITEM-%'
+    """
+    for table in ("inventory_unreturned_listings", "inventory_damaged_listings"):
+        await connection.execute(text(f"DELETE FROM {table} WHERE listing_id IN (SELECT id FROM ({seeded_listings}) seeded)"))
+    await connection.execute(text(f"DELETE FROM inventory_listings WHERE id IN (SELECT id FROM ({seeded_listings}) seeded)"))
+    await connection.execute(text("DELETE FROM inventory_config WHERE item_code LIKE 'SEED-ITEM-%'"))
+    await connection.execute(text("DELETE FROM product_availability WHERE product_name LIKE 'Seed Product %'"))
+    await connection.execute(text("DELETE FROM category_config WHERE name LIKE 'Seed Category %'"))
+    await connection.execute(text("DELETE FROM user_config WHERE emp_code LIKE 'SEED-%'"))
+    await connection.execute(text("DELETE FROM role_config WHERE role_name LIKE 'Seed %'"))
+
+
+async def seed(connection: AsyncConnection, users: int, categories: int, products: int,
+               units_per_product: int, checked_out_ratio: float, history_per_unit: int) -> Dict[str, int]:
+    rng = random.Random(42)
+
+    await insert_rows(connection, "role_config", [
+        {"role_name": f"Seed {name}", "status": "Active", "create_by": "seed", "updated_by": "seed"}
+        for name in ("Employee", "Admin")
+    ])
+    role_ids = [row.id for row in (await connection.execute(text("SELECT id FROM role_config WHERE role_name LIKE 'Seed %' ORDER BY id"))).fetchall()]
+
+    await insert_rows(connection, "user_config", [
+        {"first_name": "Seed", "last_name": f"User {index}", "email_id": f"seed{index}@example.com",
+         "emp_code": emp_code(index), "role_id": role_ids[1] if index % 10 == 0 else role_ids[0], "status": "Active",
+         "create_by": "seed", "updated_by": "seed"}
+        for index in range(1, users + 1)
+    ])
+    user_ids = [row.id for row in (await connection.execute(text("SELECT id FROM user_config WHERE emp_code LIKE 'SEED-%'"))).fetchall()]
+
+    await insert_rows(connection, "category_config", [
+        {"name": f"Seed Category {index:02d}", "status": "Active"} for index in range(1, categories + 1)
+    ])
+    category_ids = [row.id for row in (await connection.execute(text("SELECT id FROM category_config WHERE name LIKE 'Seed Category %'"))).fetchall()]
+
+    creator = user_ids[0]
+    await insert_rows(connection, "inventory_config", [
+        {"item_code": item_code(product * units_per_product + unit), "category_id": category_ids[product % len(category_ids)],
+         "name": product_name(product + 1), "price": rng.randint(1, 500), "status": "Active",
+         "create_by": creator, "last_updated_by": creator}
+        for product in range(products) for unit in range(units_per_product)
+    ])
+    units = [row.id for row in (await connection.execute(text("SELECT id FROM inventory_config WHERE item_code LIKE 'SEED-ITEM-%'"))).fetchall()]
+
+    # Returned history for every unit, plus one active checkout for a share of them.
+    # Flushed in chunks: a million-listing seed never sits in memory at once
+    listings, checked_out, listing_count = [], [], 0
+    for inventory_id in units:
+        for _ in range(history_per_unit):
+            user_id = rng.choice(user_ids)
+            listings.append({"inventory_id": inventory_id, "emp_id": user_id, "create_by": user_id,
+                             "last_updated_by": user_id, "status": "Returned", "reasons": "return"})
+        if rng.random() < checked_out_ratio:
+            user_id = rng.choice(user_ids)
+            checked_out.append(inventory_id)
+            listings.append({"inventory_id": inventory_id, "emp_id": user_id, "create_by": user_id,
+                             "last_updated_by": user_id, "status": "Active", "reasons": "take"})
+        if len(listings) >= SEED_CHUNK_SIZE * 10:
+            await insert_rows(connection, "inventory_listings", listings)
+            listing_count += len(listings)
+            listings = []
+    await insert_rows(connection, "inventory_listings", listings)
+    listing_count += len(listings)
+
+    if checked_out:
+        await connection.execute(text("UPDATE inventory_config SET status = 'Inactive' WHERE id IN :ids")
+                                 .bindparams(bindparam("ids", expanding=True)), {"ids": checked_out})
+
+    await reconcile_availability(connection)
+    return {"users": len(user_ids), "categories": len(category_ids), "units": len(units),
+            "listings": listing_count, "checked_out": len(checked_out)}
+
+
+async def main(args):
+    try:
+        async with engine.begin() as connection:
+            if args.reset:
+                await reset(connection)
+            counts = await seed(connection, args.users, args.categories, args.products,
+                                args.units_per_product, args.checked_out_ratio, args.history_per_unit)
+        async with engine.connect() as connection:
+            # Fresh statistics so the optimizer sees the seeded cardinalities
+            await connection.exec_driver_sql(f"ANALYZE TABLE {', '.join(SEED_TABLES)}")
+        print("Seeded " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a dataset for query plan checks and load tests")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--units-per-product", type=int, default=50)
+    parser.add_argument("--history-per-unit", type=int, default=3)
+    parser.add_argument("--checked-out-ratio", type=float, default=0.2)
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded rows first")
+    asyncio.run(main(parser.parse_args()))
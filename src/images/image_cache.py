@@ -0,0 +1,56 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ImageCache:
+    """In-process LRU cache for image variants, bounded by total bytes rather than entry count"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str, variant: str) -> Optional[Tuple[bytes, str]]:
+        key = (content_hash, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, content_hash: str, variant: str, data: bytes, media_type: str) -> None:
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        key = (content_hash, variant)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous[0])
+            self._entries[key] = (data, media_type)
+            self.current_bytes += size
+            # Evict least recently used variants until the byte budget fits again
+            while self.current_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+image_cache = ImageCache(int(os.getenv("IMAGE_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
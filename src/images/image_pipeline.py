@@ -0,0 +1,110 @@
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+# Longest edge of the kiosk-sized variant
+THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", 320))
+# Longest edge kept for the normalized original
+ORIGINAL_MAX_SIZE = int(os.getenv("IMAGE_ORIGINAL_MAX_SIZE", 1600))
+JPEG_QUALITY = 85
+# Largest decoded size accepted; Pillow itself only warns up to twice its own default
+MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+@dataclass
+class ProcessedImage:
+    content_hash: str
+    media_type: str
+    width: int
+    height: int
+    original: bytes
+    thumbnail: bytes
+
+
+def _encode(image: Image.Image, image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def process_image(raw: bytes) -> ProcessedImage:
+    """
+    Normalizes an upload once: EXIF rotation applied, metadata stripped, size capped and
+    re-encoded as PNG (transparent images) or JPEG. The hash is taken over the normalized
+    bytes so the same picture uploaded twice maps to the same content hash.
+    """
+    try:
+        image = Image.open(io.BytesIO(raw))
+        # Checked from the header, before anything is decoded
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Image too large: {image.width}x{image.height} exceeds {MAX_IMAGE_PIXELS} pixels")
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ValueError(f"Unsupported image: {error}")
+
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    image_format, media_type = ("PNG", "image/png") if has_alpha else ("JPEG", "image/jpeg")
+
+    image.thumbnail((ORIGINAL_MAX_SIZE, ORIGINAL_MAX_SIZE), Image.LANCZOS)
+    original = _encode(image, image_format)
+
+    thumbnail_image = image.copy()
+    thumbnail_image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS)
+    thumbnail = _encode(thumbnail_image, image_format)
+
+    return ProcessedImage(
+        content_hash=hashlib.sha256(original).hexdigest(),
+        media_type=media_type,
+        width=image.width,
+        height=image.height,
+        original=original,
+        thumbnail=thumbnail,
+    )
+
+
+async def store_image(db: AsyncSession, image: ProcessedImage) -> str:
+    # Identical images share one row; a second upload is a no-op
+    query = text("""
+        INSERT INTO image_store (content_hash, media_type, width, height, original, thumbnail, original_size, thumbnail_size, create_date)
+        VALUES (:content_hash, :media_type, :width, :height, :original, :thumbnail, :original_size, :thumbnail_size, NOW())
+        ON DUPLICATE KEY UPDATE content_hash = content_hash
+    """)
+    await db.execute(query, {
+        "content_hash": image.content_hash,
+        "media_type": image.media_type,
+        "width": image.width,
+        "height": image.height,
+        "original": image.original,
+        "thumbnail": image.thumbnail,
+        "original_size": len(image.original),
+        "thumbnail_size": len(image.thumbnail),
+    })
+    return image.content_hash
+
+
+async def save_upload(db: AsyncSession, file: Optional[UploadFile]) -> Optional[str]:
+    """Runs an uploaded file through the pipeline and returns its content hash (None when no file)"""
+    if not file:
+        return None
+    raw = await file.read()
+    if not raw:
+        return None
+    try:
+        # Decoding and resizing is CPU bound, keep it off the event loop
+        image = await run_in_threadpool(process_image, raw)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=[{"msg": str(error)}])
+    return await store_image(db, image)
@@ -0,0 +1,168 @@
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Optional, Set, Tuple
+
+# Application modules
+from src.database_config import get_db, session_local
+from src.images.image_cache import image_cache
+from src.images.image_pipeline import process_image, store_image
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+IMAGE_ROUTE_PREFIX = "/kiosk-ausweg/v1/images"
+IMAGE_CACHE_CONTROL = "public, max-age=86400"
+# Content-addressed URLs never change meaning, so browsers may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_VARIANTS = {"thumbnail", "original"}
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Tables that own a picture_blob column, keyed by the URL segment
+IMAGE_SOURCES = {
+    "inventory": "inventory_config",
+    "category": "category_config",
+}
+
+
+def image_url(kind: str, object_id: int, version: Optional[datetime] = None, has_image: bool = True,
+              content_hash: Optional[str] = None, variant: str = "thumbnail") -> Optional[str]:
+    """Build the streaming URL list endpoints return instead of the base64 blob"""
+    if content_hash:
+        return f"{IMAGE_ROUTE_PREFIX}/content/{content_hash}?variant={variant}"
+    if not has_image:
+        return None
+    url = f"{IMAGE_ROUTE_PREFIX}/{kind}/{object_id}"
+    if isinstance(version, datetime):
+        # Changes whenever the row is updated, so kiosks never keep a stale image
+        url += f"?v={int(version.timestamp())}"
+    return url
+
+
+def sniff_media_type(image: bytes) -> str:
+    if image.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if image[:4] == b"RIFF" and image[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def iter_chunks(image: bytes):
+    view = memoryview(image)
+    for offset in range(0, len(view), IMAGE_CHUNK_SIZE):
+        yield bytes(view[offset:offset + IMAGE_CHUNK_SIZE])
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def stream_content(content_hash: str, variant: str, request: Request, db: AsyncSession) -> Response:
+    etag = f'"{content_hash}-{variant}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    cached = image_cache.get(content_hash, variant)
+    if cached is None:
+        # variant is validated against IMAGE_VARIANTS before it reaches the query
+        result = await db.execute(text(f"SELECT {variant} AS image, media_type FROM image_store WHERE content_hash = :content_hash"),
+                                  {"content_hash": content_hash})
+        stored = result.fetchone()
+        if not stored:
+            raise HTTPException(status_code=404, detail=[{"msg": "Image not found"}])
+        cached = (stored.image, stored.media_type)
+        image_cache.put(content_hash, variant, stored.image, stored.media_type)
+
+    image, media_type = cached
+    headers["Content-Length"] = str(len(image))
+    return StreamingResponse(iter_chunks(image), media_type=media_type, headers=headers)
+
+
+# Legacy rows being moved into image_store by this worker, so a burst of hits processes each once
+_backfills_running: Set[Tuple[str, int]] = set()
+
+
+async def backfill_picture_hash(table: str, object_id: int) -> None:
+    """
+    Moves a legacy picture_blob through the upload pipeline and records its picture_hash,
+    so later hits on the row go straight to image_store. Runs after the response, on the
+    primary, since the request itself may have read from a replica.
+    """
+    if (table, object_id) in _backfills_running:
+        return
+    _backfills_running.add((table, object_id))
+    try:
+        async with session_local() as db:
+            blob = (await db.execute(text(f"SELECT picture_blob FROM {table} WHERE id = :object_id AND picture_hash IS NULL"),
+                                     {"object_id": object_id})).scalar()
+            if not blob:
+                return
+            image = await run_in_threadpool(process_image, blob)
+            content_hash = await store_image(db, image)
+            await db.execute(text(f"UPDATE {table} SET picture_hash = :content_hash WHERE id = :object_id AND picture_hash IS NULL"),
+                             {"content_hash": content_hash, "object_id": object_id})
+            await db.commit()
+    except Exception as error:
+        # An undecodable legacy blob keeps being served as-is with its MD5 ETag
+        logger.warning(f"Image backfill failed for {table} {object_id} {error}",
+                       extra={'host': 'system', 'user': 'system', 'source': 'Image Streaming'})
+    finally:
+        _backfills_running.discard((table, object_id))
+
+
+async def stream_image(kind: str, object_id: int, request: Request, db: AsyncSession) -> Response:
+    table = IMAGE_SOURCES[kind]
+
+    result = await db.execute(text(f"SELECT picture_hash, picture_blob IS NOT NULL AS has_blob FROM {table} WHERE id = :object_id"),
+                              {"object_id": object_id})
+    image_meta = result.fetchone()
+    if image_meta and image_meta.picture_hash:
+        return await stream_content(image_meta.picture_hash, "original", request, db)
+    if not image_meta or not image_meta.has_blob:
+        raise HTTPException(status_code=404, detail=[{"msg": "Image not found"}])
+
+    # Legacy row without a hash yet: hashed server side so a 304 never ships the blob over the wire
+    digest = (await db.execute(text(f"SELECT MD5(picture_blob) FROM {table} WHERE id = :object_id"), {"object_id": object_id})).scalar()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+    backfill = BackgroundTask(backfill_picture_hash, table, object_id)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers, background=backfill)
+
+    result = await db.execute(text(f"SELECT picture_blob FROM {table} WHERE id = :object_id"), {"object_id": object_id})
+    image = result.scalar()
+    if not image:
+        raise HTTPException(status_code=404, detail=[{"msg": "Image not found"}])
+
+    headers["Content-Length"] = str(len(image))
+    return StreamingResponse(iter_chunks(image), media_type=sniff_media_type(image), headers=headers, background=backfill)
+
+
+# Stream an inventory item image
+async def get_inventory_image(inventory_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    return await stream_image("inventory", inventory_id, request, db)
+
+
+# Stream a category image
+async def get_category_image(category_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    return await stream_image("category", category_id, request, db)
+
+
+# Stream a content-addressed image variant (thumbnail by default)
+async def get_content_image(content_hash: str, request: Request, variant: str = Query(default="thumbnail"), db: AsyncSession = Depends(get_db)):
+    if variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail=[{"msg": f"Invalid variant. Choose from {sorted(IMAGE_VARIANTS)}"}])
+    return await stream_content(content_hash, variant, request, db)
@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from src.images.image_streaming import get_inventory_image, get_category_image, get_content_image
+
+router = APIRouter(prefix="/images")
+
+router.add_api_route("/inventory/{inventory_id}", get_inventory_image, methods=["GET"])
+router.add_api_route("/category/{category_id}", get_category_image, methods=["GET"])
+router.add_api_route("/content/{content_hash}", get_content_image, methods=["GET"])
@@ -5,6 +5,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from typing import List, AsyncGenerator
 from src.database_config import get_db
 from src.inventory.schemas import UserCreate, UserUpdate, UserResponse
+from src.users.user_resolver import user_resolver
 
 router = APIRouter(prefix="/user-config", tags=["User Config"])
 
@@ -19,6 +20,7 @@ async def create_user(user_data: UserCreate, db_engine: AsyncGenerator = Depends
 
         result = await db_engine.execute(query, user_data.dict())
         await db_engine.commit()
+        user_resolver.invalidate(emp_code=user_data.emp_code)
 
         return JSONResponse(content={"msg": "User created successfully", "id": result.lastrowid}, status_code=201)
 
@@ -71,6 +73,7 @@ async def update_user(user_id: int, user_data: UserUpdate, db_engine: AsyncGener
 
         result = await db_engine.execute(query, {**user_data.dict(), "user_id": user_id})
         await db_engine.commit()
+        user_resolver.invalidate(emp_code=user_data.emp_code, user_id=user_id)
 
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -89,6 +92,7 @@ async def delete_user(user_id: int, db_engine: AsyncGenerator = Depends(get_db))
         query = text("DELETE FROM user_config WHERE id = :user_id")
         result = await db_engine.execute(query, {"user_id": user_id})
         await db_engine.commit()
+        user_resolver.invalidate(user_id=user_id)
 
         if result.rowcount == 0:
             raise HTTPException(status_code=404, detail="User not found")
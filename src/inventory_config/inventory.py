@@ -2,22 +2,20 @@ import base64
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from fastapi.responses import JSONResponse
-from datetime import datetime
+from src.seedwork.responses import JSONResponse
 import base64
 from typing import List
 from src.database_config import get_db  
+from src.images.image_streaming import image_url
+from src.images.image_pipeline import save_upload
+from src.users.user_resolver import user_resolver
+from src.product_selection.availability import (
+    adjust_availability, is_active, unit_contribution, add_unit_contribution, remove_unit_contribution
+)
 
 router = APIRouter(prefix="/inventory_config")
 
 
-# Function to convert datetime to string for JSON response
-def convert_datetime(value):
-    if isinstance(value, datetime):
-        return value.isoformat()
-    return value
-
-
 # @router.post("/create-inventory")
 # async def create_inventory(
 #     item_code: str = Form(...),
@@ -104,40 +102,37 @@ async def create_inventory(
         category_id = category_data.id  # Get the ID
 
         # Validate create_by and last_updated_by (convert emp_code to user_id)
-        user_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-
-        async def get_user_id(emp_code):
-            result = await db.execute(user_query, {"emp_code": emp_code})
-            user_data = result.fetchone()
-            return user_data.id if user_data else None
-
-        create_by_id = await get_user_id(create_by)
-        last_updated_by_id = await get_user_id(last_updated_by)
+        create_by_id = await user_resolver.resolve_id(db, create_by)
+        last_updated_by_id = await user_resolver.resolve_id(db, last_updated_by)
 
         if not create_by_id:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {create_by} not found."})
         if not last_updated_by_id:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {last_updated_by} not found."})
 
-        # Check if image is uploaded (allow NULL)
-        image_data = await file.read() if file else None
+        # Normalize, hash and store the image once (allow NULL)
+        picture_hash = await save_upload(db, file)
 
         # Insert into inventory_config
         query = text("""
             INSERT INTO inventory_config 
-            (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price, picture_blob)
+            (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price, picture_hash)
             VALUES 
-            (:item_code, :category_id, :status, :create_by, :last_updated_by, NOW(), NOW(), :name, :price, :image)
+            (:item_code, :category_id, :status, :create_by, :last_updated_by, NOW(), NOW(), :name, :price, :picture_hash)
         """)
         await db.execute(query, {
             "item_code": item_code, "category_id": category_id, "status": status,
             "create_by": create_by_id, "last_updated_by": last_updated_by_id,
-            "name": name, "price": price, "image": image_data
+            "name": name, "price": price, "picture_hash": picture_hash
         })
+        if is_active(status):
+            await adjust_availability(db, name, category_id, available=1, price=price)
         await db.commit()
 
         return JSONResponse(content={"message": "Inventory item created successfully"}, status_code=201)
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
@@ -148,7 +143,7 @@ async def get_inventory(inventory_id: int, db: AsyncSession = Depends(get_db)):
     try:
         query = text("""
             SELECT id, item_code, category_id, status, create_by, last_updated_by, 
-                   create_date, last_updated_date, name, price, picture_blob
+                   create_date, last_updated_date, name, price, picture_blob, picture_hash
             FROM inventory_config WHERE id = :inventory_id
         """)
         result = await db.execute(query, {"inventory_id": inventory_id})
@@ -157,7 +152,7 @@ async def get_inventory(inventory_id: int, db: AsyncSession = Depends(get_db)):
         if not inventory:
             raise HTTPException(status_code=404, detail=f"Inventory item with ID {inventory_id} not found")
 
-        inventory_dict = {key: convert_datetime(value) for key, value in dict(inventory).items()}
+        inventory_dict = dict(inventory)
 
         # Convert picture_blob to Base64
         if "picture_blob" in inventory_dict:
@@ -169,6 +164,9 @@ async def get_inventory(inventory_id: int, db: AsyncSession = Depends(get_db)):
                 print("No picture BLOB found or not in bytes format")  # Debugging
                 inventory_dict["picture_blob"] = None  # Ensure JSON serializability
 
+        inventory_dict["image_url"] = image_url("inventory", inventory["id"], inventory["last_updated_date"],
+                                                inventory["picture_blob"] is not None, inventory["picture_hash"], "original")
+
         return JSONResponse(content={"data": inventory_dict}, status_code=200)
 
     except Exception as e:
@@ -216,7 +214,8 @@ async def get_all_inventory(db: AsyncSession = Depends(get_db)):
         query = text("""
             SELECT ic.id, ic.item_code, cc.name AS category_name, ic.status, 
                    uc1.emp_code AS create_by, uc2.emp_code AS last_updated_by, 
-                   ic.create_date, ic.last_updated_date, ic.name, ic.price, ic.picture_blob
+                   ic.create_date, ic.last_updated_date, ic.name, ic.price,
+                   ic.picture_hash, ic.picture_blob IS NOT NULL AS has_image
             FROM inventory_config ic
             LEFT JOIN category_config cc ON ic.category_id = cc.id  -- Join to get category name
             LEFT JOIN user_config uc1 ON ic.create_by = uc1.id
@@ -227,15 +226,10 @@ async def get_all_inventory(db: AsyncSession = Depends(get_db)):
 
         inventories = []
         for item in inventory_list:
-            item_dict = {key: convert_datetime(value) for key, value in dict(item).items()}
+            item_dict = {key: value for key, value in item.items() if key not in ("has_image", "picture_hash")}
 
-            # Handle picture_blob
-            if "picture_blob" in item_dict:
-                picture_blob = item_dict["picture_blob"]
-                if picture_blob and isinstance(picture_blob, bytes):
-                    item_dict["picture_blob"] = base64.b64encode(picture_blob).decode("utf-8")
-                else:
-                    item_dict["picture_blob"] = None  # Ensure JSON serializable
+            # Images are served by the streaming endpoint, the list only carries the thumbnail URL
+            item_dict["image_url"] = image_url("inventory", item["id"], item["last_updated_date"], item["has_image"], item["picture_hash"])
 
             inventories.append(item_dict)
 
@@ -278,18 +272,16 @@ async def update_inventory(
             update_data["category_id"] = category_data.id
 
         # Validate last_updated_by (convert emp_code to user_id)
-        user_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(user_query, {"emp_code": last_updated_by})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, last_updated_by)
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {last_updated_by} not found."})
         update_data["last_updated_by"] = user_data.id
 
-        # Convert image to base64 if file is provided
-        if file:
-            image_data = await file.read()
-            if image_data:
-                update_data["picture_blob"] = base64.b64encode(image_data).decode("utf-8")
+        # Store the image through the pipeline; the legacy blob column is cleared
+        picture_hash = await save_upload(db, file)
+        if picture_hash:
+            update_data["picture_hash"] = picture_hash
+            update_data["picture_blob"] = None
 
         # Only add fields that are provided in the request
         if item_code:
@@ -308,6 +300,11 @@ async def update_inventory(
         if not update_data:
             return JSONResponse(status_code=400, content={"message": "No fields provided for update."})
 
+        # A renamed, re-categorised or (de)activated unit moves between availability counters
+        moves_availability = any(key in update_data for key in ("name", "category_id", "status"))
+        if moves_availability:
+            await remove_unit_contribution(db, await unit_contribution(db, inventory_id))
+
         # Update fields dynamically
         update_fields = ", ".join([f"{key} = :{key}" for key in update_data.keys()])
         update_query = text(f"""
@@ -322,10 +319,15 @@ async def update_inventory(
         if result.rowcount == 0:
             return JSONResponse(status_code=400, content={"message": "No changes were made to the inventory item."})
 
+        if moves_availability:
+            await add_unit_contribution(db, await unit_contribution(db, inventory_id))
+
         await db.commit()
 
         return JSONResponse(content={"message": "Inventory updated successfully"}, status_code=200)
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
@@ -355,6 +357,9 @@ async def delete_inventory(item_code: str, db: AsyncSession = Depends(get_db)):
         if not inventory_id:
             raise HTTPException(status_code=404, detail="Inventory item not found")
 
+        # What the unit counted for before its listings disappear
+        contribution = await unit_contribution(db, inventory_id)
+
         # Delete from inventory_unreturned_listings
         await db.execute(text("DELETE FROM inventory_unreturned_listings WHERE listing_id IN "
                               "(SELECT id FROM inventory_listings WHERE inventory_id = :inventory_id)"),
@@ -372,6 +377,7 @@ async def delete_inventory(item_code: str, db: AsyncSession = Depends(get_db)):
         # Delete from inventory_config
         await db.execute(text("DELETE FROM inventory_config WHERE id = :inventory_id"),
                          {"inventory_id": inventory_id})
+        await remove_unit_contribution(db, contribution)
 
         await db.commit()  # Commit changes after successful deletion
 
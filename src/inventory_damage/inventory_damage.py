@@ -99,10 +99,11 @@
 #     return JSONResponse(content={"message": "Damaged listing deleted successfully"}, status_code=200)
 
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 from src.database_config import get_db
+from src.seedwork.export import export_response, ExportFormat
 from pydantic import BaseModel
 from typing import List
 
@@ -160,6 +161,15 @@ async def get_all_damaged_listings(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+# ✅ Export All Damaged Listings (NDJSON / CSV)
+@router.get("/damaged-listings/export")
+async def export_damaged_listings(request: Request, format: str = ExportFormat):
+    query = text("""
+        SELECT id, listing_id, status, create_by, last_updated_by, create_date, last_updated_date
+        FROM inventory_damaged_listings
+    """)
+    return await export_response(request, query, format, "damaged_listings")
+
 ### ✅ 3️⃣ Get a Damaged Listing by ID (SELECT) ###
 @router.get("/damaged-listings/{damaged_id}", response_model=dict)
 async def get_damaged_listing(damaged_id: int, db: AsyncSession = Depends(get_db)):
@@ -183,17 +183,53 @@
 #         raise HTTPException(status_code=500, detail="Database error")
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Form, File
+from fastapi import APIRouter, Depends, HTTPException, Form, File, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from starlette.responses import JSONResponse
+from src.seedwork.responses import JSONResponse
 from src.database_config import get_db
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
+from src.seedwork.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/inventory-listings")
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Continue strictly after the last (create_date, id) of the previous page
+KEYSET_AFTER_CURSOR = "(il.create_date < :cursor_date OR (il.create_date = :cursor_date AND il.id < :cursor_id))"
+
+
+def listing_page_query(where_clause: str = ""):
+    """
+    One keyset page, newest first. The ORDER BY walks idx_inventory_listings_create_date_id
+    backwards, so an unfiltered or date-bounded page reads about `limit` rows however large
+    the table is, instead of sorting the whole join.
+    """
+    return text(f"""
+        SELECT 
+            il.id, 
+            ic.item_code,  -- Fetching item_code instead of inventory_id
+            il.reasons, 
+            il.status, 
+            il.create_by, 
+            il.last_updated_by, 
+            il.create_date, 
+            il.last_updated_date, 
+            il.is_damaged, 
+            uc.emp_code,  -- Fetching emp_code instead of emp_id
+            uc.first_name AS user_name  -- Using 'first_name' instead of 'name'
+        FROM inventory_listings il
+        JOIN user_config uc ON il.emp_id = uc.id
+        JOIN inventory_config ic ON il.inventory_id = ic.id
+        {where_clause}
+        ORDER BY il.create_date DESC, il.id DESC
+        LIMIT :limit
+    """)
+
+
 # ✅ Request model for creating & updating inventory listings
 class InventoryListingSchema(BaseModel):
     inventory_id: int
@@ -230,35 +266,62 @@ class InventoryListingSchema(BaseModel):
 
 
 @router.get("/listings")
-async def get_all_inventory_listings(db: AsyncSession = Depends(get_db)):
+async def get_all_inventory_listings(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    status: Optional[str] = Query(default=None),
+    emp_code: Optional[str] = Query(default=None),
+    item_code: Optional[str] = Query(default=None),
+    is_damaged: Optional[bool] = Query(default=None),
+    date_from: Optional[datetime] = Query(default=None),
+    date_to: Optional[datetime] = Query(default=None),
+    db: AsyncSession = Depends(get_db)
+):
     try:
-        query = text("""
-            SELECT 
-                il.id, 
-                ic.item_code,  -- Fetching item_code instead of inventory_id
-                il.reasons, 
-                il.status, 
-                il.create_by, 
-                il.last_updated_by, 
-                il.create_date, 
-                il.last_updated_date, 
-                il.is_damaged, 
-                uc.emp_code,  -- Fetching emp_code instead of emp_id
-                uc.first_name AS user_name  -- Using 'first_name' instead of 'name'
-            FROM inventory_listings il
-            JOIN user_config uc ON il.emp_id = uc.id
-            JOIN inventory_config ic ON il.inventory_id = ic.id
-        """)
-        result = await db.execute(query)
+        # Filters are pushed into SQL so each page costs at most `limit` rows
+        conditions = []
+        params = {"limit": limit + 1}
+        if status:
+            conditions.append("il.status = :status")
+            params["status"] = status
+        if emp_code:
+            conditions.append("uc.emp_code = :emp_code")
+            params["emp_code"] = emp_code
+        if item_code:
+            conditions.append("ic.item_code = :item_code")
+            params["item_code"] = item_code
+        if is_damaged is not None:
+            conditions.append("il.is_damaged = :is_damaged")
+            params["is_damaged"] = is_damaged
+        if date_from:
+            conditions.append("il.create_date >= :date_from")
+            params["date_from"] = date_from
+        if date_to:
+            conditions.append("il.create_date < :date_to")
+            params["date_to"] = date_to
+
+        # Keyset: continue strictly after the last row of the previous page
+        position = decode_cursor(cursor)
+        if position:
+            conditions.append(KEYSET_AFTER_CURSOR)
+            params["cursor_date"], params["cursor_id"] = position
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = listing_page_query(where_clause)
+        result = await db.execute(query, params)
         listings = result.mappings().all()
 
-        def convert_datetime(value):
-            return value.isoformat() if isinstance(value, datetime) else value
-
-        formatted_listings = [{key: convert_datetime(value) for key, value in dict(item).items()} for item in listings]
+        # One extra row tells us whether another page exists without a COUNT(*)
+        next_cursor = None
+        if len(listings) > limit:
+            listings = listings[:limit]
+            last_row = listings[-1]
+            next_cursor = encode_cursor(last_row["create_date"], last_row["id"])
 
-        return JSONResponse(content={"data": formatted_listings}, status_code=200)
+        return JSONResponse(content={"data": listings, "next_cursor": next_cursor, "limit": limit}, status_code=200)
 
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         logging.error("Error occurred while fetching all inventory listings: %s", str(e))
         raise HTTPException(status_code=500, detail="Database error")
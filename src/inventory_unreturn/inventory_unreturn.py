@@ -1,10 +1,10 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Form, File
+from fastapi import APIRouter, Depends, HTTPException, Form, File, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from starlette.responses import JSONResponse
+from src.seedwork.responses import JSONResponse
 from src.database_config import get_db
-from datetime import datetime
+from src.seedwork.export import export_response, ExportFormat
 from typing import Optional
 from pydantic import BaseModel
 
@@ -28,18 +28,21 @@ async def get_all_inventory_unreturned_listings(db: AsyncSession = Depends(get_d
         result = await db.execute(query)
         listings = result.mappings().all()
 
-        def convert_datetime(value):
-            return value.isoformat() if isinstance(value, datetime) else value
-
-        # Convert datetime fields to string
-        formatted_listings = [{key: convert_datetime(value) for key, value in dict(item).items()} for item in listings]
-
-        return JSONResponse(content={"data": formatted_listings}, status_code=200)
+        return JSONResponse(content={"data": listings}, status_code=200)
 
     except Exception as e:
         logging.error("Error: %s", str(e))
         raise HTTPException(status_code=500, detail="Database error")
 
+# ✅ Export all inventory unreturned listings (NDJSON / CSV)
+@router.get("/export-listings")
+async def export_inventory_unreturned_listings(request: Request, format: str = ExportFormat):
+    query = text("""
+        SELECT id, listing_id, status, create_by, last_updated_by, create_date, last_updated_date
+        FROM inventory_unreturned_listings
+    """)
+    return await export_response(request, query, format, "unreturned_listings")
+
 # ✅ Create inventory unreturned listing
 @router.post("/create-listing")
 async def create_inventory_unreturned_listing(
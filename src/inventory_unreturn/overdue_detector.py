@@ -0,0 +1,190 @@
+"""
+Fills inventory_unreturned_listings from inventory_listings that stayed Active past the
+overdue threshold. Runs in the background of each worker (and once from the command
+line); take_product only reads the result.
+
+    python -m src.inventory_unreturn.overdue_detector   # one pass, then exit
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from dotenv import load_dotenv
+
+# Application modules
+from src.database_config import session_local
+from src.monitoring.metrics import OVERDUE_LISTINGS_FLAGGED, OVERDUE_LISTINGS_SCANNED, OVERDUE_RUN_DURATION, OVERDUE_WATERMARK
+from src.seedwork.logger import logging_component
+
+load_dotenv()
+logger = logging_component.get_gray_logger()
+
+# 0 disables the background scan
+OVERDUE_SCAN_INTERVAL = float(os.getenv("OVERDUE_SCAN_INTERVAL", 300))
+OVERDUE_BATCH_SIZE = int(os.getenv("OVERDUE_BATCH_SIZE", 5000))
+# Used when parameter_config has no active overdue_return_hours row
+OVERDUE_RETURN_HOURS = float(os.getenv("OVERDUE_RETURN_HOURS", 24))
+
+OVERDUE_PARAM_NAME = "overdue_return_hours"
+WATERMARK_NAME = "overdue_listings"
+
+overdue_threshold_query = text("""
+    SELECT param_value FROM parameter_config
+    WHERE param_name = :param_name AND status = 'Active'
+    ORDER BY machine_id IS NOT NULL, id DESC
+    LIMIT 1
+""")
+
+# SKIP LOCKED: while one worker scans, the others see no row and skip this run
+lock_watermark_query = text("""
+    SELECT last_id FROM job_watermarks WHERE name = :name FOR UPDATE SKIP LOCKED
+""")
+
+# The next listings after the watermark, each marked with whether it is old enough yet
+next_listings_query = text("""
+    SELECT id, create_date <= NOW() - INTERVAL :threshold_seconds SECOND AS is_due
+    FROM inventory_listings
+    WHERE id > :watermark
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+# Every listing in (watermark, upper] is past the threshold; flag those still out
+insert_overdue_query = text("""
+    INSERT INTO inventory_unreturned_listings (listing_id, status, create_by, last_updated_by, create_date, last_updated_date)
+    SELECT il.id, 'Active', il.create_by, il.create_by, NOW(), NOW()
+    FROM inventory_listings il
+    WHERE il.id > :watermark AND il.id <= :upper AND il.status = 'Active'
+      AND NOT EXISTS (SELECT 1 FROM inventory_unreturned_listings iul WHERE iul.listing_id = il.id)
+""")
+
+advance_watermark_query = text("""
+    UPDATE job_watermarks SET last_id = :last_id, last_run_date = NOW() WHERE name = :name
+""")
+
+
+@dataclass
+class OverdueBatch:
+    scanned: int
+    flagged: int
+    watermark: int
+
+
+async def overdue_threshold_seconds(db: AsyncSession) -> float:
+    value = (await db.execute(overdue_threshold_query, {"param_name": OVERDUE_PARAM_NAME})).scalar()
+    if value is None:
+        return OVERDUE_RETURN_HOURS * 3600
+    try:
+        return float(value) * 3600
+    except ValueError:
+        logger.warning(f"parameter_config {OVERDUE_PARAM_NAME}={value!r} is not a number, using {OVERDUE_RETURN_HOURS}h",
+                       extra={'host': 'system', 'user': 'system', 'source': 'Overdue Detector'})
+        return OVERDUE_RETURN_HOURS * 3600
+
+
+async def flag_overdue_batch(db: AsyncSession, threshold_seconds: float, batch_size: int) -> Optional[OverdueBatch]:
+    """
+    Advances the watermark over the next run of listings that are all past the threshold
+    and flags the ones still Active, in one transaction. Listing ids and create dates grow
+    together, so the watermark stops at the first listing that is not due yet and that
+    listing is looked at again next run. Returns None when another worker holds the job.
+    """
+    # READ COMMITTED makes the INSERT ... SELECT read inventory_listings without locking it,
+    # so kiosk returns never wait on a scan
+    await db.connection(execution_options={"isolation_level": "READ COMMITTED"})
+    watermark = (await db.execute(lock_watermark_query, {"name": WATERMARK_NAME})).scalar()
+    if watermark is None:
+        await db.commit()
+        return None
+
+    listings = (await db.execute(next_listings_query, {
+        "watermark": watermark, "threshold_seconds": int(threshold_seconds), "batch_size": batch_size,
+    })).fetchall()
+    upper, scanned = watermark, 0
+    for listing in listings:
+        if not listing.is_due:
+            break
+        upper, scanned = listing.id, scanned + 1
+
+    flagged = 0
+    if scanned:
+        flagged = (await db.execute(insert_overdue_query, {"watermark": watermark, "upper": upper})).rowcount
+        await db.execute(advance_watermark_query, {"name": WATERMARK_NAME, "last_id": upper})
+    await db.commit()
+    return OverdueBatch(scanned, flagged, upper)
+
+
+class OverdueDetector:
+    def __init__(self, interval: float, batch_size: int = OVERDUE_BATCH_SIZE) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_flagged = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Works through every due batch; returns how many listings were flagged"""
+        started = time.perf_counter()
+        flagged = 0
+        try:
+            async with session_local() as db:
+                try:
+                    threshold_seconds = await overdue_threshold_seconds(db)
+                    await db.commit()
+                    while True:
+                        batch = await flag_overdue_batch(db, threshold_seconds, self.batch_size)
+                        if batch is None:
+                            break
+                        flagged += batch.flagged
+                        OVERDUE_LISTINGS_SCANNED.inc(batch.scanned)
+                        OVERDUE_LISTINGS_FLAGGED.inc(batch.flagged)
+                        OVERDUE_WATERMARK.set(batch.watermark)
+                        if batch.scanned < self.batch_size:
+                            break
+                except Exception as error:
+                    await db.rollback()
+                    logger.error(f"Overdue detection failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Overdue Detector'})
+        finally:
+            OVERDUE_RUN_DURATION.observe(time.perf_counter() - started)
+        if flagged:
+            logger.info(f"Overdue detection flagged {flagged} listing(s)", extra={'host': 'system', 'user': 'system', 'source': 'Overdue Detector'})
+        self.last_flagged = flagged
+        return flagged
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def ensure_started(self) -> None:
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+overdue_detector = OverdueDetector(OVERDUE_SCAN_INTERVAL)
+
+
+async def main() -> None:
+    from src.database_config import database_manager
+    try:
+        flagged = await overdue_detector.run_once()
+    finally:
+        await database_manager.shutdown()
+    print(f"Flagged {flagged} overdue listing(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from src.product_selection.availability import adjust_availability, is_active
+
+# Rows per INSERT statement; keeps each packet well under max_allowed_packet
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Per-code outcomes returned to the caller
+CREATED = "created"
+ALREADY_EXISTS = "already_exists"
+DUPLICATE_IN_REQUEST = "duplicate_in_request"
+INVALID = "invalid"
+
+existing_item_codes_query = text("""
+    SELECT item_code FROM inventory_config WHERE item_code IN :item_codes
+""").bindparams(bindparam("item_codes", expanding=True))
+
+
+def normalize_item_codes(item_codes: Iterable) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Strips codes and drops blanks and repeats, keeping request order.
+    Returns (codes to load, {code: INVALID} for the blanks).
+    """
+    codes, rejected, seen = [], {}, set()
+    for item_code in item_codes:
+        if not isinstance(item_code, str) or not item_code.strip():
+            rejected[str(item_code)] = INVALID
+            continue
+        item_code = item_code.strip()
+        if item_code in seen:
+            continue
+        seen.add(item_code)
+        codes.append(item_code)
+    return codes, rejected
+
+
+async def find_existing_item_codes(db: AsyncSession, item_codes: List[str]) -> set:
+    """One round trip for the whole pallet instead of failing on the first duplicate"""
+    if not item_codes:
+        return set()
+    result = await db.execute(existing_item_codes_query, {"item_codes": item_codes})
+    return {row.item_code for row in result.fetchall()}
+
+
+def build_insert_query(row_count: int):
+    # Shared columns are bound once; only item_code varies per row
+    values = ",\n".join(
+        f"(:item_code_{index}, :category_id, :status, :create_by, :last_updated_by, NOW(), NOW(), :name, :price)"
+        for index in range(row_count)
+    )
+    return text(f"""
+        INSERT INTO inventory_config
+        (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price)
+        VALUES
+        {values}
+    """)
+
+
+async def bulk_insert_inventory(db: AsyncSession, item_codes: List[str], columns: Dict,
+                                chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> int:
+    """
+    Inserts `item_codes` with the shared `columns` (category_id, status, create_by,
+    last_updated_by, name, price) as multi-row INSERTs inside the caller's transaction.
+    """
+    inserted = 0
+    for start in range(0, len(item_codes), chunk_size):
+        chunk = item_codes[start:start + chunk_size]
+        params = dict(columns)
+        params.update({f"item_code_{index}": item_code for index, item_code in enumerate(chunk)})
+        await db.execute(build_insert_query(len(chunk)), params)
+        inserted += len(chunk)
+
+    if inserted and is_active(columns["status"]):
+        await adjust_availability(db, columns["name"], columns["category_id"], available=inserted, price=columns["price"])
+    return inserted
+
+
+def build_row_insert_query(row_count: int):
+    # Every column varies per row, for imports that mix products in one file
+    values = ",\n".join(
+        f"(:item_code_{index}, :category_id_{index}, :status_{index}, :create_by, :last_updated_by, NOW(), NOW(), :name_{index}, :price_{index})"
+        for index in range(row_count)
+    )
+    return text(f"""
+        INSERT INTO inventory_config
+        (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price)
+        VALUES
+        {values}
+    """)
+
+
+async def insert_inventory_rows(db: AsyncSession, rows: List[Dict], create_by: int, last_updated_by: int,
+                                chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> int:
+    """
+    Inserts rows carrying their own item_code, category_id, status, name and price
+    as multi-row INSERTs inside the caller's transaction.
+    """
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        params = {"create_by": create_by, "last_updated_by": last_updated_by}
+        for index, row in enumerate(chunk):
+            for column in ("item_code", "category_id", "status", "name", "price"):
+                params[f"{column}_{index}"] = row[column]
+        await db.execute(build_row_insert_query(len(chunk)), params)
+        inserted += len(chunk)
+
+    # One counter update per product rather than per row
+    loaded = {}
+    for row in rows:
+        if is_active(row["status"]):
+            count, price = loaded.get((row["name"], row["category_id"]), (0, 0))
+            loaded[(row["name"], row["category_id"])] = (count + 1, max(price, row["price"]))
+    for (name, category_id), (count, price) in loaded.items():
+        await adjust_availability(db, name, category_id, available=count, price=price)
+    return inserted
+
+
+async def load_inventory_units(db: AsyncSession, item_codes: Iterable, columns: Dict) -> Tuple[int, List[Dict]]:
+    """
+    Loads a pallet of units, skipping codes that are blank, repeated or already in
+    inventory_config. Returns (inserted count, per-code results in request order).
+    The caller commits.
+    """
+    item_codes = list(item_codes)
+    codes, outcomes = normalize_item_codes(item_codes)
+    # item_code compares case-insensitively under the default MySQL collation
+    existing = {item_code.lower() for item_code in await find_existing_item_codes(db, codes)}
+    new_codes = [item_code for item_code in codes if item_code.lower() not in existing]
+
+    inserted = await bulk_insert_inventory(db, new_codes, columns)
+
+    outcomes.update({item_code: ALREADY_EXISTS if item_code.lower() in existing else CREATED for item_code in codes})
+    results, reported = [], set()
+    for item_code in item_codes:
+        key = item_code.strip() if isinstance(item_code, str) and item_code.strip() else str(item_code)
+        if key in reported:
+            # Report the repeat, not a second "created"
+            results.append({"item_code": key, "status": DUPLICATE_IN_REQUEST})
+            continue
+        reported.add(key)
+        results.append({"item_code": key, "status": outcomes[key]})
+    return inserted, results
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi.responses import StreamingResponse
+from src.seedwork.responses import JSONResponse
+from typing import List, Optional
 from pydantic import BaseModel
 from src.database_config import get_db
-from datetime import datetime
-
-def convert_datetime(value):
-    """Convert datetime to string format or return as-is for other types."""
-    return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value 
+from src.monitoring.metrics import record_inventory_event
+from src.monitoring.live_dashboard import publish_inventory_event
+from src.users.user_resolver import user_resolver
+from src.load_item.bulk_loader import load_inventory_units, CREATED, ALREADY_EXISTS
+from src.load_item.pallet_import import open_pallet_file, load_category_ids, stream_pallet_import
 
 router = APIRouter()
 
@@ -100,6 +101,7 @@ import traceback  # ✅ Import this to capture detailed errors
 @router.post("/load_items", response_model=dict)
 async def load_items(
     request: InventoryCreateRequest,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -114,56 +116,88 @@ async def load_items(
             raise HTTPException(status_code=404, detail=f"Category '{request.category_name}' not found.")
         category_id = category_data[0]  # ✅ Extract the category ID
 
-        # ✅ Fetch user IDs
-        user_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-
-        async def get_user_id(emp_code):
-            result = await db.execute(user_query, {"emp_code": emp_code})
-            user_data = result.fetchone()
-            return user_data[0] if user_data else None  # ✅ Extract the user ID
-
-        create_by_id = await get_user_id(request.create_by)
-        last_updated_by_id = await get_user_id(request.last_updated_by)
+        # ✅ Fetch user IDs (cached per emp_code)
+        create_by_id = await user_resolver.resolve_id(db, request.create_by)
+        last_updated_by_id = await user_resolver.resolve_id(db, request.last_updated_by)
 
         if not create_by_id:
             raise HTTPException(status_code=404, detail=f"User with emp_code {request.create_by} not found.")
         if not last_updated_by_id:
             raise HTTPException(status_code=404, detail=f"User with emp_code {request.last_updated_by} not found.")
 
-        # ✅ Insert items
-        insert_query = text("""
-            INSERT INTO inventory_config 
-            (item_code, category_id, status, create_by, last_updated_by, create_date, last_updated_date, name, price)
-            VALUES 
-            (:item_code, :category_id, :status, :create_by, :last_updated_by, NOW(), NOW(), :name, :price)
-        """)
+        # ✅ Insert items: one existence check, then chunked multi-row INSERTs
+        columns = {
+            "category_id": category_id,
+            "status": request.status,
+            "create_by": create_by_id,
+            "last_updated_by": last_updated_by_id,
+            "name": request.name,
+            "price": request.price
+        }
 
-        inserted_count = 0
         try:
-            for item_code in request.item_codes:
-                if isinstance(item_code, str) and item_code.strip():
-                    await db.execute(insert_query, {
-                        "item_code": item_code.strip(),  
-                        "category_id": category_id, 
-                        "status": request.status,
-                        "create_by": create_by_id, 
-                        "last_updated_by": last_updated_by_id,
-                        "name": request.name, 
-                        "price": request.price
-                    })
-                    inserted_count += 1  
-
-            if inserted_count == 0:
+            inserted_count, results = await load_inventory_units(db, request.item_codes, columns)
+
+            if not any(item["status"] in (CREATED, ALREADY_EXISTS) for item in results):
                 raise HTTPException(status_code=400, detail="No valid item_codes provided.")
 
             await db.commit()
+            record_inventory_event("load", machine_id, inserted_count)
+            publish_inventory_event("load", machine_id, request.name, inserted_count)
+        except HTTPException as http_err:
+            await db.rollback()
+            raise http_err
         except Exception as e:
             await db.rollback()
             print("🔴 Database Insert Error:", traceback.format_exc())  # ✅ Print full error
             raise HTTPException(status_code=500, detail=str(e))
 
-        return {"message": f"{inserted_count} inventory items created successfully"}
+        return {
+            "message": f"{inserted_count} inventory items created successfully",
+            "created_count": inserted_count,
+            "skipped_count": len(results) - inserted_count,
+            "results": results
+        }
+
+    except HTTPException as http_err:
+        raise http_err
+    except Exception as e:
+        print("🔴 Unexpected Error:", traceback.format_exc())  # ✅ Print full error
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/import")
+async def import_pallet(
+    file: UploadFile = File(...),
+    create_by: str = Form(...),
+    last_updated_by: Optional[str] = Form(None),
+    status: str = Form("Active"),
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Imports a CSV/XLSX scanner export (columns item_code, name, category, optional price and status).
+    Streams NDJSON: one progress line per committed chunk with that chunk's row errors, then a summary.
+    """
+    try:
+        last_updated_by = last_updated_by or create_by
+        user_ids = {emp_code: await user_resolver.resolve_id(db, emp_code) for emp_code in {create_by, last_updated_by}}
+
+        for emp_code in (create_by, last_updated_by):
+            if not user_ids.get(emp_code):
+                raise HTTPException(status_code=404, detail=f"User with emp_code {emp_code} not found.")
+
+        category_ids = await load_category_ids(db)
+        reader = await open_pallet_file(file)
 
+        users = {"create_by": user_ids[create_by], "last_updated_by": user_ids[last_updated_by]}
+        return StreamingResponse(
+            stream_pallet_import(reader, category_ids, users, status, machine_id),
+            media_type="application/x-ndjson",
+        )
+
+    except HTTPException as http_err:
+        raise http_err
     except Exception as e:
         print("🔴 Unexpected Error:", traceback.format_exc())  # ✅ Print full error
         raise HTTPException(status_code=500, detail=str(e))
@@ -183,10 +217,13 @@ async def filter_products(category_name: str, db: AsyncSession = Depends(get_db)
         category_id = category_data.id
 
         # Fetch products related to the category, fixing the column name issue
+        # (timestamps keep this endpoint's "YYYY-MM-DD HH:MM:SS" format)
         get_products_query = text("""
             SELECT 
                 ic.id, ic.item_code, ic.name, ic.status, ic.price, 
-                ic.category_id, ic.create_date, ic.last_updated_date, 
+                ic.category_id,
+                DATE_FORMAT(ic.create_date, '%Y-%m-%d %H:%i:%s') AS create_date,
+                DATE_FORMAT(ic.last_updated_date, '%Y-%m-%d %H:%i:%s') AS last_updated_date,
                 uc1.emp_code AS create_by,  -- ✅ Using the correct column name
                 uc2.emp_code AS last_updated_by
             FROM inventory_config ic
@@ -197,12 +234,6 @@ async def filter_products(category_name: str, db: AsyncSession = Depends(get_db)
         result = await db.execute(get_products_query, {"category_id": category_id})
         products = result.mappings().all()
 
-        # Convert datetime fields to strings
-        product_list = [
-            {key: convert_datetime(value) for key, value in dict(product).items()}
-            for product in products
-        ]
-
         # Get the count of products
         product_count_query = text("SELECT COUNT(*) AS total FROM inventory_config WHERE category_id = :category_id")
         result = await db.execute(product_count_query, {"category_id": category_id})
@@ -212,7 +243,7 @@ async def filter_products(category_name: str, db: AsyncSession = Depends(get_db)
             "category_name": category_name,
             "category_id": category_id,
             "total_products": total_products,
-            "products": product_list
+            "products": products
         })
 
     except Exception as e:
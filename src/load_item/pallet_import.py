@@ -0,0 +1,197 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import openpyxl
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from starlette.concurrency import run_in_threadpool
+
+# Application modules
+from src.database_config import session_local
+from src.load_item.bulk_loader import find_existing_item_codes, insert_inventory_rows
+from src.monitoring.metrics import record_inventory_event
+from src.monitoring.live_dashboard import publish_inventory_event
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+# Rows parsed, checked and committed together; bounds memory and transaction size
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = {".csv": "csv", ".xlsx": "xlsx"}
+REQUIRED_COLUMNS = ("item_code", "name", "category")
+# Header spellings seen in scanner exports
+COLUMN_ALIASES = {"item code": "item_code", "itemcode": "item_code", "category_name": "category", "product": "name"}
+
+category_ids_query = text("SELECT id, name FROM category_config")
+
+
+def detect_format(file: UploadFile) -> str:
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .xlsx file.")
+    return IMPORT_FORMATS[extension]
+
+
+def normalize_header(header) -> List[str]:
+    columns = [str(column or "").strip().lower() for column in header]
+    return [COLUMN_ALIASES.get(column, column) for column in columns]
+
+
+class PalletReader:
+    """Reads an import file a chunk at a time; only the current chunk is held in memory"""
+
+    def __init__(self, path: str, file_format: str) -> None:
+        self.path = path
+        self.workbook = None
+        self.handle = None
+        if file_format == "xlsx":
+            # read_only streams rows from the sheet XML instead of loading the workbook
+            self.workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+            rows = self.workbook.active.iter_rows(values_only=True)
+        else:
+            self.handle = open(path, newline="", encoding="utf-8-sig")
+            rows = csv.reader(self.handle)
+
+        self.columns = normalize_header(next(rows, []))
+        missing = [column for column in REQUIRED_COLUMNS if column not in self.columns]
+        if missing:
+            self.close()
+            raise ValueError(f"Missing column(s): {', '.join(missing)}")
+        self.rows = enumerate(rows, start=2)  # row 1 is the header
+
+    def read_chunk(self, size: int) -> List[Tuple[int, Dict]]:
+        return [(row_number, dict(zip(self.columns, values))) for row_number, values in islice(self.rows, size)]
+
+    def close(self) -> None:
+        if self.workbook is not None:
+            self.workbook.close()
+        if self.handle is not None:
+            self.handle.close()
+
+
+def spool_upload(file: UploadFile, suffix: str) -> str:
+    # The UploadFile is closed once the handler returns, before the progress stream runs
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as target:
+        file.file.seek(0)
+        shutil.copyfileobj(file.file, target, 1024 * 1024)
+        return target.name
+
+
+async def open_pallet_file(file: UploadFile) -> PalletReader:
+    file_format = detect_format(file)
+    path = await run_in_threadpool(spool_upload, file, f".{file_format}")
+    try:
+        return await run_in_threadpool(PalletReader, path, file_format)
+    except Exception as error:
+        os.unlink(path)
+        raise HTTPException(status_code=400, detail=f"Could not read {file.filename}: {error}")
+
+
+async def load_category_ids(db: AsyncSession) -> Dict[str, int]:
+    """Resolved once per import; category names are matched case-insensitively"""
+    result = await db.execute(category_ids_query)
+    return {row.name.strip().lower(): row.id for row in result.fetchall() if row.name}
+
+
+def cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel hands numeric item codes back as floats
+        value = int(value)
+    return str(value).strip()
+
+
+def validate_row(row: Dict, category_ids: Dict[str, int], default_status: str) -> Tuple[Optional[Dict], Optional[str]]:
+    item_code = cell_text(row.get("item_code"))
+    name = cell_text(row.get("name"))
+    category = cell_text(row.get("category"))
+    if not item_code:
+        return None, "item_code is empty"
+    if not name:
+        return None, "name is empty"
+    if category.lower() not in category_ids:
+        return None, f"Category '{category}' not found"
+
+    price = cell_text(row.get("price")) or "0"
+    try:
+        price = int(float(price))
+    except ValueError:
+        return None, f"Invalid price '{price}'"
+
+    return {
+        "item_code": item_code,
+        "name": name,
+        "category_id": category_ids[category.lower()],
+        "status": cell_text(row.get("status")) or default_status,
+        "price": price,
+    }, None
+
+
+async def import_chunk(chunk: List[Tuple[int, Dict]], category_ids: Dict[str, int], users: Dict, default_status: str) -> Dict:
+    errors, candidates, seen = [], [], set()
+    for row_number, row in chunk:
+        valid_row, error = validate_row(row, category_ids, default_status)
+        if error:
+            errors.append({"row": row_number, "item_code": cell_text(row.get("item_code")), "error": error})
+        elif valid_row["item_code"].lower() in seen:
+            errors.append({"row": row_number, "item_code": valid_row["item_code"], "error": "Duplicate item_code in file"})
+        else:
+            seen.add(valid_row["item_code"].lower())
+            candidates.append((row_number, valid_row))
+
+    created, loaded = 0, Counter()
+    async with session_local() as db:
+        try:
+            # Earlier chunks are already committed, so this also catches repeats across chunks
+            existing = {item_code.lower() for item_code in
+                        await find_existing_item_codes(db, [row["item_code"] for _, row in candidates])}
+            new_rows = []
+            for row_number, row in candidates:
+                if row["item_code"].lower() in existing:
+                    errors.append({"row": row_number, "item_code": row["item_code"], "error": "item_code already exists"})
+                else:
+                    new_rows.append(row)
+            created = await insert_inventory_rows(db, new_rows, users["create_by"], users["last_updated_by"])
+            await db.commit()
+            loaded = Counter(row["name"] for row in new_rows)
+        except Exception as error:
+            await db.rollback()
+            logger.error(f"Pallet import chunk failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Pallet Import'})
+            created = 0
+            errors = [{"row": row_number, "item_code": cell_text(row.get("item_code")), "error": "Chunk was not saved"}
+                      for row_number, row in chunk]
+
+    errors.sort(key=lambda error: error["row"])
+    return {"rows": len(chunk), "created": created, "loaded": loaded, "errors": errors}
+
+
+async def stream_pallet_import(reader: PalletReader, category_ids: Dict[str, int], users: Dict,
+                               default_status: str, machine_id: Optional[str]) -> AsyncIterator[bytes]:
+    """Yields one NDJSON progress line per chunk, then a summary line"""
+    totals = {"rows_processed": 0, "created": 0, "failed": 0}
+    try:
+        while True:
+            chunk = await run_in_threadpool(reader.read_chunk, IMPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            result = await import_chunk(chunk, category_ids, users, default_status)
+            record_inventory_event("load", machine_id, result["created"])
+            for product_name, count in result["loaded"].items():
+                publish_inventory_event("load", machine_id, product_name, count)
+
+            totals["rows_processed"] += result["rows"]
+            totals["created"] += result["created"]
+            totals["failed"] += len(result["errors"])
+            yield (json.dumps({"type": "progress", **totals, "errors": result["errors"]}) + "\n").encode("utf-8")
+
+        yield (json.dumps({"type": "summary", **totals}) + "\n").encode("utf-8")
+    finally:
+        await run_in_threadpool(reader.close)
+        os.unlink(reader.path)
@@ -1,18 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from src.seedwork.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from datetime import datetime
 from src.database_config import get_db
+from src.seedwork.export import export_response, ExportFormat
 
 router = APIRouter(prefix="/location-handler")
 
-def convert_datetime(value):
-    """Convert datetime objects to ISO format strings"""
-    if isinstance(value, datetime):
-        return value.isoformat()  # Converts to "YYYY-MM-DDTHH:MM:SS"
-    return value  # Return other data types as-is
-
 # Create Location
 @router.post("/create-location")
 async def create_location(name: str, status: str, created_by: int, last_updated_by: int, db: AsyncSession = Depends(get_db)):
@@ -55,14 +49,17 @@ async def get_locations(db: AsyncSession = Depends(get_db)):
         result = await db.execute(query)
         locations = result.mappings().all()
 
-        # Convert RowMapping to list of dictionaries
-        location_list = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in locations]
-
-        return JSONResponse(content={"data": location_list}, status_code=200)
+        # Rows are serialized as-is by the shared JSONResponse
+        return JSONResponse(content={"data": locations}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
 
+# Export All Locations (NDJSON / CSV)
+@router.get("/export-locations")
+async def export_locations(request: Request, format: str = ExportFormat):
+    return await export_response(request, text("SELECT * FROM location_config"), format, "locations")
+
 # Get Location by ID
 @router.get("/get-location/{location_id}")
 async def get_location(location_id: int, db: AsyncSession = Depends(get_db)):
@@ -74,9 +71,7 @@ async def get_location(location_id: int, db: AsyncSession = Depends(get_db)):
         if not location:
             raise HTTPException(status_code=404, detail=f"Location with ID {location_id} not found")
 
-        location_dict = {key: convert_datetime(value) for key, value in dict(location).items()}
-
-        return JSONResponse(content={"data": location_dict}, status_code=200)
+        return JSONResponse(content={"data": location}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
@@ -1,19 +1,14 @@
-from fastapi import Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, HTTPException, Request
+from src.seedwork.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import AsyncGenerator
-from datetime import datetime
 
 # Application modules
 from src.database_config import get_db
 from src.seedwork.models.status_msg_model import StatusMessage
-
-def convert_datetime(value):
-    """Convert datetime objects to ISO format strings"""
-    if isinstance(value, datetime):
-        return value.isoformat()  # Converts to "YYYY-MM-DDTHH:MM:SS"
-    return value  # Return other data types as-is
+from src.seedwork.export import export_response, ExportFormat
+from src.machines.machine_registry import machine_registry
 
 # Get all machines
 async def machine_list(db_engine: AsyncGenerator = Depends(get_db)):
@@ -23,8 +18,11 @@ async def machine_list(db_engine: AsyncGenerator = Depends(get_db)):
     if not machine_list_data:
         raise HTTPException(status_code=404, detail=[{"msg": StatusMessage.s_404}])
 
-    formatted_data = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in machine_list_data]
-    return JSONResponse(content={"data": formatted_data}, status_code=200)
+    return JSONResponse(content={"data": machine_list_data}, status_code=200)
+
+# Export all machines (NDJSON / CSV)
+async def export_machines(request: Request, format: str = ExportFormat):
+    return await export_response(request, text("SELECT * FROM machine_listings"), format, "machines")
 
 # Get a specific machine by ID
 async def get_machine(machine_id: int, db_engine: AsyncGenerator = Depends(get_db)):
@@ -35,8 +33,7 @@ async def get_machine(machine_id: int, db_engine: AsyncGenerator = Depends(get_d
     if not machine_data:
         raise HTTPException(status_code=404, detail=[{"msg": StatusMessage.s_404}])
 
-    formatted_data = {key: convert_datetime(value) for key, value in dict(machine_data).items()}
-    return JSONResponse(content={"data": formatted_data}, status_code=200)
+    return JSONResponse(content={"data": machine_data}, status_code=200)
 
 # Create a new machine
 async def create_machine(
@@ -63,6 +60,7 @@ async def create_machine(
             "last_updated_by": last_updated_by
         })
         await db_engine.commit()
+        machine_registry.invalidate()
         return JSONResponse(content={"message": "Machine created successfully"}, status_code=201)
     except Exception as e:
         print(f"Error: {e}")  # Debugging Log
@@ -93,4 +91,5 @@ async def delete_machine(machine_id: int, db_engine: AsyncGenerator = Depends(ge
     query = text("DELETE FROM machine_listings WHERE id = :machine_id")
     await db_engine.execute(query, {"machine_id": machine_id})
     await db_engine.commit()
+    machine_registry.invalidate()
     return JSONResponse(content={"message": "Machine deleted successfully"}, status_code=200)
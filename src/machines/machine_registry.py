@@ -0,0 +1,74 @@
+import asyncio
+import os
+import time
+from typing import FrozenSet, Iterable, Optional
+from sqlalchemy.sql import text
+
+# Application modules
+from src.database_config import session_local
+from src.monitoring.metrics import UNKNOWN_MACHINE
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+# After a failed load, how long before the next attempt
+REFRESH_RETRY_SECONDS = 30
+
+known_machine_ids_query = text("SELECT id FROM machine_listings")
+
+
+class MachineRegistry:
+    """
+    Per-worker set of machine_listings ids. X-Machine-Id is client supplied, so it only
+    becomes a metric label when it names a real machine; anything else is UNKNOWN_MACHINE
+    and the series count stays bounded by the table. The set reloads in the background
+    once older than ttl_seconds; machine writes in this process invalidate it.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._ids: FrozenSet[str] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def is_known(self, machine_id: Optional[str]) -> bool:
+        self.ensure_fresh()
+        return (machine_id or "").strip() in self._ids
+
+    def label(self, machine_id: Optional[str]) -> str:
+        return machine_id.strip() if self.is_known(machine_id) else UNKNOWN_MACHINE
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def ensure_fresh(self) -> None:
+        if not self.is_stale() or time.monotonic() < self._retry_at:
+            return
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Until the first load finishes, events are counted as UNKNOWN_MACHINE
+        self._task = loop.create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        try:
+            async with session_local() as db:
+                rows = (await db.execute(known_machine_ids_query)).fetchall()
+            self.replace(row.id for row in rows)
+        except Exception as error:
+            self._retry_at = time.monotonic() + REFRESH_RETRY_SECONDS
+            logger.warning(f"Machine registry refresh failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Machine Registry'})
+
+    def replace(self, machine_ids: Iterable) -> None:
+        self._ids = frozenset(str(machine_id) for machine_id in machine_ids)
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+machine_registry = MachineRegistry(float(os.getenv("MACHINE_REGISTRY_TTL_SECONDS", 300)))
@@ -0,0 +1,153 @@
+"""
+Live machine dashboard. Take / return / damage / load events are published once their
+transaction has committed and fanned out in-process to every subscribed WebSocket, so
+the stream costs no database work per subscriber. A subscriber gets one availability
+snapshot on connect and only events after that.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from fastapi import WebSocket
+from sqlalchemy.sql import text
+
+from src.database_config import websocket_with_db
+from src.machines.machine_registry import machine_registry
+
+DASHBOARD_QUEUE_SIZE = int(os.getenv("DASHBOARD_QUEUE_SIZE", 256))
+DASHBOARD_HEARTBEAT_SECONDS = float(os.getenv("DASHBOARD_HEARTBEAT_SECONDS", 15))
+
+# Change in units available for checkout, per unit of the event
+STOCK_DELTAS = {"take": -1, "return": 1, "damaged_return": 0, "load": 1}
+
+# 1013 "try again later": the client fell behind and should reconnect for a fresh snapshot
+LAGGED_CLOSE_CODE = 1013
+
+availability_snapshot_query = text("""
+    SELECT product_name, category_id, available_count, checked_out_count
+    FROM product_availability
+""")
+
+
+class Subscription:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+
+class DashboardBroadcaster:
+    """Serialises each event once and hands the same message to every subscriber queue"""
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        # machine -> product -> net stock change since this worker started
+        self._machine_stock: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.published = 0
+        self.lagged = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def machine_stock(self) -> Dict[str, Dict[str, int]]:
+        return {machine: dict(products) for machine, products in self._machine_stock.items()}
+
+    def publish(self, event_name: str, machine_id: Optional[str], product_name: Optional[str],
+                count: int = 1, item_code: Optional[str] = None) -> None:
+        if count <= 0:
+            return
+        # X-Machine-Id is client supplied; unknown ids share one entry so the map stays bounded
+        machine = machine_registry.label(machine_id)
+        stock_delta = STOCK_DELTAS[event_name] * count
+        machine_stock = None
+        if product_name is not None:
+            self._machine_stock[machine][product_name] += stock_delta
+            machine_stock = self._machine_stock[machine][product_name]
+
+        message = json.dumps({
+            "type": "event",
+            "event": event_name,
+            "machine": machine,
+            "product_name": product_name,
+            "item_code": item_code,
+            "count": count,
+            "stock_delta": stock_delta,
+            "machine_stock_delta": machine_stock,
+            "at": time.time(),
+        })
+        self.published += 1
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Never block a checkout on a slow screen; drop it and let it resync
+                subscription.lagged = True
+                self._subscribers.discard(subscription)
+                self.lagged += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._subscribers), "published": self.published, "lagged": self.lagged}
+
+
+dashboard = DashboardBroadcaster(DASHBOARD_QUEUE_SIZE)
+
+
+def publish_inventory_event(event_name: str, machine_id: Optional[str], product_name: Optional[str],
+                            count: int = 1, item_code: Optional[str] = None) -> None:
+    """Call after db.commit(); a rolled back transaction must never reach the dashboard"""
+    dashboard.publish(event_name, machine_id, product_name, count, item_code)
+
+
+async def forward_events(websocket: WebSocket, subscription: Subscription) -> None:
+    heartbeat = json.dumps({"type": "heartbeat"})
+    while True:
+        if subscription.lagged and subscription.queue.empty():
+            await websocket.close(code=LAGGED_CLOSE_CODE, reason="Dashboard fell behind, reconnect")
+            return
+        try:
+            message = await asyncio.wait_for(subscription.queue.get(), timeout=DASHBOARD_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            message = heartbeat
+        await websocket.send_text(message)
+
+
+async def wait_for_disconnect(websocket: WebSocket) -> None:
+    # Nothing is expected from the client; receive_text raises WebSocketDisconnect on close
+    while True:
+        await websocket.receive_text()
+
+
+# Live stream of committed kiosk events for the admin screens
+@websocket_with_db
+async def machine_dashboard(websocket: WebSocket):
+    session = websocket.state.session
+    # Subscribe before the snapshot so nothing committed in between is missed
+    subscription = dashboard.subscribe()
+    try:
+        result = await session.execute(availability_snapshot_query)
+        products = [dict(row) for row in result.mappings().all()]
+        # Hand the connection back to the pool; the stream itself never touches the database
+        await session.close()
+
+        await websocket.send_text(json.dumps({
+            "type": "snapshot",
+            "products": products,
+            "machines": dashboard.machine_stock(),
+        }))
+
+        sender = asyncio.ensure_future(forward_events(websocket, subscription))
+        receiver = asyncio.ensure_future(wait_for_disconnect(websocket))
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.result()
+    finally:
+        dashboard.unsubscribe(subscription)
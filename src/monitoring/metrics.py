@@ -0,0 +1,172 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from fastapi.responses import Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+REQUEST_COUNT = Counter(
+    "kiosk_http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "kiosk_http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "kiosk_http_requests_in_flight", "HTTP requests currently being handled", ["method", "route"]
+)
+DB_QUERY_LATENCY = Histogram(
+    "kiosk_db_query_duration_seconds", "Database statement latency", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_ERRORS = Counter(
+    "kiosk_db_errors_total", "Database failures surfaced by get_db", ["kind"]
+)
+DB_SESSION_ROUTES = Counter(
+    "kiosk_db_session_routes_total", "Sessions handed out by get_db, by where they were sent", ["target"]
+)
+OVERDUE_RUN_DURATION = Histogram(
+    "kiosk_overdue_run_duration_seconds", "Overdue detector run time",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+OVERDUE_LISTINGS_SCANNED = Counter(
+    "kiosk_overdue_listings_scanned_total", "Listings the overdue detector moved its watermark past"
+)
+OVERDUE_LISTINGS_FLAGGED = Counter(
+    "kiosk_overdue_listings_flagged_total", "Unreturned listings created by the overdue detector"
+)
+OVERDUE_WATERMARK = Gauge(
+    "kiosk_overdue_watermark_listing_id", "Last inventory_listings id the overdue detector has settled"
+)
+USAGE_ROLLUP_DURATION = Histogram(
+    "kiosk_usage_rollup_duration_seconds", "Usage rollup run time",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+USAGE_ROLLUP_LISTINGS = Counter(
+    "kiosk_usage_rollup_listings_total", "Listing takes and returns added to the usage rollups", ["kind"]
+)
+ADMISSION_REJECTIONS = Counter(
+    "kiosk_admission_rejections_total", "Requests refused before reaching a handler", ["reason"]
+)
+INVENTORY_EVENTS = Counter(
+    "kiosk_inventory_events_total", "Kiosk business events", ["event", "machine"]
+)
+
+UNKNOWN_MACHINE = "unknown"
+
+
+def record_inventory_event(event_name: str, machine_id: str = None, count: int = 1) -> None:
+    """
+    Count a take / return / damaged_return / load per machine (X-Machine-Id header).
+    Ids that are not in machine_listings are counted as UNKNOWN_MACHINE, so clients cannot mint series.
+    """
+    # Imported here: the registry reads through src.database_config, which imports this module
+    from src.machines.machine_registry import machine_registry
+    INVENTORY_EVENTS.labels(event=event_name, machine=machine_registry.label(machine_id)).inc(count)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Times every statement through engine events, labelled by its SQL verb"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started_at"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERY_LATENCY.labels(operation=operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def drop_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+
+class LazyCollector:
+    """
+    Collectors below import their source on each scrape. describe() is declared so the
+    registry does not call collect() at register time, while those modules are still loading.
+    """
+
+    def describe(self):
+        return []
+
+
+class PoolCollector(LazyCollector):
+    """Exports PoolMetrics at scrape time so the numbers are always live"""
+
+    def collect(self):
+        # Imported lazily: the database package imports this module while it is being built
+        from src.database_config import database_manager
+        snapshot = database_manager.pool_metrics.snapshot()
+
+        for name, help_text in (("pool_size", "Configured pool size"),
+                                ("checked_out", "Connections checked out"),
+                                ("idle", "Idle connections in the pool"),
+                                ("overflow", "Overflow connections open")):
+            yield GaugeMetricFamily(f"kiosk_db_pool_{name}", help_text, value=snapshot[name])
+
+        for name, help_text in (("checkouts", "Pool checkouts"),
+                                ("checkout_failures", "Pool checkouts that timed out"),
+                                ("connects", "New DBAPI connections opened"),
+                                ("invalidations", "Connections invalidated")):
+            yield CounterMetricFamily(f"kiosk_db_pool_{name}", help_text, value=snapshot[name])
+
+        wait_time = snapshot["wait_time_seconds"]
+        yield HistogramMetricFamily(
+            "kiosk_db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+            buckets=list(wait_time["buckets"].items()), sum_value=wait_time["sum"],
+        )
+
+
+REGISTRY.register(PoolCollector())
+
+
+class LogPipelineCollector(LazyCollector):
+    """Exports the Graylog queue depth and the records it dropped or shipped"""
+
+    def collect(self):
+        from src.seedwork.logger import logging_component
+        stats = logging_component.get_gray_logger_stats()
+        yield GaugeMetricFamily("kiosk_log_queue_depth", "Log records waiting to be shipped", value=stats["queued"])
+        yield CounterMetricFamily("kiosk_log_records_dropped", "Log records dropped because the queue was full", value=stats["dropped"])
+        yield CounterMetricFamily("kiosk_log_records_sent", "Log records shipped to Graylog", value=stats["sent"])
+
+
+REGISTRY.register(LogPipelineCollector())
+
+
+class UserCacheCollector(LazyCollector):
+    """Exports the emp_code resolver cache size and hit/miss counters"""
+
+    def collect(self):
+        from src.users.user_resolver import user_resolver
+        stats = user_resolver.stats()
+        yield GaugeMetricFamily("kiosk_user_cache_entries", "Users held in the emp_code cache", value=stats["entries"])
+        yield CounterMetricFamily("kiosk_user_cache_hits", "emp_code lookups served from the cache", value=stats["hits"])
+        yield CounterMetricFamily("kiosk_user_cache_misses", "emp_code lookups that went to the database", value=stats["misses"])
+
+
+REGISTRY.register(UserCacheCollector())
+
+
+class DashboardCollector(LazyCollector):
+    """Exports live dashboard subscribers and the events fanned out to them"""
+
+    def collect(self):
+        from src.monitoring.live_dashboard import dashboard
+        stats = dashboard.stats()
+        yield GaugeMetricFamily("kiosk_dashboard_subscribers", "Open live dashboard WebSockets", value=stats["subscribers"])
+        yield CounterMetricFamily("kiosk_dashboard_events_published", "Events published to the live dashboard", value=stats["published"])
+        yield CounterMetricFamily("kiosk_dashboard_subscribers_lagged", "Dashboard subscribers dropped for falling behind", value=stats["lagged"])
+
+
+REGISTRY.register(DashboardCollector())
+
+
+# Prometheus text exposition for a local scrape
+async def metrics():
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
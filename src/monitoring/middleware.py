@@ -0,0 +1,47 @@
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.monitoring.metrics import REQUEST_COUNT, REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+
+# Label for paths that match no route, so random URLs cannot blow up label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class PrometheusMiddleware:
+    """Records request count, latency and in-flight requests per route template"""
+
+    def __init__(self, app: ASGIApp, excluded_paths=("/metrics",)) -> None:
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    def route_template(self, scope: Scope) -> str:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path_format", getattr(route, "path", UNMATCHED_ROUTE))
+        return UNMATCHED_ROUTE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method=method, route=route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method=method, route=route).observe(time.perf_counter() - started)
+            REQUEST_COUNT.labels(method=method, route=route, status=str(status_code)).inc()
+            in_flight.dec()
@@ -0,0 +1,13 @@
+from fastapi.responses import JSONResponse
+from dataclasses import asdict
+
+# Application modules
+from src.database_config import database_manager
+
+
+# Live connection pool metrics for this worker
+async def db_pool_stats():
+    return JSONResponse(content={
+        "settings": asdict(database_manager.pool_settings),
+        "metrics": database_manager.pool_metrics.snapshot(),
+    }, status_code=200)
@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from src.monitoring.pool_stats import db_pool_stats
+from src.monitoring.live_dashboard import machine_dashboard
+
+router = APIRouter(prefix="/monitoring")
+
+router.add_api_route("/db-pool", db_pool_stats, methods=["GET"])
+router.add_api_websocket_route("/machine-dashboard", machine_dashboard)
@@ -0,0 +1,88 @@
+"""
+Transactional outbox. Request handlers only INSERT a row inside their own transaction;
+the notification worker claims due rows, sends them and records the outcome, so a
+kiosk request never waits on SMTP and a rolled back request never sends anything.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DAMAGED_RETURN = "damaged_return"
+
+PENDING = "Pending"
+SENT = "Sent"
+FAILED = "Failed"
+
+# Comma separated; empty sends to the mailbox of the active email_config row
+DAMAGE_ALERT_RECIPIENTS = os.getenv("DAMAGE_ALERT_RECIPIENTS", "")
+
+insert_outbox_query = text("""
+    INSERT INTO notification_outbox (kind, recipient, payload, status, next_attempt_at)
+    VALUES (:kind, :recipient, :payload, 'Pending', NOW())
+""")
+
+# SKIP LOCKED lets several workers drain the outbox without handing out the same row twice
+due_outbox_query = text("""
+    SELECT id, kind, recipient, payload, attempts
+    FROM notification_outbox
+    WHERE status = 'Pending' AND next_attempt_at <= NOW()
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+""")
+
+# A claimed row is pushed out of the due window; if the worker dies it becomes due again
+lease_outbox_query = text("""
+    UPDATE notification_outbox
+    SET next_attempt_at = NOW() + INTERVAL :lease_seconds SECOND
+    WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+mark_sent_query = text("""
+    UPDATE notification_outbox
+    SET status = 'Sent', attempts = attempts + 1, sent_date = NOW(), last_error = NULL
+    WHERE id = :id
+""")
+
+mark_retry_query = text("""
+    UPDATE notification_outbox
+    SET status = :status, attempts = :attempts, last_error = :last_error,
+        next_attempt_at = NOW() + INTERVAL :delay_seconds SECOND
+    WHERE id = :id
+""")
+
+# Hands claimed rows back without spending an attempt, when a batch stops before reaching them
+release_outbox_query = text("""
+    UPDATE notification_outbox
+    SET next_attempt_at = NOW() + INTERVAL :delay_seconds SECOND
+    WHERE id IN :ids AND status = 'Pending'
+""").bindparams(bindparam("ids", expanding=True))
+
+
+def damage_alert_recipients() -> List[Optional[str]]:
+    recipients = [address.strip() for address in DAMAGE_ALERT_RECIPIENTS.split(",") if address.strip()]
+    return recipients or [None]
+
+
+async def enqueue_notification(db: AsyncSession, kind: str, payload: Dict, recipient: Optional[str] = None) -> None:
+    """Adds a notification to the caller's transaction; nothing is sent until it commits"""
+    await db.execute(insert_outbox_query, {"kind": kind, "recipient": recipient, "payload": json.dumps(payload)})
+
+
+async def enqueue_damaged_return_alert(db: AsyncSession, user_id: int, item_code: str, product_name: str,
+                                       damage_reason: Optional[str], machine_id: Optional[str]) -> None:
+    payload = {
+        "user_id": user_id,
+        "item_code": item_code,
+        "product_name": product_name,
+        "damage_reason": damage_reason,
+        "machine_id": machine_id,
+    }
+    for recipient in damage_alert_recipients():
+        await enqueue_notification(db, DAMAGED_RETURN, payload, recipient)
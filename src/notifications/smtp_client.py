@@ -0,0 +1,139 @@
+import smtplib
+import ssl
+import time
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+active_email_config_query = text("""
+    SELECT email_id, password, mx_record, port_number, smpt_format
+    FROM email_config
+    WHERE status = 'Active'
+    ORDER BY last_updated_date DESC, id DESC
+    LIMIT 1
+""")
+
+# 5xx replies will fail the same way on every retry
+PERMANENT_SMTP_CODES = range(500, 600)
+
+
+@dataclass(frozen=True)
+class SmtpSettings:
+    host: str
+    port: int
+    username: str
+    password: Optional[str]
+    security: str  # "ssl", "starttls" or "none"
+
+    @property
+    def sender(self) -> str:
+        return self.username
+
+
+def security_mode(smpt_format: Optional[str]) -> str:
+    value = (smpt_format or "").strip().lower()
+    if value in ("ssl", "smtps"):
+        return "ssl"
+    if value in ("tls", "starttls"):
+        return "starttls"
+    return "none"
+
+
+async def load_smtp_settings(db: AsyncSession) -> Optional[SmtpSettings]:
+    """The active email_config row, read per batch so edits apply without a restart"""
+    row = (await db.execute(active_email_config_query)).fetchone()
+    if not row or not row.mx_record:
+        return None
+    security = security_mode(row.smpt_format)
+    default_port = 465 if security == "ssl" else 587
+    return SmtpSettings(row.mx_record, row.port_number or default_port, row.email_id, row.password, security)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code in PERMANENT_SMTP_CODES for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in PERMANENT_SMTP_CODES
+    return False
+
+
+def is_connection_failure(error: Exception) -> bool:
+    """
+    The session could not be opened or was lost: unreachable host, timeout, refused
+    greeting or login. Every other message in the batch would fail the same way.
+    """
+    if isinstance(error, (smtplib.SMTPConnectError, smtplib.SMTPHeloError, smtplib.SMTPAuthenticationError)):
+        return True
+    # SMTPException is itself an OSError; a reply about one message says nothing about the session
+    if isinstance(error, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+        return False
+    return isinstance(error, OSError)
+
+
+class PooledSmtpConnection:
+    """
+    One SMTP session reused across sends. Reopened when the server drops it, when it sat
+    idle long enough that the server may have, or when the email_config row changes.
+    Blocking; the worker calls it from a thread.
+    """
+
+    def __init__(self, timeout: float, idle_check_seconds: float) -> None:
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._settings: Optional[SmtpSettings] = None
+        self._last_used = 0.0
+
+    def _open(self, settings: SmtpSettings) -> smtplib.SMTP:
+        if settings.security == "ssl":
+            smtp = smtplib.SMTP_SSL(settings.host, settings.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(settings.host, settings.port, timeout=self.timeout)
+            if settings.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+        if settings.password:
+            smtp.login(settings.username, settings.password)
+        self.connects += 1
+        return smtp
+
+    def _connection(self, settings: SmtpSettings) -> smtplib.SMTP:
+        if self._smtp is not None and settings != self._settings:
+            self.close()
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_check_seconds:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.close()
+            except smtplib.SMTPException:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._open(settings)
+            self._settings = settings
+        return self._smtp
+
+    def send(self, settings: SmtpSettings, message: EmailMessage) -> None:
+        try:
+            self._connection(settings).send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped between sends; one reconnect, then let the caller retry later
+            self.close()
+            self._connection(settings).send_message(message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server answered; the session itself is still usable
+            raise
+        except OSError:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._smtp = None
+        self._settings = None
@@ -0,0 +1,98 @@
+"""
+Local SMTP stand-in for running the notification worker without a mail server.
+Accepts every message and prints a one-line summary; --fail-every N answers every
+Nth message with a 451 so the retry / backoff path can be exercised, and recipients
+ending in --reject-suffix get a 550 so a permanent failure can be too.
+
+    python -m src.notifications.smtp_sink --port 1025
+    # email_config row: mx_record=127.0.0.1, port_number=1025, smpt_format=none
+"""
+import argparse
+import asyncio
+from email import message_from_bytes
+
+
+REJECT_SUFFIX = "@rejected.invalid"
+
+
+class SinkSession:
+    def __init__(self, fail_every: int, counter: dict, reject_suffix: str = REJECT_SUFFIX) -> None:
+        self.fail_every = fail_every
+        self.counter = counter
+        self.reject_suffix = reject_suffix
+        self.recipients = []
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write((line + "\r\n").encode())
+            await writer.drain()
+
+        await reply("220 kiosk smtp sink ready")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                await reply("250-kiosk-smtp-sink")
+                await reply("250 AUTH PLAIN")
+            elif verb == "HELO":
+                await reply("250 kiosk-smtp-sink")
+            elif verb == "AUTH":
+                await reply("235 Authentication successful")
+            elif verb == "MAIL":
+                self.recipients = []
+                await reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[-1].strip(" <>")
+                if self.reject_suffix and recipient.endswith(self.reject_suffix):
+                    await reply("550 No such user (simulated)")
+                    continue
+                self.recipients.append(recipient)
+                await reply("250 OK")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                data = await reader.readuntil(b"\r\n.\r\n")
+                self.counter["messages"] += 1
+                if self.fail_every and self.counter["messages"] % self.fail_every == 0:
+                    await reply("451 Temporary failure (simulated)")
+                    continue
+                message = message_from_bytes(data[:-5])
+                print(f"#{self.counter['messages']} to {', '.join(self.recipients)}: {message['Subject']}", flush=True)
+                await reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                await reply("250 OK")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+        writer.close()
+
+
+async def start(host: str, port: int, fail_every: int = 0, reject_suffix: str = REJECT_SUFFIX):
+    """Listening server plus its message counter; port 0 picks a free one"""
+    counter = {"messages": 0}
+
+    async def on_connect(reader, writer):
+        await SinkSession(fail_every, counter, reject_suffix).handle(reader, writer)
+
+    return await asyncio.start_server(on_connect, host, port), counter
+
+
+async def main(host: str, port: int, fail_every: int, reject_suffix: str) -> None:
+    server, _ = await start(host, port, fail_every, reject_suffix)
+    print(f"SMTP sink listening on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--reject-suffix", default=REJECT_SUFFIX)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.fail_every, args.reject_suffix))
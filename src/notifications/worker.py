@@ -0,0 +1,212 @@
+"""
+Drains notification_outbox in batches and sends over one pooled SMTP session.
+Runs as its own process, next to the API workers:
+
+    python -m src.notifications.worker          # poll forever
+    python -m src.notifications.worker --once   # drain what is due and exit
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam
+from sqlalchemy.sql import text
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+
+# Application modules
+from src.database_config import database_manager, session_local
+from src.notifications.outbox import (
+    DAMAGED_RETURN, FAILED, PENDING, due_outbox_query, lease_outbox_query, mark_retry_query, mark_sent_query,
+    release_outbox_query
+)
+from src.notifications.smtp_client import (
+    PooledSmtpConnection, SmtpSettings, is_connection_failure, is_permanent_failure, load_smtp_settings
+)
+from src.seedwork.logger import logging_component
+
+load_dotenv()
+logger = logging_component.get_gray_logger()
+
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 50))
+NOTIFY_POLL_INTERVAL = float(os.getenv("NOTIFY_POLL_INTERVAL", 5))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 8))
+NOTIFY_BACKOFF_BASE = float(os.getenv("NOTIFY_BACKOFF_BASE", 30))
+NOTIFY_BACKOFF_MAX = float(os.getenv("NOTIFY_BACKOFF_MAX", 3600))
+NOTIFY_LEASE_SECONDS = int(os.getenv("NOTIFY_LEASE_SECONDS", 300))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 10))
+SMTP_IDLE_CHECK_SECONDS = float(os.getenv("SMTP_IDLE_CHECK_SECONDS", 30))
+
+users_by_id_query = text("""
+    SELECT id, emp_code, first_name, last_name FROM user_config WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+
+@dataclass
+class Outcome:
+    id: int
+    attempts: int
+    error: Optional[str] = None
+    permanent: bool = False
+    # Not attempted: the batch stopped first, the row goes back to the outbox as it was
+    released: bool = False
+
+
+def backoff_seconds(attempts: int) -> int:
+    """Exponential from NOTIFY_BACKOFF_BASE, capped, with jitter so failed batches spread out"""
+    delay = min(NOTIFY_BACKOFF_BASE * (2 ** (attempts - 1)), NOTIFY_BACKOFF_MAX)
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+def render_damaged_return(payload: Dict, users: Dict[int, object]) -> Tuple[str, str]:
+    user = users.get(payload.get("user_id"))
+    employee = f"{user.first_name} {user.last_name} (Emp Code {user.emp_code})" if user else f"User {payload.get('user_id')}"
+    subject = "Damaged Product Returned Alert"
+    body = (
+        f"{employee} has returned a damaged product.\n\n"
+        f"Product: {payload.get('product_name')}\n"
+        f"Item code: {payload.get('item_code')}\n"
+        f"Machine: {payload.get('machine_id') or 'unknown'}\n"
+        f"Reason: {payload.get('damage_reason') or 'not given'}"
+    )
+    return subject, body
+
+
+RENDERERS = {
+    DAMAGED_RETURN: render_damaged_return,
+}
+
+
+def build_message(settings: SmtpSettings, row, payload: Dict, users: Dict[int, object]) -> EmailMessage:
+    subject, body = RENDERERS[row.kind](payload, users)
+    message = EmailMessage()
+    message["From"] = settings.sender
+    message["To"] = row.recipient or settings.sender
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+class NotificationWorker:
+    def __init__(self, batch_size: int = NOTIFY_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.smtp = PooledSmtpConnection(SMTP_TIMEOUT, SMTP_IDLE_CHECK_SECONDS)
+        self.sent = 0
+        self.failed = 0
+
+    async def claim_batch(self):
+        """Locks due rows, pushes them past a lease and commits, so no lock is held while sending"""
+        async with session_local() as db:
+            settings = await load_smtp_settings(db)
+            if settings is None:
+                # Leave the outbox alone: attempts are not spent while email is unconfigured
+                logger.warning("No active email_config row, notifications are waiting",
+                               extra={'host': 'system', 'user': 'system', 'source': 'Notification Worker'})
+                return None, [], {}
+            rows = (await db.execute(due_outbox_query, {"batch_size": self.batch_size})).fetchall()
+            if not rows:
+                await db.commit()
+                return settings, [], {}
+            await db.execute(lease_outbox_query, {"ids": [row.id for row in rows], "lease_seconds": NOTIFY_LEASE_SECONDS})
+
+            user_ids = {json.loads(row.payload).get("user_id") for row in rows} - {None}
+            users = {}
+            if user_ids:
+                users = {user.id: user for user in (await db.execute(users_by_id_query, {"ids": list(user_ids)})).fetchall()}
+            await db.commit()
+            return settings, rows, users
+
+    def send_batch(self, settings: SmtpSettings, rows, users: Dict[int, object]) -> List[Outcome]:
+        outcomes = []
+        for index, row in enumerate(rows):
+            attempts = row.attempts + 1
+            try:
+                message = build_message(settings, row, json.loads(row.payload), users)
+            except Exception as error:
+                # Unknown kind or bad payload: retrying cannot fix it
+                outcomes.append(Outcome(row.id, attempts, f"Render failed: {error}", permanent=True))
+                continue
+            try:
+                self.smtp.send(settings, message)
+                outcomes.append(Outcome(row.id, attempts))
+            except Exception as error:
+                if is_connection_failure(error):
+                    # Each remaining row would wait out the same timeout and the batch could outlive its
+                    # lease, letting another worker claim and send it again. Stop and hand the rest back.
+                    outcomes.append(Outcome(row.id, attempts, str(error)[:500]))
+                    outcomes.extend(Outcome(unsent.id, unsent.attempts, released=True) for unsent in rows[index + 1:])
+                    break
+                outcomes.append(Outcome(row.id, attempts, str(error)[:500], permanent=is_permanent_failure(error)))
+        return outcomes
+
+    async def record(self, outcomes: List[Outcome]) -> None:
+        async with session_local() as db:
+            released = [outcome.id for outcome in outcomes if outcome.released]
+            if released:
+                # Not due again before the server had a moment to come back
+                await db.execute(release_outbox_query, {"ids": released, "delay_seconds": int(NOTIFY_BACKOFF_BASE)})
+            for outcome in outcomes:
+                if outcome.released:
+                    continue
+                if outcome.error is None:
+                    await db.execute(mark_sent_query, {"id": outcome.id})
+                    self.sent += 1
+                    continue
+                give_up = outcome.permanent or outcome.attempts >= NOTIFY_MAX_ATTEMPTS
+                await db.execute(mark_retry_query, {
+                    "id": outcome.id,
+                    "status": FAILED if give_up else PENDING,
+                    "attempts": outcome.attempts,
+                    "last_error": outcome.error,
+                    "delay_seconds": 0 if give_up else backoff_seconds(outcome.attempts),
+                })
+                if give_up:
+                    self.failed += 1
+                    logger.error(f"Notification {outcome.id} failed after {outcome.attempts} attempt(s) {outcome.error}",
+                                 extra={'host': 'system', 'user': 'system', 'source': 'Notification Worker'})
+            await db.commit()
+
+    async def drain_once(self) -> int:
+        """Processes one batch; returns how many rows it handled"""
+        settings, rows, users = await self.claim_batch()
+        if not rows:
+            return 0
+        outcomes = await run_in_threadpool(self.send_batch, settings, rows, users)
+        await self.record(outcomes)
+        return len(rows)
+
+    async def run(self, once: bool = False) -> None:
+        try:
+            while True:
+                try:
+                    handled = await self.drain_once()
+                except Exception as error:
+                    handled = 0
+                    logger.error(f"Notification batch failed {error}",
+                                 extra={'host': 'system', 'user': 'system', 'source': 'Notification Worker'})
+                if handled == self.batch_size:
+                    continue  # more may be due right now
+                if once:
+                    return
+                await asyncio.sleep(NOTIFY_POLL_INTERVAL)
+        finally:
+            await run_in_threadpool(self.smtp.close)
+
+
+async def main(once: bool) -> None:
+    worker = NotificationWorker()
+    try:
+        await worker.run(once=once)
+    finally:
+        await database_manager.shutdown()
+    print(f"Sent {worker.sent}, failed {worker.failed}, SMTP connections opened {worker.smtp.connects}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send notifications from the outbox")
+    parser.add_argument("--once", action="store_true", help="drain what is due and exit")
+    asyncio.run(main(parser.parse_args().once))
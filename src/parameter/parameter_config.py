@@ -1,19 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from src.seedwork.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from datetime import datetime
 from src.database_config import get_db
+from src.seedwork.export import export_response, ExportFormat
 
 router = APIRouter(prefix="/parameter-handler")
 
 # 📌 Helper function to convert datetime to ISO format
-def convert_datetime(value):
-    """Convert datetime objects to ISO format strings"""
-    if isinstance(value, datetime):
-        return value.isoformat()
-    return value  # Return other data types as-is
-
 # ✅ **Create Parameter**
 @router.post("/create-parameter")
 async def create_parameter_config(
@@ -50,14 +44,17 @@ async def get_all_parameter_configs(db: AsyncSession = Depends(get_db)):
         result = await db.execute(query)
         parameters = result.mappings().all()
 
-        # Convert RowMapping to list of dictionaries
-        parameter_list = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in parameters]
-
-        return JSONResponse(content={"data": parameter_list}, status_code=200)
+        # Rows are serialized as-is by the shared JSONResponse
+        return JSONResponse(content={"data": parameters}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
 
+# ✅ **Export All Parameters (NDJSON / CSV)**
+@router.get("/export-parameters")
+async def export_parameter_configs(request: Request, format: str = ExportFormat):
+    return await export_response(request, text("SELECT * FROM parameter_config"), format, "parameters")
+
 # ✅ **Get Parameter by ID**
 @router.get("/get-parameter/{param_id}")
 async def get_parameter_config(param_id: int, db: AsyncSession = Depends(get_db)):
@@ -69,9 +66,7 @@ async def get_parameter_config(param_id: int, db: AsyncSession = Depends(get_db)
         if not parameter:
             raise HTTPException(status_code=404, detail=f"Parameter with ID {param_id} not found")
 
-        parameter_dict = {key: convert_datetime(value) for key, value in dict(parameter).items()}
-
-        return JSONResponse(content={"data": parameter_dict}, status_code=200)
+        return JSONResponse(content={"data": parameter}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
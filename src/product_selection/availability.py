@@ -0,0 +1,232 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+# Application modules
+from src.database_config import session_local
+from src.seedwork.logger import logging_component
+
+logger = logging_component.get_gray_logger()
+
+# Optional background drift check; 0 (the default) leaves it off
+AVAILABILITY_RECONCILE_INTERVAL = float(os.getenv("AVAILABILITY_RECONCILE_INTERVAL", 0))
+
+WATERMARK_NAME = "availability_reconcile"
+
+# Applies a delta inside the caller's transaction; the row lock serialises concurrent kiosks
+adjust_availability_query = text("""
+    INSERT INTO product_availability
+        (product_name, category_id, available_count, checked_out_count, price, last_updated_date)
+    VALUES
+        (:product_name, :category_id, GREATEST(:available, 0), GREATEST(:checked_out, 0), COALESCE(:price, 0), NOW())
+    ON DUPLICATE KEY UPDATE
+        available_count = GREATEST(available_count + :available, 0),
+        checked_out_count = GREATEST(checked_out_count + :checked_out, 0),
+        price = GREATEST(price, COALESCE(:price, price)),
+        last_updated_date = NOW()
+""")
+
+# Whether a unit currently counts as available, checked out, or neither
+unit_state_query = text("""
+    SELECT
+        i.name, i.category_id, i.status,
+        EXISTS (
+            SELECT 1 FROM inventory_listings il
+            WHERE il.inventory_id = i.id AND il.status = 'Active'
+        ) AS is_checked_out
+    FROM inventory_config i
+    WHERE i.id = :inventory_id
+""")
+
+RECOUNT_AVAILABILITY = """
+    SELECT
+        i.name AS product_name,
+        i.category_id,
+        SUM(i.status = 'Active' AND il.id IS NULL) AS available_count,
+        COUNT(il.id) AS checked_out_count,
+        COALESCE(MAX(CASE WHEN i.status = 'Active' AND il.id IS NULL THEN i.price END), 0) AS price
+    FROM inventory_config i
+    LEFT JOIN inventory_listings il ON il.inventory_id = i.id AND il.status = 'Active'
+    {where_clause}
+    GROUP BY i.name, i.category_id
+"""
+
+# Source of truth for the counters, one row per product. A plain read: no lock is taken
+recount_availability_query = text(RECOUNT_AVAILABILITY.format(where_clause=""))
+
+# The same count for one product, taken once its counter row is locked
+recount_product_query = text(RECOUNT_AVAILABILITY.format(
+    where_clause="WHERE i.name = :product_name AND i.category_id = :category_id"))
+
+stored_availability_query = text("""
+    SELECT product_name, category_id, available_count, checked_out_count
+    FROM product_availability
+""")
+
+# Kiosks that change a unit of this product meanwhile wait on the row, so their delta
+# lands after the recount instead of being overwritten by it
+lock_product_availability_query = text("""
+    SELECT available_count, checked_out_count
+    FROM product_availability
+    WHERE product_name = :product_name AND category_id = :category_id
+    FOR UPDATE
+""")
+
+replace_availability_query = text("""
+    INSERT INTO product_availability
+        (product_name, category_id, available_count, checked_out_count, price, last_updated_date)
+    VALUES (:product_name, :category_id, :available_count, :checked_out_count, :price, NOW())
+    ON DUPLICATE KEY UPDATE
+        available_count = VALUES(available_count),
+        checked_out_count = VALUES(checked_out_count),
+        price = VALUES(price),
+        last_updated_date = NOW()
+""")
+
+# SKIP LOCKED: while one worker reconciles, the others see no row and skip this run
+lock_watermark_query = text("""
+    SELECT last_id FROM job_watermarks WHERE name = :name FOR UPDATE SKIP LOCKED
+""")
+
+touch_watermark_query = text("""
+    UPDATE job_watermarks SET last_run_date = NOW() WHERE name = :name
+""")
+
+
+def is_active(status: Optional[str]) -> bool:
+    return (status or "").lower() == "active"
+
+
+async def adjust_availability(db: AsyncSession, product_name: str, category_id: int,
+                              available: int = 0, checked_out: int = 0, price: Optional[int] = None) -> None:
+    """Moves the counters for one product; the caller commits with its own writes"""
+    if not available and not checked_out and price is None:
+        return
+    await db.execute(adjust_availability_query, {
+        "product_name": product_name, "category_id": category_id,
+        "available": available, "checked_out": checked_out, "price": price,
+    })
+
+
+async def unit_contribution(db: AsyncSession, inventory_id: int) -> Optional[Tuple[str, int, int, int]]:
+    """(name, category_id, available, checked_out) that one unit adds to the counters"""
+    result = await db.execute(unit_state_query, {"inventory_id": inventory_id})
+    unit = result.fetchone()
+    if not unit:
+        return None
+    if unit.is_checked_out:
+        return unit.name, unit.category_id, 0, 1
+    return unit.name, unit.category_id, 1 if is_active(unit.status) else 0, 0
+
+
+async def remove_unit_contribution(db: AsyncSession, contribution: Optional[Tuple[str, int, int, int]]) -> None:
+    if contribution:
+        name, category_id, available, checked_out = contribution
+        await adjust_availability(db, name, category_id, available=-available, checked_out=-checked_out)
+
+
+async def add_unit_contribution(db: AsyncSession, contribution: Optional[Tuple[str, int, int, int]]) -> None:
+    if contribution:
+        name, category_id, available, checked_out = contribution
+        await adjust_availability(db, name, category_id, available=available, checked_out=checked_out)
+
+
+async def drifted_products(db: AsyncSession) -> List[Tuple[str, int]]:
+    """
+    Products whose stored counters differ from a recount, read without locks. A take or
+    return committing between the two reads shows up here too; repair_product re-checks.
+    """
+    result = await db.execute(stored_availability_query)
+    stored = {(row.product_name, row.category_id): (row.available_count, row.checked_out_count) for row in result.fetchall()}
+    result = await db.execute(recount_availability_query)
+    expected = {(row.product_name, row.category_id): (row.available_count, row.checked_out_count) for row in result.fetchall()}
+
+    drifted = {key for key, counts in expected.items() if stored.get(key) != counts}
+    # Products with no units left at all
+    drifted |= {key for key, counts in stored.items() if key not in expected and counts != (0, 0)}
+    # Sorted so two runs lock counter rows in the same order
+    return sorted(drifted)
+
+
+async def repair_product(db: AsyncSession, product_name: str, category_id: int) -> bool:
+    """Locks one counter row, recounts the product and rewrites the row if it is still off"""
+    params = {"product_name": product_name, "category_id": category_id}
+    current = (await db.execute(lock_product_availability_query, params)).fetchone()
+    row = (await db.execute(recount_product_query, params)).fetchone()
+    expected = dict(row._mapping) if row else {**params, "available_count": 0, "checked_out_count": 0, "price": 0}
+    if current is not None and (current.available_count, current.checked_out_count) == (expected["available_count"], expected["checked_out_count"]):
+        return False
+    await db.execute(replace_availability_query, expected)
+    return True
+
+
+async def reconcile_availability(db: AsyncSession) -> int:
+    """
+    Recounts every product from inventory_config / inventory_listings without locking,
+    then locks and repairs only the counter rows that drifted. Returns the number of rows
+    corrected. The caller commits.
+    """
+    corrections = 0
+    for product_name, category_id in await drifted_products(db):
+        if await repair_product(db, product_name, category_id):
+            corrections += 1
+    return corrections
+
+
+class AvailabilityReconciler:
+    """
+    Optional periodic check of product_availability against the listings. Every worker
+    runs the loop; the job_watermarks row elects the one that does the work each time.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.last_corrections = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> int:
+        async with session_local() as db:
+            try:
+                # READ COMMITTED: the recount reads without locks and the per-product re-check
+                # sees what kiosks committed in the meantime
+                await db.connection(execution_options={"isolation_level": "READ COMMITTED"})
+                if (await db.execute(lock_watermark_query, {"name": WATERMARK_NAME})).first() is None:
+                    await db.commit()
+                    return 0
+                corrections = await reconcile_availability(db)
+                await db.execute(touch_watermark_query, {"name": WATERMARK_NAME})
+                await db.commit()
+            except Exception as error:
+                await db.rollback()
+                logger.error(f"Availability reconciliation failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Availability Reconciler'})
+                return 0
+        if corrections:
+            logger.warning(f"Availability reconciliation corrected {corrections} product(s)",
+                           extra={'host': 'system', 'user': 'system', 'source': 'Availability Reconciler'})
+        self.last_corrections = corrections
+        return corrections
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def ensure_started(self) -> None:
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+availability_reconciler = AvailabilityReconciler(AVAILABILITY_RECONCILE_INTERVAL)
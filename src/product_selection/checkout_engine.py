@@ -0,0 +1,100 @@
+from typing import Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from src.product_selection.availability import adjust_availability
+
+# Number of times a kiosk retries the claim when another kiosk wins the same unit
+CLAIM_ATTEMPTS = 3
+
+# One round trip for everything take_product has to know about the employee
+checkout_eligibility_query = text("""
+    SELECT
+        u.id,
+        EXISTS (
+            SELECT 1 FROM inventory_unreturned_listings iul
+            WHERE iul.create_by = u.id AND iul.status = 'Active'
+        ) AS has_unreturned,
+        EXISTS (
+            SELECT 1 FROM inventory_listings il
+            JOIN inventory_config ic ON il.inventory_id = ic.id
+            WHERE il.create_by = u.id AND ic.name = :product_name AND il.status = 'Active'
+        ) AS has_product
+    FROM user_config u
+    WHERE u.emp_code = :emp_code
+""")
+
+# Same checks for a caller already identified by a session token
+checkout_flags_query = text("""
+    SELECT
+        EXISTS (
+            SELECT 1 FROM inventory_unreturned_listings iul
+            WHERE iul.create_by = :user_id AND iul.status = 'Active'
+        ) AS has_unreturned,
+        EXISTS (
+            SELECT 1 FROM inventory_listings il
+            JOIN inventory_config ic ON il.inventory_id = ic.id
+            WHERE il.create_by = :user_id AND ic.name = :product_name AND il.status = 'Active'
+        ) AS has_product
+""")
+
+# One round trip for the additional-take rules (active product, previous takes, lost history)
+take_history_query = text("""
+    SELECT
+        (SELECT reasons FROM inventory_listings
+         WHERE create_by = :user_id AND status = 'Active' LIMIT 1) AS active_reason,
+        EXISTS (
+            SELECT 1 FROM inventory_listings
+            WHERE create_by = :user_id AND status = 'Active'
+        ) AS has_active,
+        (SELECT COUNT(*) FROM inventory_listings il
+         JOIN inventory_config ic ON il.inventory_id = ic.id
+         WHERE il.create_by = :user_id AND ic.name = :product_name) AS product_taken_count,
+        EXISTS (
+            SELECT 1 FROM inventory_listings il
+            JOIN inventory_config ic ON il.inventory_id = ic.id
+            WHERE il.create_by = :user_id AND ic.name = :product_name AND il.reasons = 'lost'
+        ) AS has_lost
+""")
+
+# Locks one free unit; units locked by other kiosks are skipped instead of waited on
+select_free_unit_query = text("""
+    SELECT id, item_code, name, category_id FROM inventory_config
+    WHERE name = :product_name AND status = 'Active'
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+""")
+
+# Conditional claim: only succeeds while the unit is still free
+claim_unit_query = text("""
+    UPDATE inventory_config SET status = 'Inactive'
+    WHERE id = :inventory_id AND status = 'Active'
+""")
+
+insert_listing_query = text("""
+    INSERT INTO inventory_listings (inventory_id, create_by, last_updated_by, emp_id, status, reasons, machine_id)
+    VALUES (:inventory_id, :user_id, :user_id, :user_id, 'Active', :reason, :machine_id)
+""")
+
+
+async def claim_inventory_unit(db: AsyncSession, product_name: str, user_id: int, reason: str = "take",
+                               machine_id: Optional[str] = None) -> Optional[Tuple[int, str]]:
+    """
+    Claims one free unit of `product_name` for `user_id` inside the caller's transaction.
+    Returns (inventory_id, item_code), or None when no unit is free. The caller commits.
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        result = await db.execute(select_free_unit_query, {"product_name": product_name})
+        unit = result.fetchone()
+        if not unit:
+            return None
+
+        # rowcount 0 means another kiosk claimed the unit between our SELECT and UPDATE
+        claimed = await db.execute(claim_unit_query, {"inventory_id": unit.id})
+        if claimed.rowcount != 1:
+            continue
+
+        await db.execute(insert_listing_query, {"inventory_id": unit.id, "user_id": user_id, "reason": reason, "machine_id": machine_id})
+        await adjust_availability(db, unit.name, unit.category_id, available=-1, checked_out=1)
+        return unit.id, unit.item_code
+
+    return None
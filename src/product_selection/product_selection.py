@@ -1,26 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 from starlette.responses import JSONResponse
-import base64
+from typing import Optional
 from src.database_config import get_db
+from src.images.image_streaming import image_url
+from src.monitoring.metrics import record_inventory_event
+from src.monitoring.live_dashboard import publish_inventory_event
+from src.users.user_resolver import user_resolver
+from src.product_selection.checkout_engine import checkout_eligibility_query, checkout_flags_query, take_history_query, claim_inventory_unit
+from src.api.session_token import KioskSession, require_action, ACTION_TAKE
 
 router = APIRouter()
 
 @router.get("/inventory/unique-products")
 async def get_unique_products(db: AsyncSession = Depends(get_db)):
     try:
+        # One row per product from the maintained counters, not a scan of the listing history
         query = text("""
             SELECT 
-                i.name, 
-                MIN(i.category_id) AS category_id, 
-                COALESCE(MAX(i.price), 0) AS price,  
-                c.picture_blob AS category_image  
-            FROM inventory_config i
-            JOIN category_config c ON i.category_id = c.id  
-            WHERE i.status = 'Active' 
-            AND i.id NOT IN (SELECT inventory_id FROM inventory_listings WHERE status = 'Active') 
-            GROUP BY i.name, c.picture_blob
+                pa.product_name AS name, 
+                pa.category_id, 
+                pa.price,  
+                pa.available_count,
+                c.id AS image_category_id,
+                c.last_updated_date AS category_updated_date,
+                c.picture_hash,
+                c.picture_blob IS NOT NULL AS has_image
+            FROM product_availability pa
+            JOIN category_config c ON pa.category_id = c.id  
+            WHERE pa.available_count > 0
         """)
         result = await db.execute(query)
         products = result.fetchall()
@@ -33,7 +42,8 @@ async def get_unique_products(db: AsyncSession = Depends(get_db)):
                 "product_name": row.name,
                 "category_id": row.category_id,
                 "price": row.price,
-                "product_image": base64.b64encode(row.category_image).decode("utf-8") if row.category_image else None
+                "available_count": row.available_count,
+                "product_image_url": image_url("category", row.image_category_id, row.category_updated_date, row.has_image, row.picture_hash)
             }
             for row in products
         ]
@@ -44,75 +54,63 @@ async def get_unique_products(db: AsyncSession = Depends(get_db)):
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
 
-@router.post("/select-product/{emp_code}/{product_name}")
-async def take_product(emp_code: str, product_name: str, db: AsyncSession = Depends(get_db)):
-    try:
-        # Step 1: Fetch user_id using emp_code
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+async def checkout_first_take(db: AsyncSession, user_id: int, flags, product_name: str, machine_id: Optional[str]):
+    """Steps after the caller is identified; `flags` carries has_unreturned / has_product"""
+    # Step 2: Check if the user has an unreturned product
+    if flags.has_unreturned:
+        return JSONResponse(status_code=400, content={"message": "Please return your previous product first."})
 
-        if not user_data:
-            return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
+    # Step 3: Ensure the user is not taking the same product multiple times
+    if flags.has_product:
+        return JSONResponse(status_code=400, content={"message": "You have already taken this product."})
 
-        user_id = user_data.id  # Extract user_id
+    # Step 4: Claim a free unit (row lock + conditional update) and record the listing
+    claimed_unit = await claim_inventory_unit(db, product_name, user_id, "take", machine_id)
 
-        # Step 2: Check if the user has an unreturned product
-        check_unreturned_query = text("""
-            SELECT id FROM inventory_unreturned_listings 
-            WHERE create_by = :user_id AND status = 'Active'
-        """)
-        result = await db.execute(check_unreturned_query, {"user_id": user_id})
-        unreturned_item = result.fetchone()
-
-        if unreturned_item:
-            return JSONResponse(status_code=400, content={"message": "Please return your previous product first."})
-
-        # Step 3: Ensure the user is not taking the same product multiple times
-        check_existing_query = text("""
-            SELECT id FROM inventory_listings 
-            WHERE create_by = :user_id 
-            AND inventory_id IN (SELECT id FROM inventory_config WHERE name = :product_name) 
-            AND status = 'Active'
-        """)
-        result = await db.execute(check_existing_query, {"product_name": product_name, "user_id": user_id})
-        existing_entry = result.fetchone()
+    if not claimed_unit:
+        await db.rollback()
+        return JSONResponse(status_code=404, content={"message": "Product not found or inactive."})
 
-        if existing_entry:
-            return JSONResponse(status_code=400, content={"message": "You have already taken this product."})
+    inventory_id, item_code = claimed_unit  # Extract inventory_id and item_code
 
-        # Step 4: Get an available inventory_id and item_code from inventory_config
-        get_inventory_id_query = text("""
-            SELECT id, item_code FROM inventory_config 
-            WHERE name = :product_name AND status = 'Active' LIMIT 1
-        """)
-        result = await db.execute(get_inventory_id_query, {"product_name": product_name})
-        inventory_data = result.fetchone()
+    await db.commit()
+    record_inventory_event("take", machine_id)
+    publish_inventory_event("take", machine_id, product_name, item_code=item_code)
 
-        if not inventory_data:
-            return JSONResponse(status_code=404, content={"message": "Product not found or inactive."})
+    return JSONResponse(status_code=200, content={
+        "message": "Product selected successfully.",
+        "item_code": item_code  # Returning the item_code
+    })
 
-        inventory_id, item_code = inventory_data  # Extract inventory_id and item_code
 
-        # Step 5: Insert into inventory_listings with 'take' reason
-        insert_inventory_query = text("""
-            INSERT INTO inventory_listings (inventory_id, create_by, last_updated_by, emp_id, status, reasons)
-            VALUES (:inventory_id, :user_id, :user_id, :user_id, 'Active', 'take')
-        """)
-        await db.execute(insert_inventory_query, {"inventory_id": inventory_id, "user_id": user_id})
+@router.post("/select-product/{emp_code}/{product_name}")
+async def take_product(emp_code: str, product_name: str, machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"), db: AsyncSession = Depends(get_db)):
+    try:
+        # Step 1: Fetch user_id, unreturned and already-taken flags in one round trip
+        result = await db.execute(checkout_eligibility_query, {"emp_code": emp_code, "product_name": product_name})
+        user_data = result.fetchone()
 
-        # Step 6: Mark the product as inactive in inventory_config
-        update_inventory_status_query = text("""
-            UPDATE inventory_config SET status = 'Inactive' WHERE id = :inventory_id
-        """)
-        await db.execute(update_inventory_status_query, {"inventory_id": inventory_id})
+        if not user_data:
+            return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
 
-        await db.commit()
+        return await checkout_first_take(db, user_data.id, user_data, product_name, machine_id)
 
-        return JSONResponse(status_code=200, content={
-            "message": "Product selected successfully.",
-            "item_code": item_code  # Returning the item_code
-        })
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
+
+# ✅ Same as take_product, for a kiosk holding a session token from /auth/get-actions
+async def take_product_with_session(
+    product_name: str,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    session: KioskSession = Depends(require_action(ACTION_TAKE)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        # Step 1: The token identifies the user, so only the checkout flags are queried
+        result = await db.execute(checkout_flags_query, {"user_id": session.user_id, "product_name": product_name})
+        return await checkout_first_take(db, session.user_id, result.fetchone(), product_name, machine_id)
 
     except Exception as e:
         await db.rollback()  # Rollback in case of any error
@@ -123,7 +121,10 @@ async def take_product(emp_code: str, product_name: str, db: AsyncSession = Depe
 @router.get("/categories")
 async def get_all_categories(db: AsyncSession = Depends(get_db)):
     try:
-        result = await db.execute(text("SELECT id, name, picture_blob FROM category_config WHERE status = 'Active'"))
+        result = await db.execute(text("""
+            SELECT id, name, last_updated_date, picture_hash, picture_blob IS NOT NULL AS has_image
+            FROM category_config WHERE status = 'Active'
+        """))
         categories = result.fetchall()  
 
         if not categories:
@@ -133,7 +134,7 @@ async def get_all_categories(db: AsyncSession = Depends(get_db)):
             {
                 "category_id": row.id,
                 "category_name": row.name,
-                "category_image": base64.b64encode(row.picture_blob).decode("utf-8") if row.picture_blob else None
+                "category_image_url": image_url("category", row.id, row.last_updated_date, row.has_image, row.picture_hash)
             }
             for row in categories
         ]
@@ -148,7 +149,10 @@ async def get_all_categories(db: AsyncSession = Depends(get_db)):
 async def get_products_by_category(category_id: int, db: AsyncSession = Depends(get_db)):
     try:
         result = await db.execute(
-            text("SELECT id, item_code, name, price, picture_blob FROM inventory_config WHERE category_id = :category_id AND status = 'Active'"),
+            text("""
+                SELECT id, item_code, name, price, last_updated_date, picture_hash, picture_blob IS NOT NULL AS has_image
+                FROM inventory_config WHERE category_id = :category_id AND status = 'Active'
+            """),
             {"category_id": category_id}
         )
         products = result.fetchall()  # Corrected fetchall()
@@ -162,7 +166,7 @@ async def get_products_by_category(category_id: int, db: AsyncSession = Depends(
                 "item_code": row[1],
                 "product_name": row[2],
                 "price": row[3],
-                "product_image": base64.b64encode(row[4]).decode("utf-8") if row[4] else None
+                "product_image_url": image_url("inventory", row.id, row.last_updated_date, row.has_image, row.picture_hash)
             }
             for row in products
         ]
@@ -193,7 +197,7 @@ async def get_products_by_categories(category_id: int, user_id: int, db: AsyncSe
 
         # If no unreturned item, fetch all available products in the category
         product_query = text("""
-            SELECT id, item_code, name, price, picture_blob 
+            SELECT id, item_code, name, price, last_updated_date, picture_hash, picture_blob IS NOT NULL AS has_image
             FROM inventory_config 
             WHERE category_id = :category_id AND status = 'Active'
         """)
@@ -209,7 +213,7 @@ async def get_products_by_categories(category_id: int, user_id: int, db: AsyncSe
                 "item_code": row[1],
                 "product_name": row[2],
                 "price": row[3],
-                "product_image": base64.b64encode(row[4]).decode("utf-8") if row[4] else None
+                "product_image_url": image_url("inventory", row.id, row.last_updated_date, row.has_image, row.picture_hash)
             }
             for row in products
         ]
@@ -230,37 +234,17 @@ async def can_user_take_product(user_id: int, product_name: str, db: AsyncSessio
     - They must not have another active product (unless it was lost).
     - They can take the same product again only if it was lost.
     """
-    # Step 1: Check if the user currently has an active product
-    check_active_product_query = text("""
-        SELECT inventory_id, reasons FROM inventory_listings 
-        WHERE create_by = :user_id AND status = 'Active'
-    """)
-    result = await db.execute(check_active_product_query, {"user_id": user_id})
-    active_product = result.fetchone()
-
-    # Step 2: Check if the user has already taken this product before
-    check_previous_count_query = text("""
-        SELECT COUNT(*) FROM inventory_listings 
-        WHERE create_by = :user_id 
-        AND inventory_id IN (SELECT id FROM inventory_config WHERE name = :product_name)
-    """)
-    result = await db.execute(check_previous_count_query, {"product_name": product_name, "user_id": user_id})
-    product_taken_count = result.scalar()
-
-    # Step 3: Check if the user lost the product before
-    check_lost_product_query = text("""
-        SELECT id FROM inventory_listings 
-        WHERE create_by = :user_id 
-        AND inventory_id IN (SELECT id FROM inventory_config WHERE name = :product_name) 
-        AND reasons = 'lost'
-    """)
-    result = await db.execute(check_lost_product_query, {"product_name": product_name, "user_id": user_id})
-    lost_product = result.fetchone()
+    # Steps 1-3: Active product, previous take count and lost history in one round trip
+    result = await db.execute(take_history_query, {"product_name": product_name, "user_id": user_id})
+    history = result.fetchone()
+    active_product = history.has_active
+    product_taken_count = history.product_taken_count
+    lost_product = history.has_lost
 
     # Step 4: Decision Logic
     if active_product:
         # Allow only if the previous product was lost
-        if active_product.reasons == "lost":
+        if history.active_reason == "lost":
             return "take (second time - lost)"  # Allowed due to loss
         else:
             return JSONResponse(status_code=400, content={"message": "You can only take one product at a time."})
@@ -273,59 +257,59 @@ async def can_user_take_product(user_id: int, product_name: str, db: AsyncSessio
         return JSONResponse(status_code=400, content={"message": "You cannot take this product more than twice."})
 
 
-# ✅ API Route for Selecting a Product
-@router.post("/select-product/{emp_code}/{product_name}")
-async def additional_take_product(emp_code: str, product_name: str, db: AsyncSession = Depends(get_db)):
-    try:
-        # Step 1: Fetch user_id using emp_code
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+async def checkout_additional_take(db: AsyncSession, user_id: int, product_name: str, machine_id: Optional[str]):
+    # Step 2: Check if the user is allowed to take this product
+    reason = await can_user_take_product(user_id, product_name, db)
 
-        if not user_data:
-            return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
+    if isinstance(reason, JSONResponse):  # If the function returned an error, return it
+        return reason
 
-        user_id = user_data.id  # Extract user_id
+    # Step 3: Claim a free unit (row lock + conditional update) and record the listing
+    claimed_unit = await claim_inventory_unit(db, product_name, user_id, reason, machine_id)
 
-        # Step 2: Check if the user is allowed to take this product
-        reason = await can_user_take_product(user_id, product_name, db)
+    if not claimed_unit:
+        await db.rollback()
+        return JSONResponse(status_code=404, content={"message": "Product not found or inactive."})
 
-        if isinstance(reason, JSONResponse):  # If the function returned an error, return it
-            return reason
+    inventory_id, item_code = claimed_unit  # Extract inventory_id and item_code
 
-        # Step 3: Get an available inventory_id and item_code from inventory_config
-        get_inventory_id_query = text("""
-            SELECT id, item_code FROM inventory_config 
-            WHERE name = :product_name AND status = 'Active' LIMIT 1
-        """)
-        result = await db.execute(get_inventory_id_query, {"product_name": product_name})
-        inventory_data = result.fetchone()
+    await db.commit()
+    record_inventory_event("take", machine_id)
+    publish_inventory_event("take", machine_id, product_name, item_code=item_code)
 
-        if not inventory_data:
-            return JSONResponse(status_code=404, content={"message": "Product not found or inactive."})
+    return JSONResponse(status_code=200, content={
+        "message": "Product selected successfully.",
+        "item_code": item_code,
+        "reason": reason  # Returning the reason for logging
+    })
 
-        inventory_id, item_code = inventory_data  # Extract inventory_id and item_code
 
-        # Step 4: Insert into inventory_listings
-        insert_inventory_query = text("""
-            INSERT INTO inventory_listings (inventory_id, create_by, last_updated_by, emp_id, status, reasons)
-            VALUES (:inventory_id, :user_id, :user_id, :user_id, 'Active', :reason)
-        """)
-        await db.execute(insert_inventory_query, {"inventory_id": inventory_id, "user_id": user_id, "reason": reason})
+# ✅ API Route for Selecting a Product
+@router.post("/select-product/{emp_code}/{product_name}")
+async def additional_take_product(emp_code: str, product_name: str, machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"), db: AsyncSession = Depends(get_db)):
+    try:
+        # Step 1: Fetch user_id using emp_code
+        user_data = await user_resolver.resolve(db, emp_code)
 
-        # Step 5: Mark the product as inactive in inventory_config
-        update_inventory_status_query = text("""
-            UPDATE inventory_config SET status = 'Inactive' WHERE id = :inventory_id
-        """)
-        await db.execute(update_inventory_status_query, {"inventory_id": inventory_id})
+        if not user_data:
+            return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
 
-        await db.commit()
+        return await checkout_additional_take(db, user_data.id, product_name, machine_id)
 
-        return JSONResponse(status_code=200, content={
-            "message": "Product selected successfully.",
-            "item_code": item_code,
-            "reason": reason  # Returning the reason for logging
-        })
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
+
+# ✅ Same as additional_take_product, for a kiosk holding a session token
+async def additional_take_product_with_session(
+    product_name: str,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    session: KioskSession = Depends(require_action(ACTION_TAKE)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await checkout_additional_take(db, session.user_id, product_name, machine_id)
 
     except Exception as e:
         await db.rollback()  # Rollback in case of any error
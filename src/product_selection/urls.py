@@ -1,6 +1,6 @@
 
 from fastapi import APIRouter
-from src.product_selection.product_selection import get_all_categories, get_products_by_category, get_products_by_categories,get_unique_products, take_product,additional_take_product
+from src.product_selection.product_selection import get_all_categories, get_products_by_category, get_products_by_categories,get_unique_products, take_product,additional_take_product, take_product_with_session, additional_take_product_with_session
 
 router = APIRouter(prefix="/product-selection")
 
@@ -16,3 +16,7 @@ router.add_api_route("/additional_take_product", additional_take_product , metho
 
 router.add_api_route("/take_product", take_product, methods=["POST"])
 
+# Session-token variants: the caller comes from the Authorization header, not an emp_code
+router.add_api_route("/session/take_product", take_product_with_session, methods=["POST"])
+
+router.add_api_route("/session/additional_take_product", additional_take_product_with_session, methods=["POST"])
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 from fastapi.responses import JSONResponse
 from src.database_config import get_db  # Import your database session dependency
+from src.users.user_resolver import user_resolver
+from src.return_product.return_engine import return_item
+from src.return_product.return_product import announce_return, failed_return_response
+from src.api.session_token import KioskSession, require_action, ACTION_RETURN_DAMAGED
+from typing import Optional
 import base64
 
 router = APIRouter()
@@ -108,167 +113,131 @@ router = APIRouter()
 #     except Exception as e:
 #         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
+async def list_damaged_returnable_products(db: AsyncSession, user_id: int):
+    # Step 2: Fetch active items taken by the user along with taken date and hours used
+    get_user_items_query = text("""
+        SELECT 
+            ic.item_code,  
+            ic.name AS product_name, 
+            ic.category_id, 
+            ic.price, 
+            ic.picture_blob, 
+            c.name AS category_name,
+            il.create_date AS product_taken_date,  
+            NOW() AS product_return_date,          
+            TIMESTAMPDIFF(HOUR, il.create_date, NOW()) AS hours_used  -- ✅ Calculate hours used
+        FROM inventory_listings il
+        JOIN inventory_config ic ON il.inventory_id = ic.id
+        JOIN category_config c ON ic.category_id = c.id
+        WHERE il.emp_id = :user_id AND il.status = 'Active'
+    """)
+    result = await db.execute(get_user_items_query, {"user_id": user_id})
+    products = result.fetchall()
+
+    if not products:
+        return JSONResponse(status_code=404, content={"message": "No active damaged products to return."})
+
+    # Format the response
+    product_list = []
+    for row in products:
+        product_image = (
+            base64.b64encode(row.picture_blob).decode("utf-8") if row.picture_blob else None
+        )
+
+        product_list.append({
+            "item_code": row.item_code,
+            "product_name": row.product_name,
+            "category_id": row.category_id,
+            "category_name": row.category_name,
+            "price": row.price,
+            "product_image": product_image,
+            "product_taken_date": row.product_taken_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_taken_date else None,
+            "product_return_date": row.product_return_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_return_date else None,
+            "hours_used": row.hours_used if row.hours_used is not None else 0  # ✅ Show hours used
+        })
+
+    return JSONResponse(status_code=200, content={"products": product_list})
+
+
 @router.get("/return-damaged-products/{emp_code}")
 async def get_damaged_return_categories(emp_code: str, db: AsyncSession = Depends(get_db)):
     try:
         # Step 1: Convert emp_code to user_id
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, emp_code)
 
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
 
-        user_id = user_data.id  # Extract user_id
-
-        # Step 2: Fetch active items taken by the user along with taken date and hours used
-        get_user_items_query = text("""
-            SELECT 
-                ic.item_code,  
-                ic.name AS product_name, 
-                ic.category_id, 
-                ic.price, 
-                ic.picture_blob, 
-                c.name AS category_name,
-                il.create_date AS product_taken_date,  
-                NOW() AS product_return_date,          
-                TIMESTAMPDIFF(HOUR, il.create_date, NOW()) AS hours_used  -- ✅ Calculate hours used
-            FROM inventory_listings il
-            JOIN inventory_config ic ON il.inventory_id = ic.id
-            JOIN category_config c ON ic.category_id = c.id
-            WHERE il.emp_id = :user_id AND il.status = 'Active'
-        """)
-        result = await db.execute(get_user_items_query, {"user_id": user_id})
-        products = result.fetchall()
-
-        if not products:
-            return JSONResponse(status_code=404, content={"message": "No active damaged products to return."})
-
-        # Format the response
-        product_list = []
-        for row in products:
-            product_image = (
-                base64.b64encode(row.picture_blob).decode("utf-8") if row.picture_blob else None
-            )
-
-            product_list.append({
-                "item_code": row.item_code,
-                "product_name": row.product_name,
-                "category_id": row.category_id,
-                "category_name": row.category_name,
-                "price": row.price,
-                "product_image": product_image,
-                "product_taken_date": row.product_taken_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_taken_date else None,
-                "product_return_date": row.product_return_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_return_date else None,
-                "hours_used": row.hours_used if row.hours_used is not None else 0  # ✅ Show hours used
-            })
-
-        return JSONResponse(status_code=200, content={"products": product_list})
+        return await list_damaged_returnable_products(db, user_data.id)
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
+
+# ✅ Same as get_damaged_return_categories, for a kiosk holding a session token
+async def get_damaged_return_categories_with_session(
+    session: KioskSession = Depends(require_action(ACTION_RETURN_DAMAGED)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await list_damaged_returnable_products(db, session.user_id)
 
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
+
+async def complete_damaged_return(db: AsyncSession, user_id: int, item_code: str, is_damaged: bool, damage_reason: Optional[str], machine_id: Optional[str]):
+    # Listing, unit, counters and (when damaged) the damaged row and admin alert in one short transaction
+    outcome = await return_item(db, user_id, item_code, is_damaged, damage_reason, machine_id)
+    if not outcome.returned:
+        return failed_return_response(outcome)
+
+    await db.commit()
+    announce_return(outcome, machine_id)
+
+    response_message = "Damaged product returned successfully." if is_damaged else "Product returned successfully."
+    return JSONResponse(status_code=200, content={"message": response_message})
+
+
 @router.post("/return-damaged-product/{emp_code}/{item_code}")
 async def return_damaged_product(
     emp_code: str, 
     item_code: str, 
     is_damaged: bool = False, 
     damage_reason: str = None, 
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
     db: AsyncSession = Depends(get_db)
 ):
     try:
         # Step 1: Fetch user_id using emp_code
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, emp_code)
 
         if not user_data:
             return JSONResponse(status_code=404, content={"message": "User not found."})
 
-        user_id = user_data.id
-
-        # Step 2: Fetch inventory_id using item_code
-        get_inventory_id_query = text("SELECT id FROM inventory_config WHERE item_code = :item_code")
-        result = await db.execute(get_inventory_id_query, {"item_code": item_code})
-        inventory_data = result.fetchone()
-
-        if not inventory_data:
-            return JSONResponse(status_code=404, content={"message": "Invalid item_code."})
-
-        inventory_id = inventory_data.id
-
-        # Step 3: Check if the user has this product in inventory_listings
-        check_query = text("""
-            SELECT id FROM inventory_listings
-            WHERE inventory_id = :inventory_id AND emp_id = :user_id AND status = 'Active'
-        """)
-        result = await db.execute(check_query, {"inventory_id": inventory_id, "user_id": user_id})
-        listing_data = result.fetchone()
-
-        if not listing_data:
-            return JSONResponse(status_code=400, content={"message": "You can't return this item."})
-
-        listing_id = listing_data.id
-
-        # Step 4: Handle Normal Return or Damaged Return
-        if is_damaged:
-            # Update inventory_listings to mark as damaged
-            update_listing_query = text("""
-                UPDATE inventory_listings 
-                SET status = 'Returned', 
-                    reasons = :damage_reason,  -- Store damage reason in 'reasons' column
-                    is_damaged = 1, 
-                    last_updated_by = :user_id, 
-                    last_updated_date = NOW()
-                WHERE id = :listing_id
-            """)
-            await db.execute(update_listing_query, {"damage_reason": damage_reason, "user_id": user_id, "listing_id": listing_id})
-
-            # Insert record into inventory_damaged_listings
-            insert_damaged_query = text("""
-                INSERT INTO inventory_damaged_listings (listing_id, status, create_by, last_updated_by)
-                VALUES (:listing_id, 'Active', :user_id, :user_id)
-            """)
-            await db.execute(insert_damaged_query, {"listing_id": listing_id, "user_id": user_id})
-
-            # **Mark inventory_config status as 'Inactive'**
-            update_inventory_status_query = text("""
-                UPDATE inventory_config SET status = 'Inactive' WHERE id = :inventory_id
-            """)
-            response_message = "Damaged product returned successfully."
-
-        else:
-            # Update inventory_listings to mark as returned
-            update_listing_query = text("""
-                UPDATE inventory_listings 
-                SET status = 'Returned', 
-                    reasons = 'return', 
-                    is_damaged = 0,
-                    last_updated_by = :user_id, 
-                    last_updated_date = NOW()
-                WHERE id = :listing_id
-            """)
-            await db.execute(update_listing_query, {"user_id": user_id, "listing_id": listing_id})
-
-            # **Mark inventory_config status as 'Active'**
-            update_inventory_status_query = text("""
-                UPDATE inventory_config SET status = 'Active' WHERE id = :inventory_id
-            """)
-            response_message = "Product returned successfully."
-
-        # Update inventory_config status
-        await db.execute(update_inventory_status_query, {"inventory_id": inventory_id})
-
-        # Commit transaction
-        await db.commit()
-
-        return JSONResponse(status_code=200, content={"message": response_message})
+        return await complete_damaged_return(db, user_data.id, item_code, is_damaged, damage_reason, machine_id)
 
     except Exception as e:
         await db.rollback()  # Rollback in case of any error
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
 
+# ✅ Same as return_damaged_product, for a kiosk holding a session token
+async def return_damaged_product_with_session(
+    item_code: str,
+    is_damaged: bool = False,
+    damage_reason: str = None,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    session: KioskSession = Depends(require_action(ACTION_RETURN_DAMAGED)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await complete_damaged_return(db, session.user_id, item_code, is_damaged, damage_reason, machine_id)
+
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
 
 # from tasks.email_sending import send_email  # Import Celery task
 # from sqlalchemy.ext.asyncio import AsyncSession
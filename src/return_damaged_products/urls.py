@@ -1,9 +1,15 @@
 from fastapi import APIRouter
-from src.return_damaged_products.return_damages_product import get_damaged_return_categories, return_damaged_product
+from src.return_damaged_products.return_damages_product import (
+    get_damaged_return_categories, return_damaged_product,
+    get_damaged_return_categories_with_session, return_damaged_product_with_session
+)
 router = APIRouter(prefix="/return_damage_product")
 
 router.add_api_route("/get_damaged_return_categories", get_damaged_return_categories, methods=["GET"])
 
 router.add_api_route("/return_damaged_product", return_damaged_product, methods=["POST"])
 
+# Session-token variants: the caller comes from the Authorization header, not an emp_code
+router.add_api_route("/session/get_damaged_return_categories", get_damaged_return_categories_with_session, methods=["GET"])
 
+router.add_api_route("/session/return_damaged_product", return_damaged_product_with_session, methods=["POST"])
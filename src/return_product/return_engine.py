@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from src.notifications.outbox import enqueue_damaged_return_alert
+
+RETURNED = "returned"
+RETURNED_DAMAGED = "returned_damaged"
+NOT_RETURNABLE = "not_returnable"
+INVALID_ITEM_CODE = "invalid_item_code"
+
+# Largest batch one request may return
+RETURN_BATCH_LIMIT = 20
+
+# Finds and closes the caller's active listing, releases or retires the unit and moves the
+# counters in one statement. The WHERE on status = 'Active' makes it conditional: a second
+# tap waits on the listing row lock, then matches nothing. LAST_INSERT_ID(il.id) keeps the
+# listing id for the damaged insert without another lookup. A product without a counter row
+# is left to the availability reconciler.
+return_listing_query = text("""
+    UPDATE inventory_listings il
+    JOIN inventory_config ic ON ic.id = il.inventory_id
+    LEFT JOIN product_availability pa ON pa.product_name = ic.name AND pa.category_id = ic.category_id
+    SET il.id = LAST_INSERT_ID(il.id),
+        il.status = 'Returned',
+        il.reasons = :reason,
+        il.is_damaged = :is_damaged,
+        il.last_updated_by = :user_id,
+        il.last_updated_date = NOW(),
+        ic.status = :unit_status,
+        pa.available_count = GREATEST(pa.available_count + :available, 0),
+        pa.checked_out_count = GREATEST(pa.checked_out_count - 1, 0),
+        pa.last_updated_date = NOW()
+    WHERE ic.item_code = :item_code AND il.emp_id = :user_id AND il.status = 'Active'
+""")
+
+# Same connection, so LAST_INSERT_ID() is the listing the UPDATE above just closed
+returned_unit_query = text("""
+    SELECT name, category_id, LAST_INSERT_ID() AS listing_id
+    FROM inventory_config WHERE item_code = :item_code
+""")
+
+# The overdue detector's flag would keep blocking the caller's next take once the unit is back.
+# Closed rather than deleted: the row stays as history and the detector never re-flags it.
+close_unreturned_query = text("""
+    UPDATE inventory_unreturned_listings
+    SET status = 'Inactive', last_updated_by = :user_id, last_updated_date = NOW()
+    WHERE listing_id = :listing_id AND status = 'Active'
+""")
+
+item_code_exists_query = text("SELECT 1 FROM inventory_config WHERE item_code = :item_code")
+
+insert_damaged_listing_query = text("""
+    INSERT INTO inventory_damaged_listings (listing_id, status, create_by, last_updated_by)
+    VALUES (:listing_id, 'Active', :user_id, :user_id)
+""")
+
+
+@dataclass
+class ReturnOutcome:
+    item_code: str
+    status: str
+    product_name: Optional[str] = None
+    listing_id: Optional[int] = None
+
+    @property
+    def returned(self) -> bool:
+        return self.status in (RETURNED, RETURNED_DAMAGED)
+
+    @property
+    def event_name(self) -> str:
+        return "damaged_return" if self.status == RETURNED_DAMAGED else "return"
+
+
+async def return_item(db: AsyncSession, user_id: int, item_code: str, is_damaged: bool = False,
+                      damage_reason: Optional[str] = None, machine_id: Optional[str] = None) -> ReturnOutcome:
+    """
+    Returns one unit the caller holds, inside the caller's transaction, and clears an
+    overdue flag on its listing. A damaged unit is retired, gets its inventory_damaged_listings
+    row and queues the admin alert; a normal return goes back on the shelf. The caller commits.
+    """
+    result = await db.execute(return_listing_query, {
+        "item_code": item_code,
+        "user_id": user_id,
+        "reason": damage_reason if is_damaged else "return",
+        "is_damaged": 1 if is_damaged else 0,
+        "unit_status": "Inactive" if is_damaged else "Active",
+        "available": 0 if is_damaged else 1,
+    })
+    if result.rowcount == 0:
+        # Failure path only: tell an unknown item_code apart from one the caller does not hold
+        exists = (await db.execute(item_code_exists_query, {"item_code": item_code})).first()
+        return ReturnOutcome(item_code, NOT_RETURNABLE if exists else INVALID_ITEM_CODE)
+
+    unit = (await db.execute(returned_unit_query, {"item_code": item_code})).fetchone()
+    await db.execute(close_unreturned_query, {"listing_id": unit.listing_id, "user_id": user_id})
+    if is_damaged:
+        await db.execute(insert_damaged_listing_query, {"listing_id": unit.listing_id, "user_id": user_id})
+        # Admin alert rides in this transaction; the notification worker sends it after commit
+        await enqueue_damaged_return_alert(db, user_id, item_code, unit.name, damage_reason, machine_id)
+        return ReturnOutcome(item_code, RETURNED_DAMAGED, unit.name, unit.listing_id)
+    return ReturnOutcome(item_code, RETURNED, unit.name, unit.listing_id)
+
+
+async def return_items(db: AsyncSession, user_id: int, items: List[dict], machine_id: Optional[str] = None) -> List[ReturnOutcome]:
+    """
+    Batch form of return_item; each entry is {"item_code", "is_damaged", "damage_reason"}.
+    Items the caller cannot return are reported and leave no writes behind, the rest are
+    returned in the caller's transaction. A repeated item_code is only returned once.
+    """
+    outcomes = []
+    seen = set()
+    for item in items:
+        item_code = item["item_code"]
+        if item_code in seen:
+            outcomes.append(ReturnOutcome(item_code, NOT_RETURNABLE))
+            continue
+        seen.add(item_code)
+        outcomes.append(await return_item(db, user_id, item_code, item.get("is_damaged", False),
+                                          item.get("damage_reason"), machine_id))
+    return outcomes
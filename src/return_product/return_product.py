@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 from fastapi.responses import JSONResponse
 from src.database_config import get_db  # Import your database session dependency
+from src.monitoring.metrics import record_inventory_event
+from src.monitoring.live_dashboard import publish_inventory_event
+from src.users.user_resolver import user_resolver
+from src.return_product.return_engine import (
+    RETURN_BATCH_LIMIT, INVALID_ITEM_CODE, ReturnOutcome, return_item, return_items
+)
+from src.api.session_token import KioskSession, require_action, ACTION_RETURN, ACTION_RETURN_DAMAGED
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import base64
 
 router = APIRouter()
@@ -68,120 +77,192 @@ router = APIRouter()
 #         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
 
+async def list_returnable_products(db: AsyncSession, user_id: int):
+    # Step 2: Fetch active items taken by the user along with taken date and item_code
+    get_user_items_query = text("""
+        SELECT 
+            ic.item_code,  
+            ic.name AS product_name, 
+            ic.category_id, 
+            ic.price, 
+            ic.picture_blob, 
+            c.name AS category_name,
+            il.create_date AS product_taken_date,  
+            NOW() AS product_return_date,          
+            TIMESTAMPDIFF(HOUR, il.create_date, NOW()) AS hours_used  -- ✅ Calculate hours used
+        FROM inventory_listings il
+        JOIN inventory_config ic ON il.inventory_id = ic.id
+        JOIN category_config c ON ic.category_id = c.id
+        WHERE il.emp_id = :user_id AND il.status = 'Active'
+    """)
+    result = await db.execute(get_user_items_query, {"user_id": user_id})
+    products = result.fetchall()
+
+    if not products:
+        return JSONResponse(status_code=404, content={"message": "No active products to return."})
+
+    # Format the response
+    product_list = []
+    for row in products:
+        product_image = (
+            base64.b64encode(row.picture_blob).decode("utf-8") if row.picture_blob else None
+        )
+
+        product_list.append({
+            "item_code": row.item_code,
+            "product_name": row.product_name,
+            "category_id": row.category_id,
+            "category_name": row.category_name,
+            "price": row.price,
+            "product_image": product_image,
+            "product_taken_date": row.product_taken_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_taken_date else None,
+            "product_return_date": row.product_return_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_return_date else None,
+            "hours_used": row.hours_used if row.hours_used is not None else 0  # ✅ Show hours used
+        })
+
+    return JSONResponse(status_code=200, content={"products": product_list})
+
+
 @router.get("/return-products/{emp_code}")
 async def get_return_categories(emp_code: str, db: AsyncSession = Depends(get_db)):
     try:
         # Step 1: Convert emp_code to user_id
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, emp_code)
 
         if not user_data:
             return JSONResponse(status_code=404, content={"message": f"User with emp_code {emp_code} not found."})
 
-        user_id = user_data[0]  # Extract user_id
-
-        # Step 2: Fetch active items taken by the user along with taken date and item_code
-        get_user_items_query = text("""
-            SELECT 
-                ic.item_code,  
-                ic.name AS product_name, 
-                ic.category_id, 
-                ic.price, 
-                ic.picture_blob, 
-                c.name AS category_name,
-                il.create_date AS product_taken_date,  
-                NOW() AS product_return_date,          
-                TIMESTAMPDIFF(HOUR, il.create_date, NOW()) AS hours_used  -- ✅ Calculate hours used
-            FROM inventory_listings il
-            JOIN inventory_config ic ON il.inventory_id = ic.id
-            JOIN category_config c ON ic.category_id = c.id
-            WHERE il.emp_id = :user_id AND il.status = 'Active'
-        """)
-        result = await db.execute(get_user_items_query, {"user_id": user_id})
-        products = result.fetchall()
-
-        if not products:
-            return JSONResponse(status_code=404, content={"message": "No active products to return."})
-
-        # Format the response
-        product_list = []
-        for row in products:
-            product_image = (
-                base64.b64encode(row.picture_blob).decode("utf-8") if row.picture_blob else None
-            )
-
-            product_list.append({
-                "item_code": row.item_code,
-                "product_name": row.product_name,
-                "category_id": row.category_id,
-                "category_name": row.category_name,
-                "price": row.price,
-                "product_image": product_image,
-                "product_taken_date": row.product_taken_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_taken_date else None,
-                "product_return_date": row.product_return_date.strftime("%Y-%m-%d %H:%M:%S") if row.product_return_date else None,
-                "hours_used": row.hours_used if row.hours_used is not None else 0  # ✅ Show hours used
-            })
-
-        return JSONResponse(status_code=200, content={"products": product_list})
+        return await list_returnable_products(db, user_data.id)
 
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
+
+# ✅ Same as get_return_categories, for a kiosk holding a session token
+async def get_return_categories_with_session(
+    session: KioskSession = Depends(require_action(ACTION_RETURN)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await list_returnable_products(db, session.user_id)
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
+
+def failed_return_response(outcome: ReturnOutcome) -> JSONResponse:
+    if outcome.status == INVALID_ITEM_CODE:
+        return JSONResponse(status_code=404, content={"message": "Invalid item_code."})
+    return JSONResponse(status_code=400, content={"message": "You can't return this item."})
+
+
+def announce_return(outcome: ReturnOutcome, machine_id: Optional[str]) -> None:
+    """Metrics and live dashboard, only once the return is committed"""
+    record_inventory_event(outcome.event_name, machine_id)
+    publish_inventory_event(outcome.event_name, machine_id, outcome.product_name, item_code=outcome.item_code)
+
+
+async def complete_return(db: AsyncSession, user_id: int, item_code: str, machine_id: Optional[str]):
+    # Listing, unit and counters change in one conditional UPDATE; a double tap finds nothing to return
+    outcome = await return_item(db, user_id, item_code, machine_id=machine_id)
+    if not outcome.returned:
+        return failed_return_response(outcome)
+
+    await db.commit()
+    announce_return(outcome, machine_id)
+
+    return JSONResponse(status_code=200, content={"message": "Product returned successfully."})
+
+
 @router.post("/return-product/{emp_code}/{item_code}")
-async def return_product(emp_code: str, item_code: str, db: AsyncSession = Depends(get_db)):
+async def return_product(emp_code: str, item_code: str, machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"), db: AsyncSession = Depends(get_db)):
     try:
         # Step 1: Fetch user_id using emp_code
-        get_user_id_query = text("SELECT id FROM user_config WHERE emp_code = :emp_code")
-        result = await db.execute(get_user_id_query, {"emp_code": emp_code})
-        user_data = result.fetchone()
+        user_data = await user_resolver.resolve(db, emp_code)
 
         if not user_data:
             return JSONResponse(status_code=404, content={"message": "User not found."})
 
-        user_id = user_data.id
+        return await complete_return(db, user_data.id, item_code, machine_id)
+
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
-        # Step 2: Fetch inventory_id using item_code
-        get_inventory_id_query = text("SELECT id FROM inventory_config WHERE item_code = :item_code")
-        result = await db.execute(get_inventory_id_query, {"item_code": item_code})
-        inventory_data = result.fetchone()
 
-        if not inventory_data:
-            return JSONResponse(status_code=404, content={"message": "Invalid item_code."})
+# ✅ Same as return_product, for a kiosk holding a session token
+async def return_product_with_session(
+    item_code: str,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    session: KioskSession = Depends(require_action(ACTION_RETURN)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await complete_return(db, session.user_id, item_code, machine_id)
 
-        inventory_id = inventory_data.id
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
 
-        # Step 3: Check if the user has this product in inventory_listings
-        check_query = text("""
-            SELECT id FROM inventory_listings
-            WHERE inventory_id = :inventory_id AND emp_id = :user_id AND status = 'Active'
-        """)
-        result = await db.execute(check_query, {"inventory_id": inventory_id, "user_id": user_id})
-        listing_data = result.fetchone()
 
-        if not listing_data:
-            return JSONResponse(status_code=400, content={"message": "You can't return this item."})
+class ReturnBatchItem(BaseModel):
+    item_code: str
+    is_damaged: bool = False
+    damage_reason: Optional[str] = None
 
-        listing_id = listing_data.id
 
-        # Step 4: Update inventory_listings to mark as returned
-        update_listing_query = text("""
-            UPDATE inventory_listings 
-            SET status = 'Returned', reasons = 'return', last_updated_by = :user_id, last_updated_date = NOW()
-            WHERE id = :listing_id
-        """)
-        await db.execute(update_listing_query, {"user_id": user_id, "listing_id": listing_id})
+class ReturnBatchRequest(BaseModel):
+    items: List[ReturnBatchItem] = Field(min_length=1, max_length=RETURN_BATCH_LIMIT)
 
-        # Step 5: Update inventory_config to set status back to Active
-        update_inventory_status_query = text("""
-            UPDATE inventory_config SET status = 'Active' WHERE id = :inventory_id
-        """)
-        await db.execute(update_inventory_status_query, {"inventory_id": inventory_id})
 
-        # Commit transaction
+async def complete_return_batch(db: AsyncSession, user_id: int, request: ReturnBatchRequest, machine_id: Optional[str]):
+    # One transaction for the whole batch; items that cannot be returned are reported, not fatal
+    outcomes = await return_items(db, user_id, [item.model_dump() for item in request.items], machine_id)
+    if any(outcome.returned for outcome in outcomes):
         await db.commit()
+        for outcome in outcomes:
+            if outcome.returned:
+                announce_return(outcome, machine_id)
+
+    returned = sum(outcome.returned for outcome in outcomes)
+    return JSONResponse(status_code=200 if returned else 400, content={
+        "returned": returned,
+        "items": [{"item_code": outcome.item_code, "status": outcome.status, "product_name": outcome.product_name}
+                  for outcome in outcomes],
+    })
+
+
+# ✅ Several item_codes in one request, e.g. a shift's worth of tools
+async def return_product_batch(
+    emp_code: str,
+    request: ReturnBatchRequest,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        user_data = await user_resolver.resolve(db, emp_code)
+
+        if not user_data:
+            return JSONResponse(status_code=404, content={"message": "User not found."})
+
+        return await complete_return_batch(db, user_data.id, request, machine_id)
 
-        return JSONResponse(status_code=200, content={"message": "Product returned successfully."})
+    except Exception as e:
+        await db.rollback()  # Rollback in case of any error
+        return JSONResponse(status_code=500, content={"error": "Internal Server Error", "details": str(e)})
+
+
+# ✅ Same as return_product_batch, for a kiosk holding a session token
+async def return_product_batch_with_session(
+    request: ReturnBatchRequest,
+    machine_id: Optional[str] = Header(default=None, alias="X-Machine-Id"),
+    session: KioskSession = Depends(require_action(ACTION_RETURN)),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        if any(item.is_damaged for item in request.items) and ACTION_RETURN_DAMAGED not in session.actions:
+            return JSONResponse(status_code=403, content={"message": f"'{ACTION_RETURN_DAMAGED}' is not allowed for this session."})
+        return await complete_return_batch(db, session.user_id, request, machine_id)
 
     except Exception as e:
         await db.rollback()  # Rollback in case of any error
@@ -1,9 +1,16 @@
 from fastapi import APIRouter
-from src.return_product.return_product import  get_return_categories, return_product
+from src.return_product.return_product import  (
+    get_return_categories, return_product, get_return_categories_with_session, return_product_with_session,
+    return_product_batch, return_product_batch_with_session
+)
 router = APIRouter(prefix="/return_product")
 
 router.add_api_route("/get_return_categories", get_return_categories, methods=["GET"])
 # router.add_api_route("/get-role", get_role, methods=["GET"])
 router.add_api_route("/create-role", return_product, methods=["POST"])
+router.add_api_route("/return-batch", return_product_batch, methods=["POST"])
 
-
+# Session-token variants: the caller comes from the Authorization header, not an emp_code
+router.add_api_route("/session/get_return_categories", get_return_categories_with_session, methods=["GET"])
+router.add_api_route("/session/return_product", return_product_with_session, methods=["POST"])
+router.add_api_route("/session/return_batch", return_product_batch_with_session, methods=["POST"])
@@ -1,19 +1,14 @@
-from fastapi import Depends, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, Query, HTTPException, Request
+from src.seedwork.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import AsyncGenerator
-from datetime import datetime
 
 # Application modules
 from src.database_config import get_db
 from src.seedwork.models.status_msg_model import StatusMessage
-
-def convert_datetime(value):
-    """Convert datetime objects to ISO format strings"""
-    if isinstance(value, datetime):
-        return value.isoformat()  # Converts to "YYYY-MM-DDTHH:MM:SS"
-    return value  # Return other data types as-is
+from src.seedwork.export import export_response, ExportFormat
+from src.users.user_resolver import user_resolver
 
 # Get all roles
 async def role_list(db_engine: AsyncGenerator = Depends(get_db)):
@@ -23,8 +18,11 @@ async def role_list(db_engine: AsyncGenerator = Depends(get_db)):
     if len(role_list_data) == 0:
         raise HTTPException(status_code=404, detail=[{"msg": StatusMessage.s_404}])
 
-    formatted_data = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in role_list_data]
-    return JSONResponse(content={"data": formatted_data}, status_code=200)
+    return JSONResponse(content={"data": role_list_data}, status_code=200)
+
+# Export all roles (NDJSON / CSV)
+async def export_roles(request: Request, format: str = ExportFormat):
+    return await export_response(request, text("SELECT * FROM role_config"), format, "roles")
 
 # Get a specific role by ID
 async def get_role(role_id: int = Query(default=None), db_engine: AsyncGenerator = Depends(get_db)):
@@ -35,8 +33,7 @@ async def get_role(role_id: int = Query(default=None), db_engine: AsyncGenerator
     if not role_data:
         raise HTTPException(status_code=404, detail=[{"msg": StatusMessage.s_404}])
 
-    formatted_data = {key: convert_datetime(value) for key, value in dict(role_data).items()}
-    return JSONResponse(content={"data": formatted_data}, status_code=200)
+    return JSONResponse(content={"data": role_data}, status_code=200)
 
 # Create a new role
 async def create_role(
@@ -55,6 +52,8 @@ async def create_role(
         "updated_by": updated_by
     })
     await db_engine.commit()
+    # Users pointing at this role id may be cached without a role_name
+    user_resolver.clear()
     return JSONResponse(content={"message": "Role created successfully"}, status_code=201)
 
 # Update a role
@@ -75,6 +74,8 @@ async def update_role(
         "role_id": role_id
     })
     await db_engine.commit()
+    # Cached users carry their role_name; drop them all, roles change rarely
+    user_resolver.clear()
     return JSONResponse(content={"message": "Role updated successfully"}, status_code=200)
 
 # Delete a role
@@ -82,4 +83,6 @@ async def delete_role(role_id: int, db_engine: AsyncGenerator = Depends(get_db))
     query = text("DELETE FROM role_config WHERE id = :role_id")
     await db_engine.execute(query, {"role_id": role_id})
     await db_engine.commit()
+    # Cached users carry their role_name; drop them all, roles change rarely
+    user_resolver.clear()
     return JSONResponse(content={"message": "Role deleted successfully"}, status_code=200)
@@ -1,6 +1,10 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 from functools import wraps
+from logging.handlers import QueueHandler
 from typing import Optional, Dict
 from graypy import GELFUDPHandler
 from dotenv import load_dotenv
@@ -17,30 +21,138 @@ def gathering_graylogger_info():
     }
     return server_info
 
+def gathering_log_pipeline_info():
+    environment = os.getenv('ENVIRONMENT', 'dev')
+    default_level = 'INFO' if environment.lower() in ('prod', 'production') else 'DEBUG'
+    pipeline_info = {
+        "log_level" : os.getenv('LOG_LEVEL', default_level).upper(),
+        "queue_size" : int(os.getenv('LOG_QUEUE_SIZE', 10000)),
+        "batch_size" : int(os.getenv('LOG_BATCH_SIZE', 100)),
+        "flush_interval" : float(os.getenv('LOG_FLUSH_INTERVAL', 0.5))
+    }
+    return pipeline_info
+
+class DropCountingQueueHandler(QueueHandler):
+    """Request-path handler: enqueues without blocking and counts what a full queue drops"""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process, so the record is not pickled; only freeze the message so later
+        # mutation of the args cannot change what is sent
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+class BatchingGelfListener:
+    """Background thread that drains the log queue in batches and ships compressed GELF datagrams"""
+
+    _stop_sentinel = object()
+
+    def __init__(self, log_queue: queue.Queue, handler: GELFUDPHandler, batch_size: int, flush_interval: float) -> None:
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sent = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gelf-log-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.queue.put(self._stop_sentinel)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size and batch[-1] is not self._stop_sentinel:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.handler.level:
+            return
+        try:
+            # makePickle builds the zlib-compressed GELF packet, send chunks it over the handler's socket
+            self.handler.send(self.handler.makePickle(record))
+            self.sent += 1
+        except Exception:
+            self.handler.handleError(record)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            for record in batch:
+                if record is self._stop_sentinel:
+                    return
+                self._send(record)
+
 class BaseLoggerConfig:
-    def __init__(self, log_level: str, server_info: Dict, formatter: logging.Formatter) -> None:
+    def __init__(self, log_level: str, server_info: Dict, formatter: logging.Formatter, pipeline_info: Optional[Dict] = None) -> None:
         self.log_level = log_level
         self.formatter = formatter
         self.server_info = server_info
+        self.pipeline_info = pipeline_info or gathering_log_pipeline_info()
 
     def configure_graylog_handler(self) -> GELFUDPHandler:
-        graylog_handler = GELFUDPHandler(self.server_info.get('graylog_host'), self.server_info.get('graylog_port'), 
+        graylog_handler = GELFUDPHandler(self.server_info.get('graylog_host'), self.server_info.get('graylog_port'), compress = True,
                                         extra_fields = {"app_name": self.server_info.get('app_name'), "environment": self.server_info.get('environment')})
         graylog_handler.setFormatter(self.formatter)
         return graylog_handler
 
+    def configure_queue_pipeline(self):
+        log_queue = queue.Queue(maxsize = self.pipeline_info.get('queue_size'))
+        queue_handler = DropCountingQueueHandler(log_queue)
+        listener = BatchingGelfListener(log_queue, self.configure_graylog_handler(),
+                                        self.pipeline_info.get('batch_size'), self.pipeline_info.get('flush_interval'))
+        return queue_handler, listener
+
 class LoggerManager:
     _loggers = {}
+    _pipelines = {}
 
     @classmethod
     def get_logger(cls, name: str, config: BaseLoggerConfig) -> logging.Logger:
         if name not in cls._loggers:
             logger = logging.getLogger(name)
             logger.setLevel(config.log_level)
-            logger.addHandler(config.configure_graylog_handler())
+            queue_handler, listener = config.configure_queue_pipeline()
+            logger.addHandler(queue_handler)
+            listener.start()
+            # flush whatever is still queued when the worker exits
+            atexit.register(listener.stop)
             cls._loggers[name] = logger
+            cls._pipelines[name] = (queue_handler, listener)
         return cls._loggers[name]
 
+    @classmethod
+    def pipeline_stats(cls, name: str) -> Dict:
+        if name not in cls._pipelines:
+            return {"queued": 0, "dropped": 0, "sent": 0}
+        queue_handler, listener = cls._pipelines[name]
+        return {"queued": queue_handler.queue.qsize(), "dropped": queue_handler.dropped, "sent": listener.sent}
+
 # Specific configurations for different logging needs
 class LoggingComponent:
 
@@ -48,9 +160,13 @@ class LoggingComponent:
         self.formatter = logging.Formatter('%(asctime)s - %(host)s - %(user)s - %(source)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
         # Configurations for different loggers
         self.log_server_info = gathering_graylogger_info()
-        self.gray_logs = BaseLoggerConfig(logging.DEBUG, self.log_server_info, self.formatter)
+        self.log_pipeline_info = gathering_log_pipeline_info()
+        self.gray_logs = BaseLoggerConfig(self.log_pipeline_info.get('log_level'), self.log_server_info, self.formatter, self.log_pipeline_info)
 
     def get_gray_logger(self) -> logging.Logger:
         return LoggerManager.get_logger('Ausweg-XLogger-Ems', self.gray_logs)
 
+    def get_gray_logger_stats(self) -> Dict:
+        return LoggerManager.pipeline_stats('Ausweg-XLogger-Ems')
+
 logging_component = LoggingComponent()
\ No newline at end of file
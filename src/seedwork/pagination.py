@@ -0,0 +1,22 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+
+
+def encode_cursor(create_date: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for (create_date, id) ordered listings"""
+    payload = json.dumps([create_date.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        create_date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(create_date), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=[{"msg": "Invalid cursor"}])
@@ -0,0 +1,36 @@
+import base64
+from collections.abc import Mapping
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse as StarletteJSONResponse
+from sqlalchemy.engine import Row
+
+
+def json_default(value: Any) -> Any:
+    """Types orjson does not encode natively; datetime, date and UUID it already handles"""
+    if isinstance(value, Mapping):
+        # RowMapping from result.mappings(); its values are then encoded natively, no per-value Python calls
+        return dict(value)
+    if isinstance(value, Row):
+        return value._asdict()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("utf-8")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class JSONResponse(StarletteJSONResponse):
+    """
+    Drop-in for fastapi.responses.JSONResponse that encodes SQLAlchemy rows, datetimes,
+    Decimal and bytes in a single pass, so handlers can return query results as-is.
+    Also the app's default_response_class.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Literal, Optional
+from fastapi import Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+# Application modules
+from src.database_config import get_db
+from src.seedwork.responses import JSONResponse
+from src.usage_reports.rollup import JOB_NAME
+
+MAX_REPORT_ROWS = 1000
+
+# Rollup table and bucket column per granularity, and how far back a report looks by default
+GRANULARITIES = {
+    "daily": ("usage_rollup_daily", "bucket_date", timedelta(days=30)),
+    "hourly": ("usage_rollup_hourly", "bucket_start", timedelta(hours=48)),
+}
+
+# group_by -> (SELECT columns, GROUP BY columns, extra JOIN)
+GROUPINGS = {
+    "product": ("r.product_name, r.category_id", "r.product_name, r.category_id", ""),
+    "employee": (
+        "r.emp_id, uc.emp_code, uc.first_name, uc.last_name",
+        "r.emp_id, uc.emp_code, uc.first_name, uc.last_name",
+        "LEFT JOIN user_config uc ON uc.id = r.emp_id",
+    ),
+    "machine": ("r.machine_id", "r.machine_id", ""),
+}
+
+MEASURES = """
+    SUM(r.takes) AS takes,
+    SUM(r.returns) AS returns,
+    SUM(r.damaged_returns) AS damaged_returns,
+    SUM(r.lost_returns) AS lost_returns,
+    SUM(r.damaged_returns) / NULLIF(SUM(r.returns), 0) AS damage_rate,
+    SUM(r.seconds_used) / 3600 AS hours_used,
+    SUM(r.seconds_used) / 3600 / NULLIF(SUM(r.returns), 0) AS avg_hours_used
+"""
+
+COUNT_MEASURES = ("takes", "returns", "damaged_returns", "lost_returns")
+
+last_rollup_query = text("SELECT last_run_date FROM job_watermarks WHERE name = :name")
+
+
+def usage_row(row) -> dict:
+    """SUM() comes back as DECIMAL; counts become ints, ratios and hours floats"""
+    data = dict(row)
+    for key, value in data.items():
+        if isinstance(value, Decimal):
+            data[key] = int(value) if key in COUNT_MEASURES else round(float(value), 4)
+    return data
+
+
+def report_filters(bucket: str, product_name: Optional[str], emp_id: Optional[int], machine_id: Optional[str]):
+    conditions = [f"r.{bucket} >= :date_from", f"r.{bucket} < :date_to"]
+    params = {}
+    if product_name:
+        conditions.append("r.product_name = :product_name")
+        params["product_name"] = product_name
+    if emp_id is not None:
+        conditions.append("r.emp_id = :emp_id")
+        params["emp_id"] = emp_id
+    if machine_id is not None:
+        conditions.append("r.machine_id = :machine_id")
+        params["machine_id"] = machine_id
+    return " AND ".join(conditions), params
+
+
+def report_window(granularity: str, date_from: Optional[datetime], date_to: Optional[datetime]):
+    date_to = date_to or datetime.now()
+    return date_from or date_to - GRANULARITIES[granularity][2], date_to
+
+
+async def report_response(db: AsyncSession, query, params: dict, granularity: str, date_from: datetime, date_to: datetime):
+    rows = (await db.execute(query, params)).mappings().all()
+    as_of = (await db.execute(last_rollup_query, {"name": JOB_NAME})).scalar()
+    return JSONResponse(content={
+        "granularity": granularity,
+        "date_from": date_from,
+        "date_to": date_to,
+        # Rollups trail the listings by up to USAGE_ROLLUP_INTERVAL
+        "as_of": as_of,
+        "data": [usage_row(row) for row in rows],
+    }, status_code=200)
+
+
+# Totals per product, employee or machine over a window, read from the rollups only
+async def usage_summary(
+    group_by: Literal["product", "employee", "machine"] = "product",
+    granularity: Literal["daily", "hourly"] = "daily",
+    date_from: Optional[datetime] = Query(default=None),
+    date_to: Optional[datetime] = Query(default=None),
+    product_name: Optional[str] = Query(default=None),
+    emp_id: Optional[int] = Query(default=None),
+    machine_id: Optional[str] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=MAX_REPORT_ROWS),
+    db: AsyncSession = Depends(get_db)
+):
+    table, bucket, _ = GRANULARITIES[granularity]
+    select_columns, group_columns, join = GROUPINGS[group_by]
+    date_from, date_to = report_window(granularity, date_from, date_to)
+    where, params = report_filters(bucket, product_name, emp_id, machine_id)
+    query = text(f"""
+        SELECT {select_columns}, {MEASURES}
+        FROM {table} r
+        {join}
+        WHERE {where}
+        GROUP BY {group_columns}
+        ORDER BY takes DESC
+        LIMIT :limit
+    """)
+    params.update({"date_from": date_from, "date_to": date_to, "limit": limit})
+    return await report_response(db, query, params, granularity, date_from, date_to)
+
+
+# One row per hour or day, optionally narrowed to a product, employee or machine
+async def usage_timeline(
+    granularity: Literal["daily", "hourly"] = "daily",
+    date_from: Optional[datetime] = Query(default=None),
+    date_to: Optional[datetime] = Query(default=None),
+    product_name: Optional[str] = Query(default=None),
+    emp_id: Optional[int] = Query(default=None),
+    machine_id: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_db)
+):
+    table, bucket, _ = GRANULARITIES[granularity]
+    date_from, date_to = report_window(granularity, date_from, date_to)
+    where, params = report_filters(bucket, product_name, emp_id, machine_id)
+    query = text(f"""
+        SELECT r.{bucket} AS bucket, {MEASURES}
+        FROM {table} r
+        WHERE {where}
+        GROUP BY r.{bucket}
+        ORDER BY r.{bucket}
+        LIMIT :limit
+    """)
+    params.update({"date_from": date_from, "date_to": date_to, "limit": MAX_REPORT_ROWS})
+    return await report_response(db, query, params, granularity, date_from, date_to)
@@ -0,0 +1,206 @@
+"""
+Keeps usage_rollup_hourly / usage_rollup_daily current from inventory_listings. Each
+listing is counted twice over its life: once when it is taken (takes) and once when it
+is returned (returns, damaged_returns, lost_returns, seconds_used).
+usage_rollup_state on the listing records how far it has been counted, so late commits
+are picked up on a later run and nothing is counted twice.
+
+    python -m src.usage_reports.rollup   # roll up everything pending, then exit
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from dotenv import load_dotenv
+
+# Application modules
+from src.database_config import session_local
+from src.monitoring.metrics import USAGE_ROLLUP_DURATION, USAGE_ROLLUP_LISTINGS
+from src.seedwork.logger import logging_component
+
+load_dotenv()
+logger = logging_component.get_gray_logger()
+
+# 0 disables the background rollup
+USAGE_ROLLUP_INTERVAL = float(os.getenv("USAGE_ROLLUP_INTERVAL", 300))
+USAGE_ROLLUP_BATCH_SIZE = int(os.getenv("USAGE_ROLLUP_BATCH_SIZE", 5000))
+
+JOB_NAME = "usage_rollup"
+
+TAKE_PENDING = 0
+TAKE_COUNTED = 1
+RETURN_COUNTED = 2
+
+# SKIP LOCKED: while one worker rolls up, the others see no row and skip this run
+lock_job_query = text("""
+    SELECT last_id FROM job_watermarks WHERE name = :name FOR UPDATE SKIP LOCKED
+""")
+
+finish_job_query = text("""
+    UPDATE job_watermarks SET last_id = GREATEST(last_id, :last_id), last_run_date = NOW() WHERE name = :name
+""")
+
+pending_takes_query = text("""
+    SELECT id FROM inventory_listings
+    WHERE usage_rollup_state = 0
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+pending_returns_query = text("""
+    SELECT id FROM inventory_listings
+    WHERE usage_rollup_state = 1 AND status = 'Returned'
+    ORDER BY id
+    LIMIT :batch_size
+""")
+
+# {table} / {bucket} pairs: (usage_rollup_hourly, hour of the event), (usage_rollup_daily, its date)
+ROLLUP_TABLES = (
+    ("usage_rollup_hourly", "bucket_start", "DATE_FORMAT({column}, '%Y-%m-%d %H:00:00')"),
+    ("usage_rollup_daily", "bucket_date", "DATE({column})"),
+)
+
+TAKES_ROLLUP = """
+    INSERT INTO {table} ({bucket}, product_name, category_id, emp_id, machine_id, takes, last_updated_date)
+    SELECT {bucket_expression}, ic.name, ic.category_id, COALESCE(il.emp_id, 0), COALESCE(il.machine_id, ''),
+           COUNT(*), NOW()
+    FROM inventory_listings il
+    JOIN inventory_config ic ON ic.id = il.inventory_id
+    WHERE il.id IN :ids
+    GROUP BY 1, 2, 3, 4, 5
+    ON DUPLICATE KEY UPDATE
+        takes = takes + VALUES(takes),
+        last_updated_date = NOW()
+"""
+
+# Bucketed by the return time; the listing's machine is where the unit was taken. The return
+# writes the damage reason into reasons, so 'lost' is only known from here on
+RETURNS_ROLLUP = """
+    INSERT INTO {table} ({bucket}, product_name, category_id, emp_id, machine_id, returns, damaged_returns, lost_returns,
+                         seconds_used, last_updated_date)
+    SELECT {bucket_expression}, ic.name, ic.category_id, COALESCE(il.emp_id, 0), COALESCE(il.machine_id, ''),
+           COUNT(*), SUM(il.is_damaged = 1), SUM(il.reasons = 'lost'),
+           SUM(GREATEST(TIMESTAMPDIFF(SECOND, il.create_date, il.last_updated_date), 0)), NOW()
+    FROM inventory_listings il
+    JOIN inventory_config ic ON ic.id = il.inventory_id
+    WHERE il.id IN :ids
+    GROUP BY 1, 2, 3, 4, 5
+    ON DUPLICATE KEY UPDATE
+        returns = returns + VALUES(returns),
+        damaged_returns = damaged_returns + VALUES(damaged_returns),
+        lost_returns = lost_returns + VALUES(lost_returns),
+        seconds_used = seconds_used + VALUES(seconds_used),
+        last_updated_date = NOW()
+"""
+
+
+def rollup_queries(template: str, time_column: str):
+    return [
+        text(template.format(table=table, bucket=bucket, bucket_expression=expression.format(column=time_column)))
+        .bindparams(bindparam("ids", expanding=True))
+        for table, bucket, expression in ROLLUP_TABLES
+    ]
+
+
+take_rollup_queries = rollup_queries(TAKES_ROLLUP, "il.create_date")
+return_rollup_queries = rollup_queries(RETURNS_ROLLUP, "il.last_updated_date")
+
+mark_counted_query = text("""
+    UPDATE inventory_listings SET usage_rollup_state = :new_state
+    WHERE id IN :ids AND usage_rollup_state = :old_state
+""").bindparams(bindparam("ids", expanding=True))
+
+
+async def roll_up_batch(db: AsyncSession, pending_query, rollup_queries_for_kind, old_state: int, new_state: int,
+                        batch_size: int) -> Optional[List[int]]:
+    """
+    Adds one batch of pending listings to both rollup tables and marks them counted, in one
+    transaction. Returns the listing ids handled, or None when another worker holds the job.
+    """
+    # READ COMMITTED: the INSERT ... SELECT reads the listings without locking them
+    await db.connection(execution_options={"isolation_level": "READ COMMITTED"})
+    if (await db.execute(lock_job_query, {"name": JOB_NAME})).first() is None:
+        await db.commit()
+        return None
+
+    ids = [row.id for row in (await db.execute(pending_query, {"batch_size": batch_size})).fetchall()]
+    if ids:
+        for query in rollup_queries_for_kind:
+            await db.execute(query, {"ids": ids})
+        await db.execute(mark_counted_query, {"ids": ids, "old_state": old_state, "new_state": new_state})
+    # last_run_date is the reports' "as of", so it moves even when nothing was pending
+    await db.execute(finish_job_query, {"name": JOB_NAME, "last_id": ids[-1] if ids else 0})
+    await db.commit()
+    return ids
+
+
+class UsageRollup:
+    def __init__(self, interval: float, batch_size: int = USAGE_ROLLUP_BATCH_SIZE) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Rolls up every pending take, then every pending return; returns the listings handled"""
+        started = time.perf_counter()
+        handled = 0
+        try:
+            async with session_local() as db:
+                try:
+                    for kind, pending_query, queries, old_state, new_state in (
+                        ("take", pending_takes_query, take_rollup_queries, TAKE_PENDING, TAKE_COUNTED),
+                        ("return", pending_returns_query, return_rollup_queries, TAKE_COUNTED, RETURN_COUNTED),
+                    ):
+                        while True:
+                            ids = await roll_up_batch(db, pending_query, queries, old_state, new_state, self.batch_size)
+                            if ids is None:
+                                return handled
+                            handled += len(ids)
+                            USAGE_ROLLUP_LISTINGS.labels(kind=kind).inc(len(ids))
+                            if len(ids) < self.batch_size:
+                                break
+                except Exception as error:
+                    await db.rollback()
+                    logger.error(f"Usage rollup failed {error}", extra={'host': 'system', 'user': 'system', 'source': 'Usage Rollup'})
+        finally:
+            USAGE_ROLLUP_DURATION.observe(time.perf_counter() - started)
+        return handled
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def ensure_started(self) -> None:
+        if self.interval <= 0:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+usage_rollup = UsageRollup(USAGE_ROLLUP_INTERVAL)
+
+
+async def main() -> None:
+    from src.database_config import database_manager
+    try:
+        handled = await usage_rollup.run_once()
+    finally:
+        await database_manager.shutdown()
+    print(f"Rolled up {handled} listing event(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
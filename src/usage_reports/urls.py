@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+from src.usage_reports.reports import usage_summary, usage_timeline
+
+router = APIRouter(prefix="/usage-reports")
+
+router.add_api_route("/summary", usage_summary, methods=["GET"])
+router.add_api_route("/timeline", usage_timeline, methods=["GET"])
@@ -1,18 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from src.seedwork.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from datetime import datetime
 from src.database_config import get_db
+from src.seedwork.export import export_response, ExportFormat
+from src.users.user_resolver import user_resolver
 
 router = APIRouter(prefix="/user-handler")
 
-def convert_datetime(value):
-    """Convert datetime objects to ISO format strings"""
-    if isinstance(value, datetime):
-        return value.isoformat()  # Converts to "YYYY-MM-DDTHH:MM:SS"
-    return value  # Return other data types as-is
-
 # Create User
 @router.post("/create-user")
 async def create_user(first_name: str, last_name: str, email_id: str, emp_code: str, role_id: int, status: str, create_by: str, updated_by: str, db: AsyncSession = Depends(get_db)):
@@ -41,6 +36,7 @@ async def create_user(first_name: str, last_name: str, email_id: str, emp_code:
             "updated_by": updated_by
         })
         await db.commit()
+        user_resolver.invalidate(emp_code=emp_code)
         return JSONResponse(content={"message": "User created successfully"}, status_code=201)
     except Exception as e:
         print("Error:", str(e))  # Debugging
@@ -54,14 +50,17 @@ async def get_users(db: AsyncSession = Depends(get_db)):
         result = await db.execute(query)
         users = result.mappings().all()
 
-        # Convert RowMapping to list of dictionaries
-        user_list = [{key: convert_datetime(value) for key, value in dict(row).items()} for row in users]
-
-        return JSONResponse(content={"data": user_list}, status_code=200)
+        # Rows are serialized as-is by the shared JSONResponse
+        return JSONResponse(content={"data": users}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
 
+# Export All Users (NDJSON / CSV)
+@router.get("/export-users")
+async def export_users(request: Request, format: str = ExportFormat):
+    return await export_response(request, text("SELECT * FROM user_config"), format, "users")
+
 # Get User by ID
 @router.get("/get-user/{user_id}")
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -73,9 +72,7 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
         if not user:
             raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
 
-        user_dict = {key: convert_datetime(value) for key, value in dict(user).items()}
-
-        return JSONResponse(content={"data": user_dict}, status_code=200)
+        return JSONResponse(content={"data": user}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
         raise HTTPException(status_code=500, detail="Database error")
@@ -108,6 +105,7 @@ async def update_user(user_id: int, first_name: str, last_name: str, email_id: s
             "user_id": user_id
         })
         await db.commit()
+        user_resolver.invalidate(emp_code=emp_code, user_id=user_id)
         return JSONResponse(content={"message": "User updated successfully"}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
@@ -120,6 +118,7 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
         query = text("DELETE FROM user_config WHERE id = :user_id")
         await db.execute(query, {"user_id": user_id})
         await db.commit()
+        user_resolver.invalidate(user_id=user_id)
         return JSONResponse(content={"message": "User deleted successfully"}, status_code=200)
     except Exception as e:
         print("Error:", str(e))
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+resolve_user_query = text("""
+    SELECT u.id, u.emp_code, u.first_name, u.last_name, u.status, r.role_name
+    FROM user_config u
+    LEFT JOIN role_config r ON u.role_id = r.id
+    WHERE u.emp_code = :emp_code
+""")
+
+
+@dataclass(frozen=True)
+class ResolvedUser:
+    id: int
+    emp_code: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    status: Optional[str]
+    role_name: Optional[str]
+
+    @property
+    def name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def is_active(self) -> bool:
+        # user_config.status is compared case-insensitively in SQL, keep that here
+        return (self.status or "").lower() == "active"
+
+
+class UserResolver:
+    """
+    Process-wide emp_code -> user cache with a TTL and an LRU bound.
+    Only found users are cached, so a newly created emp_code is visible immediately.
+    Writes in this process invalidate; the TTL bounds staleness in other workers.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[float, ResolvedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(emp_code: str) -> str:
+        # emp_code matches case-insensitively under the default MySQL collation
+        return emp_code.strip().lower()
+
+    def _get(self, key: str) -> Optional[ResolvedUser]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _put(self, key: str, user: ResolvedUser) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def resolve(self, db: AsyncSession, emp_code: str) -> Optional[ResolvedUser]:
+        key = self._key(emp_code)
+        user = self._get(key)
+        if user is not None:
+            return user
+
+        result = await db.execute(resolve_user_query, {"emp_code": emp_code})
+        row = result.mappings().first()
+        if not row:
+            return None
+        user = ResolvedUser(**row)
+        self._put(key, user)
+        return user
+
+    async def resolve_id(self, db: AsyncSession, emp_code: str) -> Optional[int]:
+        user = await self.resolve(db, emp_code)
+        return user.id if user else None
+
+    def invalidate(self, emp_code: Optional[str] = None, user_id: Optional[int] = None) -> None:
+        """Drop a user by emp_code and/or id (an update may have changed the emp_code)"""
+        with self._lock:
+            if emp_code:
+                self._entries.pop(self._key(emp_code), None)
+            if user_id is not None:
+                for key in [key for key, (_, user) in self._entries.items() if user.id == user_id]:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+user_resolver = UserResolver(float(os.getenv("USER_CACHE_TTL_SECONDS", 60)), int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000)))
@@ -0,0 +1,142 @@
+"""
+AdmissionMiddleware in front of a stub app, called in-process:
+
+    python -m pytest tests/api
+"""
+import asyncio
+import time
+from collections import Counter, defaultdict
+
+import pytest
+
+from src.api.admission import AdmissionMiddleware, AdmissionSettings
+from src.machines.machine_registry import machine_registry
+
+# One request per client, then 429 until the bucket refills
+SETTINGS = AdmissionSettings(read_rate=0.01, read_burst=1, write_rate=0.01, write_burst=1, max_concurrent=0,
+                             max_per_client=0, queue_timeout=0.25, retry_after=1, redis_url=None)
+
+KIOSKS = [f"kiosk-{index}" for index in range(6)]
+
+
+@pytest.fixture(autouse=True)
+def known_machines():
+    machine_registry.replace(["kiosk-stuck", *KIOSKS])
+    yield
+    machine_registry.replace([])
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def status_for(app, path: str, machine_id=None, method="GET") -> int:
+    """A request from one address behind the kiosks' proxy"""
+    headers = [(b"x-machine-id", machine_id.encode())] if machine_id else []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers, "client": ("10.0.0.1", 50000)}
+    status_code = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+def statuses(paths, machine_ids=None):
+    app = AdmissionMiddleware(ok_app, settings=SETTINGS)
+    machine_ids = machine_ids or [None] * len(paths)
+
+    async def run():
+        return [await status_for(app, path, machine_id) for path, machine_id in zip(paths, machine_ids)]
+
+    return asyncio.run(run())
+
+
+def test_db_routes_share_the_host_budget_without_machine_id():
+    assert statuses(["/kiosk-ausweg/v1/get_unique_products"] * 3) == [200, 429, 429]
+
+
+def test_known_machines_get_their_own_budget():
+    assert statuses(["/kiosk-ausweg/v1/get_unique_products"] * 3, KIOSKS[:3]) == [200, 200, 200]
+
+
+def test_rotating_unknown_machine_ids_fall_back_to_the_host_budget():
+    machine_ids = [f"spoofed-{index}" for index in range(5)]
+    assert statuses(["/kiosk-ausweg/v1/get_unique_products"] * 5, machine_ids) == [200, 429, 429, 429, 429]
+
+
+def test_image_routes_are_not_admitted():
+    paths = ["/kiosk-ausweg/v1/images/content/abc", "/kiosk-ausweg/v1/images/category/1",
+             "/kiosk-ausweg/v1/images/inventory/7"] * 5
+    assert set(statuses(paths)) == {200}
+
+
+def test_pool_view_and_metrics_are_not_admitted():
+    assert set(statuses(["/metrics", "/kiosk-ausweg/v1/monitoring/db-pool"] * 5)) == {200}
+
+
+def test_fairness_across_kiosks_under_overload():
+    """
+    A stuck kiosk retries take_product from many loops without pause while the others
+    take and browse on a steady interval, all behind one proxy address. The stub holds
+    one of POOL_SIZE connections per request and sheds with a 503 after a pool timeout,
+    like get_db. The stuck kiosk is held to its budget and the others are all served.
+    """
+    pool_size, service_time, pool_timeout = 5, 0.02, 0.3
+    duration, interval = 1.5, 0.25
+    settings = AdmissionSettings(read_rate=10, read_burst=40, write_rate=5, write_burst=10, max_concurrent=pool_size,
+                                 max_per_client=2, queue_timeout=0.25, retry_after=1, redis_url=None)
+
+    async def run():
+        pool = asyncio.Semaphore(pool_size)
+
+        async def pooled_app(scope, receive, send):
+            try:
+                await asyncio.wait_for(pool.acquire(), timeout=pool_timeout)
+            except asyncio.TimeoutError:
+                await send({"type": "http.response.start", "status": 503, "headers": []})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            try:
+                await asyncio.sleep(service_time)
+                await ok_app(scope, receive, send)
+            finally:
+                pool.release()
+
+        app = AdmissionMiddleware(pooled_app, settings=settings)
+        results = defaultdict(Counter)
+        deadline = time.monotonic() + duration
+
+        async def call(machine_id, method, path):
+            results[machine_id][await status_for(app, path, machine_id, method)] += 1
+
+        async def stuck_loop():
+            while time.monotonic() < deadline:
+                await call("kiosk-stuck", "POST", "/kiosk-ausweg/v1/take_product")
+                await asyncio.sleep(0.002)
+
+        async def kiosk_loop(machine_id, offset):
+            await asyncio.sleep(offset)
+            while time.monotonic() < deadline:
+                await asyncio.gather(call(machine_id, "POST", "/kiosk-ausweg/v1/take_product"),
+                                     call(machine_id, "GET", "/kiosk-ausweg/v1/get_unique_products"))
+                await asyncio.sleep(interval)
+
+        await asyncio.gather(*(stuck_loop() for _ in range(40)),
+                             *(kiosk_loop(machine_id, interval * index / len(KIOSKS)) for index, machine_id in enumerate(KIOSKS)))
+        return results
+
+    results = asyncio.run(run())
+
+    for machine_id in KIOSKS:
+        served = results[machine_id]
+        assert served[200] > 0 and served[200] == sum(served.values()), (machine_id, served)
+    stuck = results["kiosk-stuck"]
+    assert stuck[429] > stuck[200]
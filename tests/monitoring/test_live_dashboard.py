@@ -0,0 +1,23 @@
+"""
+DashboardBroadcaster bookkeeping, no database needed:
+
+    python -m pytest tests/monitoring
+"""
+import time
+
+from src.machines.machine_registry import machine_registry
+from src.monitoring.live_dashboard import DashboardBroadcaster
+from src.monitoring.metrics import UNKNOWN_MACHINE
+
+
+def test_unknown_machine_ids_share_one_stock_entry(monkeypatch):
+    monkeypatch.setattr(machine_registry, "_ids", frozenset({"kiosk-1"}))
+    monkeypatch.setattr(machine_registry, "_loaded_at", time.monotonic())
+    broadcaster = DashboardBroadcaster(queue_size=4)
+
+    for index in range(100):
+        broadcaster.publish("take", f"rotated-{index}", "Drill")
+    broadcaster.publish("take", "kiosk-1", "Drill")
+    broadcaster.publish("return", None, "Drill")
+
+    assert broadcaster.machine_stock() == {UNKNOWN_MACHINE: {"Drill": -99}, "kiosk-1": {"Drill": -1}}
@@ -0,0 +1,115 @@
+"""
+NotificationWorker.send_batch against the local SMTP sink, no database needed:
+
+    python -m pytest tests/notifications
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from src.notifications import smtp_sink
+from src.notifications.outbox import DAMAGED_RETURN
+from src.notifications.smtp_client import PooledSmtpConnection, SmtpSettings
+from src.notifications.worker import NotificationWorker
+
+Row = namedtuple("Row", "id kind recipient payload attempts")
+
+PAYLOAD = json.dumps({"user_id": 1, "product_name": "Drill", "item_code": "ITEM-1", "machine_id": "kiosk-1"})
+
+
+def outbox_row(row_id, recipient="stores@example.com", kind=DAMAGED_RETURN, attempts=0):
+    return Row(row_id, kind, recipient, PAYLOAD, attempts)
+
+
+@pytest.fixture
+def sink():
+    """smtp_sink on a free port, served from its own loop; every 3rd message gets a 451"""
+    loop = asyncio.new_event_loop()
+    server, counter = loop.run_until_complete(smtp_sink.start("127.0.0.1", 0, fail_every=3))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.sockets[0].getsockname()[1], counter
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.close()
+
+
+def worker_for_test(timeout=2.0):
+    worker = NotificationWorker()
+    worker.smtp = PooledSmtpConnection(timeout, idle_check_seconds=30)
+    return worker
+
+
+def test_send_batch_outcomes(sink):
+    port, counter = sink
+    settings = SmtpSettings("127.0.0.1", port, "kiosk@example.com", None, "none")
+    rows = [
+        outbox_row(1),
+        outbox_row(2),
+        outbox_row(3),                                             # 3rd message: 451
+        outbox_row(4),
+        outbox_row(5, recipient="nobody" + smtp_sink.REJECT_SUFFIX),  # 550 on RCPT
+        outbox_row(6, kind="unknown_kind"),                        # cannot be rendered
+        outbox_row(7, attempts=2),
+    ]
+    worker = worker_for_test()
+    try:
+        outcomes = {outcome.id: outcome for outcome in worker.send_batch(settings, rows, {})}
+    finally:
+        worker.smtp.close()
+
+    sent = [row_id for row_id, outcome in outcomes.items() if outcome.error is None]
+    assert sent == [1, 2, 4, 7]
+    assert outcomes[7].attempts == 3
+
+    retried = outcomes[3]
+    assert "451" in retried.error and not retried.permanent and not retried.released
+
+    assert outcomes[5].permanent and "550" in outcomes[5].error
+    assert outcomes[6].permanent and outcomes[6].error.startswith("Render failed")
+
+    # One session for the whole batch, and the sink saw every message that reached DATA
+    assert worker.smtp.connects == 1
+    assert counter["messages"] == 5
+
+
+def test_connection_failure_stops_batch():
+    # Accepts the TCP connection but never greets, like a mail server that hangs
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    settings = SmtpSettings("127.0.0.1", listener.getsockname()[1], "kiosk@example.com", None, "none")
+    rows = [outbox_row(row_id, attempts=1) for row_id in range(1, 51)]
+    worker = worker_for_test(timeout=0.5)
+    started = time.monotonic()
+    try:
+        outcomes = worker.send_batch(settings, rows, {})
+    finally:
+        listener.close()
+    elapsed = time.monotonic() - started
+
+    # Only the first row waited out the timeout; the rest are handed back untouched
+    assert elapsed < 2
+    first, rest = outcomes[0], outcomes[1:]
+    assert first.id == 1 and first.error and not first.permanent and first.attempts == 2
+    assert [outcome.id for outcome in rest] == list(range(2, 51))
+    assert all(outcome.released and outcome.error is None and outcome.attempts == 1 for outcome in rest)
+
+
+def test_refused_connection_stops_batch():
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    settings = SmtpSettings("127.0.0.1", port, "kiosk@example.com", None, "none")
+
+    outcomes = worker_for_test().send_batch(settings, [outbox_row(1), outbox_row(2), outbox_row(3)], {})
+
+    assert outcomes[0].error and not outcomes[0].permanent
+    assert [outcome.released for outcome in outcomes] == [False, True, True]
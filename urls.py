@@ -16,6 +16,9 @@ from src.product_selection.urls import router as take_product
 from src.return_product.urls import router as return_item
 from src.return_damaged_products.urls import router as return_damaged_products
 from src.load_item.urls import router as Load_items
+from src.images.urls import router as images
+from src.monitoring.urls import router as monitoring
+from src.usage_reports.urls import router as usage_reports
 
 
 router = APIRouter()
@@ -37,4 +40,7 @@ router.include_router(take_product,tags=["product_selection"])
 router.include_router(return_item, tags=["Return product"])
 router.include_router(return_damaged_products, tags=["Return damaged products"])
 router.include_router(Load_items, tags=["Load_items"])
+router.include_router(images, tags=["Images"])
+router.include_router(monitoring, tags=["Monitoring"])
+router.include_router(usage_reports, tags=["Usage reports"])
 